@@ -1,9 +1,21 @@
+import math
 import cv2
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import time
+from collections import deque
 from pyzbar.pyzbar import decode
 from pyzbar import pyzbar
+from vision.overlay import FONT, TextPatch
+
+# fastzbarlight ships an optimized libzbar build; it only returns payloads,
+# so pyzbar is still used for polygon/quality metadata
+try:
+    from fastzbarlight import scan_codes
+    from PIL import Image
+    FASTZBAR_AVAILABLE = True
+except ImportError:
+    FASTZBAR_AVAILABLE = False
 
 class QRDetector:
     """
@@ -26,53 +38,54 @@ class QRDetector:
         self.total_detections = 0
         self.successful_decodes = 0
         self.last_detection_time = None
-        self.detection_history = []
+        self.detection_history = deque(maxlen=100)  # Last 100 detections
+        
+        # Rendered payload labels {text: (TextPatch, text_width, text_height)}
+        self._label_cache = {}
         
     def preprocess_frame(self, frame: np.ndarray) -> np.ndarray:
         """
         Preprocess frame for better QR detection
         
+        zbar binarizes internally, so only a grayscale conversion is needed.
+        Frames larger than 1280 px are halved to shrink the decode input.
+        
         Args:
             frame: Input frame
             
         Returns:
-            Preprocessed frame
+            Preprocessed grayscale frame
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Convert to grayscale (single channel input is used as is)
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        # Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(
-            gray, 255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY,
-            11, 2
-        )
+        # Downsample large frames
+        if max(gray.shape[:2]) > 1280:
+            gray = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
         
-        # Apply morphological operations to reduce noise
-        kernel = np.ones((3,3), np.uint8)
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+        return gray
         
-        return thresh
-        
-    def detect(self, frame: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
+    def detect(self, frame: np.ndarray, draw: bool = False) -> Tuple[np.ndarray, List[Dict]]:
         """
         Detect and decode QR codes in frame with enhanced angle support
         
         Args:
             frame: Input frame
+            draw: Draw detections onto the input frame (in place)
             
         Returns:
-            Tuple of (processed frame, list of QR detections)
+            Tuple of (frame, list of QR detections)
         """
-        # Create a copy for drawing
-        draw_frame = frame.copy()
-        
         # Preprocess frame
         processed = self.preprocess_frame(frame)
+        scale = frame.shape[1] / processed.shape[1]
         
-        # Detect QR codes using pyzbar
-        qr_codes = decode(processed)
+        # Fast payload scan first, only run pyzbar when a code is present
+        if FASTZBAR_AVAILABLE and not scan_codes('qrcode', Image.fromarray(processed)):
+            qr_codes = []
+        else:
+            # Detect QR codes using pyzbar
+            qr_codes = decode(processed)
         
         detections = []
         for qr in qr_codes:
@@ -82,16 +95,20 @@ class QRDetector:
             if qr.data:  # If successfully decoded
                 self.successful_decodes += 1
                 
-                # Get QR code points
-                points = np.array(qr.polygon, np.int32)
-                points = points.reshape((-1, 1, 2))
+                # Get QR code points (in original frame coordinates)
+                if scale == 1.0:
+                    points = np.asarray(qr.polygon, np.int32).reshape(-1, 1, 2)
+                else:
+                    points = (np.asarray(qr.polygon, np.float32) * scale).astype(np.int32).reshape(-1, 1, 2)
                 
                 # Calculate center point
-                center = np.mean(points, axis=0).astype(int)[0]
+                center = points.mean(axis=0).astype(int)[0]
                 
-                # Get rotation angle
-                rect = cv2.minAreaRect(points)
-                angle = rect[-1]
+                # Get rotation angle from the first polygon edge (same edge as
+                # the orientation indicator)
+                dx = float(points[1, 0, 0] - points[0, 0, 0])
+                dy = float(points[1, 0, 1] - points[0, 0, 1])
+                angle = math.degrees(math.atan2(dy, dx))
                 
                 # Create detection info
                 detection = {
@@ -104,49 +121,49 @@ class QRDetector:
                 }
                 detections.append(detection)
                 
-                # Draw QR code boundary and data
-                cv2.polylines(draw_frame, [points], True, (0, 255, 0), 2)
-                
-                # Draw orientation indicator
-                cv2.line(draw_frame, 
-                        tuple(points[0][0]),
-                        tuple(points[1][0]),
-                        (0, 0, 255), 3)
-                
-                # Draw data with background for better visibility
-                text = detection['data']
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 0.7
-                thickness = 2
-                
-                # Get text size
-                (text_width, text_height), _ = cv2.getTextSize(text, font, font_scale, thickness)
-                
-                # Draw background rectangle
-                text_x = center[0] - text_width // 2
-                text_y = center[1] - text_height // 2
-                cv2.rectangle(draw_frame,
-                            (text_x - 5, text_y - text_height - 5),
-                            (text_x + text_width + 5, text_y + 5),
-                            (0, 0, 0), -1)
-                
-                # Draw text
-                cv2.putText(draw_frame, text,
-                          (text_x, text_y),
-                          font, font_scale, (0, 255, 0), thickness)
-                
-                # Add angle information
-                angle_text = f"Angle: {angle:.1f}°"
-                cv2.putText(draw_frame, angle_text,
-                          (text_x, text_y + 25),
-                          font, 0.5, (0, 255, 0), 1)
-                
-                # Add to history
+                # Add to history (oldest entries drop out automatically)
                 self.detection_history.append(detection)
-                
-                # Keep only last 100 detections
-                if len(self.detection_history) > 100:
-                    self.detection_history.pop(0)
+        
+        if draw:
+            self.draw(frame, detections)
+        
+        return frame, detections
+    
+    def draw(self, frame: np.ndarray, detections: List[Dict]):
+        """
+        Draw QR detections and the debug info onto the frame (in place)
+        
+        Also used to repeat the last detections on frames that are not
+        scanned, so the overlay does not blink in the recording.
+        
+        Args:
+            frame: Frame to draw on
+            detections: Detections returned by detect
+        """
+        for detection in detections:
+            points = detection['points']
+            center = detection['center']
+            
+            # Draw QR code boundary and data
+            cv2.polylines(frame, [points], True, (0, 255, 0), 2)
+            
+            # Draw orientation indicator
+            cv2.line(frame, 
+                    tuple(points[0][0]),
+                    tuple(points[1][0]),
+                    (0, 0, 255), 3)
+            
+            # Draw data with background for better visibility
+            patch, text_width, text_height = self._get_label(detection['data'])
+            text_x = center[0] - text_width // 2
+            text_y = center[1] - text_height // 2
+            patch.draw(frame, text_x - 5, text_y - text_height - 5)
+            
+            # Add angle information
+            angle_text = f"Angle: {detection['angle']:.1f}°"
+            cv2.putText(frame, angle_text,
+                      (text_x, text_y + 25),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
         
         # Add debug info if enabled
         if self.debug_mode:
@@ -157,18 +174,52 @@ class QRDetector:
             ]
             
             for i, text in enumerate(debug_info):
-                cv2.putText(draw_frame, text,
+                cv2.putText(frame, text,
                            (10, 30 + (i * 30)),
                            cv2.FONT_HERSHEY_SIMPLEX,
                            0.7, (0, 255, 0), 2)
-        
-        return draw_frame, detections
     
+    def _get_label(self, text: str) -> Tuple[TextPatch, int, int]:
+        """
+        Get the rendered label (text on a black background) for a payload
+        
+        The same codes are read over many frames, so each label is
+        rasterized once and blitted afterwards.
+        
+        Args:
+            text: Label text
+            
+        Returns:
+            Tuple of (label patch, text width, text height)
+        """
+        label = self._label_cache.get(text)
+        if label is not None:
+            return label
+            
+        font_scale = 0.7
+        thickness = 2
+        (text_width, text_height), baseline = cv2.getTextSize(text, FONT, font_scale, thickness)
+        
+        # Background rectangle covers 5 px around the text, glyph descenders
+        # may extend below it
+        patch = TextPatch(text_width + 11, text_height + 10 + max(baseline - 5, 0) + thickness)
+        patch.put_text(text, (5, text_height + 5), (0, 255, 0), font_scale, thickness)
+        
+        # The rectangle is opaque
+        patch.mask[:text_height + 11, :] = 255
+        
+        # Payloads come from a small command set, keep the cache bounded anyway
+        if len(self._label_cache) >= 32:
+            self._label_cache.clear()
+        label = (patch, text_width, text_height)
+        self._label_cache[text] = label
+        return label
+        
     def get_stats(self) -> Dict:
         """Get detection statistics"""
         return {
             'total_detections': self.total_detections,
             'successful_decodes': self.successful_decodes,
             'last_detection_time': self.last_detection_time,
-            'detection_history': self.detection_history
+            'detection_history': list(self.detection_history)
         } 
\ No newline at end of file
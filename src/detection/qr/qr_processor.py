@@ -1,8 +1,16 @@
 from typing import Dict, Optional
 import json
 import time
+from collections import deque
 from enum import Enum
 
+# orjson is a C extension and parses several times faster than stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 class QRCommand(Enum):
     """QR code command types"""
     KAMIKAZE = "KAMIKAZE"
@@ -15,13 +23,21 @@ class QRProcessor:
     """
     QR code data processing and command handling
     """
+    # Command string -> QRCommand, built once
+    _CMD_MAP = {c.value: c for c in QRCommand}
+    
     def __init__(self):
         """Initialize QR processor"""
         self.last_command = None
         self.last_command_time = None
-        self.command_history = []
+        self.command_history = deque(maxlen=50)  # Last 50 commands
         self.command_cooldown = 2.0  # Seconds between same commands
         
+        # The same marker is usually read on many consecutive frames,
+        # so keep the last parse result keyed by the raw payload
+        self._last_raw = None
+        self._last_parsed = None
+        
     def process_qr_data(self, qr_data: str) -> Optional[Dict]:
         """
         Process QR code data and extract commands
@@ -32,56 +48,57 @@ class QRProcessor:
         Returns:
             Dictionary containing processed command info or None if invalid
         """
-        try:
-            # Try to parse as JSON
-            data = json.loads(qr_data)
-            
-            # Validate required fields
-            if 'command' not in data:
-                return None
-                
-            # Convert command to enum
+        # Reuse the parse result for repeated payloads
+        if qr_data == self._last_raw:
+            data = self._last_parsed
+        else:
             try:
-                command_type = QRCommand(data['command'])
-            except ValueError:
-                return None
-                
-            # Check command cooldown
-            current_time = time.time()
-            if (self.last_command == command_type and 
-                self.last_command_time and 
-                current_time - self.last_command_time < self.command_cooldown):
-                return None
-                
-            # Create command info
-            command_info = {
-                'type': command_type,
-                'timestamp': current_time,
-                'raw_data': data,
-                'parameters': data.get('parameters', {})
-            }
+                # Try to parse as JSON
+                data = _json_loads(qr_data)
+            except json.JSONDecodeError:
+                data = None
+            self._last_raw = qr_data
+            self._last_parsed = data
             
-            # Update state
-            self.last_command = command_type
-            self.last_command_time = current_time
-            self.command_history.append(command_info)
+        # Validate required fields
+        if not isinstance(data, dict) or 'command' not in data:
+            return None
             
-            # Keep only last 50 commands
-            if len(self.command_history) > 50:
-                self.command_history.pop(0)
-                
-            return command_info
+        # Convert command to enum
+        command = data['command']
+        command_type = self._CMD_MAP.get(command) if isinstance(command, str) else None
+        if command_type is None:
+            return None
             
-        except json.JSONDecodeError:
+        # Check command cooldown
+        current_time = time.time()
+        if (self.last_command == command_type and 
+            self.last_command_time and 
+            current_time - self.last_command_time < self.command_cooldown):
             return None
             
+        # Create command info
+        command_info = {
+            'type': command_type,
+            'timestamp': current_time,
+            'raw_data': data,
+            'parameters': data.get('parameters', {})
+        }
+        
+        # Update state
+        self.last_command = command_type
+        self.last_command_time = current_time
+        self.command_history.append(command_info)
+        
+        return command_info
+            
     def get_command_history(self) -> list:
         """Get command history"""
-        return self.command_history
+        return list(self.command_history)
         
     def clear_history(self):
         """Clear command history"""
-        self.command_history = []
+        self.command_history.clear()
         self.last_command = None
         self.last_command_time = None
         
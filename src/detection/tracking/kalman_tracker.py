@@ -1,12 +1,143 @@
 import numpy as np
-import cv2
 from typing import Dict, List, Tuple, Optional
 from scipy.spatial import distance
+from scipy.optimize import linear_sum_assignment
+
+# Numba is optional, the NumPy implementation is used without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Shared Kalman model, built once for all trackers and tracks
+# 6 state variables (x,y,z,dx,dy,dz), 2 measurement variables (x,y)
+_KF_DT = 1/30.0  # Assuming 30 FPS
+
+# Measurement matrix (converts state vector into measurement vector)
+_KF_H = np.array([
+    [1, 0, 0, 0, 0, 0],
+    [0, 1, 0, 0, 0, 0]], np.float64)
+
+# State transition matrix
+_KF_F = np.array([
+    [1, 0, 0, _KF_DT, 0, 0],
+    [0, 1, 0, 0, _KF_DT, 0],
+    [0, 0, 1, 0, 0, _KF_DT],
+    [0, 0, 0, 1, 0, 0],
+    [0, 0, 0, 0, 1, 0],
+    [0, 0, 0, 0, 0, 1]], np.float64)
+_KF_F_T = _KF_F.T.copy()
+
+# Increased process noise for more dynamic tracking
+_KF_Q = 1e-3 * np.eye(6)
+
+# Reduced measurement noise for more trust in measurements
+_KF_R = 1e-4 * np.eye(2)
+
+# The kernels only work on the arrays they are passed, so they release the
+# GIL and the capture and encoder threads of the pipeline keep running
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _kf_predict_jit(states, covariances, F, Q):
+        """Predict step for all tracks, in place"""
+        n = states.shape[1]
+        x = np.empty(n)
+        FP = np.empty((n, n))
+        for k in range(states.shape[0]):
+            for i in range(n):
+                acc = 0.0
+                for j in range(n):
+                    acc += F[i, j] * states[k, j]
+                x[i] = acc
+            states[k, :] = x
+            
+            # P = F P F^T + Q
+            for i in range(n):
+                for j in range(n):
+                    acc = 0.0
+                    for m in range(n):
+                        acc += F[i, m] * covariances[k, m, j]
+                    FP[i, j] = acc
+            for i in range(n):
+                for j in range(n):
+                    acc = Q[i, j]
+                    for m in range(n):
+                        acc += FP[i, m] * F[j, m]
+                    covariances[k, i, j] = acc
+                    
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _kf_correct_jit(states, covariances, rows, measurements, R):
+        """
+        Correct step for the given rows, in place
+        
+        The measurement matrix selects (x, y), so H P is the first two rows
+        of P and the innovation covariance is a 2x2 block inverted directly.
+        """
+        n = states.shape[1]
+        K = np.empty((n, 2))
+        for idx in range(rows.shape[0]):
+            k = rows[idx]
+            P = covariances[k]
+            
+            s00 = P[0, 0] + R[0, 0]
+            s01 = P[0, 1] + R[0, 1]
+            s10 = P[1, 0] + R[1, 0]
+            s11 = P[1, 1] + R[1, 1]
+            det = s00 * s11 - s01 * s10
+            i00 = s11 / det
+            i01 = -s01 / det
+            i10 = -s10 / det
+            i11 = s00 / det
+            
+            # K = P H^T S^-1
+            for i in range(n):
+                K[i, 0] = P[i, 0] * i00 + P[i, 1] * i10
+                K[i, 1] = P[i, 0] * i01 + P[i, 1] * i11
+                
+            y0 = measurements[idx, 0] - states[k, 0]
+            y1 = measurements[idx, 1] - states[k, 1]
+            for i in range(n):
+                states[k, i] += K[i, 0] * y0 + K[i, 1] * y1
+                
+            # P = P - K H P (H P is rows 0 and 1 of P, read before writing)
+            h0 = P[0, :].copy()
+            h1 = P[1, :].copy()
+            for i in range(n):
+                for j in range(n):
+                    P[i, j] -= K[i, 0] * h0[j] + K[i, 1] * h1[j]
+
+_jit_warmed = False
+
+def _warm_up_kernels():
+    """
+    Compile the Numba kernels once per process, before the first frame
+    
+    The kernels are compiled lazily on their first call, which can take
+    seconds without a cache. They are called here on empty arrays of the
+    same types as in tracking so it happens while the tracker is created.
+    """
+    global _jit_warmed
+    if _jit_warmed or not NUMBA_AVAILABLE:
+        return
+    _jit_warmed = True
+    states = np.zeros((0, 6))
+    covariances = np.zeros((0, 6, 6))
+    _kf_predict_jit(states, covariances, _KF_F, _KF_Q)
+    _kf_correct_jit(states, covariances, np.zeros(0, dtype=np.int64), np.zeros((0, 2)), _KF_R)
 
 class KalmanTracker:
     """
     Kalman Filter based multi-object tracker optimized for UAV tracking
+    
+    All tracks share the same motion model, so their filter states are kept
+    stacked in arrays and every predict/correct step runs once for all tracks.
     """
+    # Capacity of the per-frame scratch buffers (larger frames fall back to
+    # temporary arrays)
+    MAX_TRACKS = 32
+    MAX_DETS = 32
+    
     def __init__(self, max_disappeared: int = 60, max_distance: float = 100.0):
         """
         Initialize tracker
@@ -16,51 +147,132 @@ class KalmanTracker:
             max_distance: Maximum distance between detections to consider it the same object
         """
         self.next_object_id = 0
-        self.objects = {}  # Dictionary to store tracked objects {id: (centroid, kalman_filter)}
+        self.objects = {}  # Dictionary to store tracked objects {id: centroid}
         self.disappeared = {}  # Dictionary to count frames since last detection
+        self.last_boxes = {}  # Last reported (bbox, confidence) per object, for predict()
         self.max_disappeared = max_disappeared
         self.max_distance = max_distance
         self.min_confidence = 0.1  # Lower confidence threshold
         
-    def _create_kalman_filter(self) -> cv2.KalmanFilter:
-        """Create and initialize Kalman Filter for new object"""
-        kf = cv2.KalmanFilter(6, 2)  # 6 state variables (x,y,z,dx,dy,dz), 2 measurement variables (x,y)
+        # Kalman filter bank, one row per track (same order as track_ids)
+        self.track_ids: List[int] = []
+        self.states = np.zeros((0, 6))
+        self.covariances = np.zeros((0, 6, 6))
+        
+        # Scratch buffers reused by update(); the matrices are flat so that
+        # any (K, N) prefix view is C-contiguous (cdist requires it for out=)
+        self._obj_buf = np.empty((self.MAX_TRACKS, 2))
+        self._det_buf = np.empty((self.MAX_DETS, 2))
+        self._D_buf = np.empty(self.MAX_TRACKS * self.MAX_DETS)
+        self._cost_buf = np.empty(self.MAX_TRACKS * self.MAX_DETS)
+        self._gate_buf = np.empty(self.MAX_TRACKS * self.MAX_DETS, dtype=bool)
         
-        # Measurement matrix (converts state vector into measurement vector)
-        kf.measurementMatrix = np.array([
-            [1, 0, 0, 0, 0, 0],
-            [0, 1, 0, 0, 0, 0]], np.float32)
+        _warm_up_kernels()
         
-        # State transition matrix
-        dt = 1/30.0  # Assuming 30 FPS
-        kf.transitionMatrix = np.array([
-            [1, 0, 0, dt, 0, 0],
-            [0, 1, 0, 0, dt, 0],
-            [0, 0, 1, 0, 0, dt],
-            [0, 0, 0, 1, 0, 0],
-            [0, 0, 0, 0, 1, 0],
-            [0, 0, 0, 0, 0, 1]], np.float32)
+    def _predict(self) -> np.ndarray:
+        """
+        Run the Kalman predict step for all tracks
         
-        # Increased process noise for more dynamic tracking
-        kf.processNoiseCov = 1e-3 * np.eye(6, dtype=np.float32)
+        Returns:
+            Predicted (x, y) positions, shape (K, 2)
+        """
+        if NUMBA_AVAILABLE:
+            _kf_predict_jit(self.states, self.covariances, _KF_F, _KF_Q)
+        else:
+            self.states = self.states @ _KF_F_T
+            self.covariances = _KF_F @ self.covariances @ _KF_F_T + _KF_Q
+        return self.states[:, :2].copy()
         
-        # Reduced measurement noise for more trust in measurements
-        kf.measurementNoiseCov = 1e-4 * np.eye(2, dtype=np.float32)
+    def _correct(self, rows: np.ndarray, measurements: np.ndarray):
+        """
+        Run the Kalman correct step for a subset of tracks
         
-        return kf
+        Args:
+            rows: Track rows to correct
+            measurements: Measured (x, y) positions, shape (len(rows), 2)
+        """
+        if NUMBA_AVAILABLE:
+            _kf_correct_jit(self.states, self.covariances,
+                            np.ascontiguousarray(rows, dtype=np.int64),
+                            np.ascontiguousarray(measurements, dtype=np.float64), _KF_R)
+            return
+            
+        H = _KF_H
+        P = self.covariances[rows]
+        
+        # Kalman gain K = P H^T (H P H^T + R)^-1, solved for all rows at once
+        PHt = P @ H.T
+        S = H @ PHt + _KF_R
+        K = np.linalg.solve(S, PHt.transpose(0, 2, 1)).transpose(0, 2, 1)
+        
+        innovation = measurements - self.states[rows] @ H.T
+        self.states[rows] += np.einsum('kij,kj->ki', K, innovation)
+        self.covariances[rows] = P - K @ H @ P
         
     def register(self, centroid: Tuple[float, float]):
         """Register new object with Kalman Filter"""
-        kf = self._create_kalman_filter()
-        self.objects[self.next_object_id] = (centroid, kf)
+        # Start the filter at the detected position, at rest
+        state = np.zeros((1, 6))
+        state[0, :2] = centroid
+        
+        self.track_ids.append(self.next_object_id)
+        self.states = np.vstack([self.states, state])
+        self.covariances = np.concatenate([self.covariances, np.zeros((1, 6, 6))])
+        
+        self.objects[self.next_object_id] = centroid
         self.disappeared[self.next_object_id] = 0
         self.next_object_id += 1
         
     def deregister(self, object_id: int):
         """Deregister disappeared object"""
+        row = self.track_ids.index(object_id)
+        del self.track_ids[row]
+        self.states = np.delete(self.states, row, axis=0)
+        self.covariances = np.delete(self.covariances, row, axis=0)
+        
         del self.objects[object_id]
         del self.disappeared[object_id]
+        self.last_boxes.pop(object_id, None)
+        
+    def predict(self) -> Dict:
+        """
+        Advance all tracks one frame without a detector pass
+        
+        Used on frames where detection is skipped: nothing counts as
+        disappeared, and each track's last box is moved with its prediction.
         
+        Returns:
+            Dictionary of tracked objects with IDs as keys
+        """
+        tracked_objects = {}
+        predictions = self._predict()
+        for obj_id, predicted_centroid in zip(self.track_ids, map(tuple, predictions)):
+            old_centroid = self.objects[obj_id]
+            self.objects[obj_id] = predicted_centroid
+            
+            bbox, confidence = self.last_boxes.get(obj_id, (None, 0.5))
+            if bbox is None:
+                bbox = [predicted_centroid[0]-50, predicted_centroid[1]-50,  # Estimated bbox
+                        predicted_centroid[0]+50, predicted_centroid[1]+50]
+            else:
+                dx = predicted_centroid[0] - old_centroid[0]
+                dy = predicted_centroid[1] - old_centroid[1]
+                bbox = [bbox[0]+dx, bbox[1]+dy, bbox[2]+dx, bbox[3]+dy]
+                
+            tracked_objects[obj_id] = {
+                'centroid': predicted_centroid,
+                'bbox': bbox,
+                'confidence': confidence
+            }
+            
+        self._remember_boxes(tracked_objects)
+        return tracked_objects
+        
+    def _remember_boxes(self, tracked_objects: Dict):
+        """Store the reported boxes so predict() can move them"""
+        for obj_id, obj in tracked_objects.items():
+            self.last_boxes[obj_id] = (obj['bbox'], obj['confidence'])
+            
     def update(self, detections: List[Dict]) -> Dict:
         """
         Update tracker with new detections
@@ -71,107 +283,130 @@ class KalmanTracker:
         Returns:
             Dictionary of tracked objects with IDs as keys
         """
-        tracked_objects = {}
+        det_boxes = [det['bbox'] for det in detections]
+        det_confidences = [det['confidence'] for det in detections]
+        bboxes = np.array(det_boxes, dtype=np.float64).reshape(-1, 4)
+        return self._update(bboxes, det_boxes, det_confidences)
         
-        # Extract centroids from detections
-        detection_list = []
-        detection_centroids = []
-        for det in detections:
-            bbox = det['bbox']
-            centroid = ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
-            detection_list.append({
-                'centroid': centroid,
-                'bbox': bbox,
-                'confidence': det['confidence']
-            })
-            detection_centroids.append(centroid)
+    def update_array(self, detections: np.ndarray) -> Dict:
+        """
+        Update tracker with detections given as an array
+        
+        Skips building a dictionary per detection when the detector already
+        produces its results as an array.
+        
+        Args:
+            detections: Array of shape (K, 5+) with rows [x1, y1, x2, y2, confidence, ...]
             
+        Returns:
+            Dictionary of tracked objects with IDs as keys
+        """
+        detections = np.asarray(detections)
+        bboxes = detections[:, :4].astype(np.float64)
+        return self._update(bboxes, detections[:, :4].tolist(), detections[:, 4].tolist())
+        
+    def _update(self, bboxes: np.ndarray, det_boxes: list, det_confidences: list) -> Dict:
+        """
+        Shared update step
+        
+        Args:
+            bboxes: Detection boxes as float64 array (K, 4)
+            det_boxes: Box reported for each detection
+            det_confidences: Confidence reported for each detection
+            
+        Returns:
+            Dictionary of tracked objects with IDs as keys
+        """
+        tracked_objects = {}
+        num_dets = len(det_boxes)
+        
         # If no detections, mark all objects as disappeared
-        if len(detection_list) == 0:
+        if num_dets == 0:
             for object_id in list(self.disappeared.keys()):
                 self.disappeared[object_id] += 1
                 if self.disappeared[object_id] > self.max_disappeared:
                     self.deregister(object_id)
-            
+                    
             # Return remaining objects with their predicted positions
-            for obj_id, (centroid, kf) in self.objects.items():
-                prediction = kf.predict()
-                predicted_centroid = (prediction[0][0], prediction[1][0])
+            predictions = self._predict()
+            for obj_id, predicted_centroid in zip(self.track_ids, map(tuple, predictions)):
                 tracked_objects[obj_id] = {
                     'centroid': predicted_centroid,
                     'bbox': [predicted_centroid[0]-50, predicted_centroid[1]-50,  # Estimated bbox
                             predicted_centroid[0]+50, predicted_centroid[1]+50],
                     'confidence': 0.5  # Lower confidence for predictions
                 }
+            self._remember_boxes(tracked_objects)
             return tracked_objects
             
+        # Extract centroids from detections in one vectorized pass
+        detection_centroids = self._det_buf[:num_dets] if num_dets <= self.MAX_DETS else None
+        detection_centroids = np.add(bboxes[:, :2], bboxes[:, 2:], out=detection_centroids)
+        detection_centroids *= 0.5
+        
         # If no existing objects, register all detections as new
         if len(self.objects) == 0:
-            for i, det in enumerate(detection_list):
-                self.register(det['centroid'])
-                tracked_objects[i] = {
-                    'centroid': det['centroid'],
-                    'bbox': det['bbox'],
-                    'confidence': det['confidence']
+            for i in range(num_dets):
+                centroid = tuple(detection_centroids[i])
+                self.register(centroid)
+                tracked_objects[self.next_object_id - 1] = {
+                    'centroid': centroid,
+                    'bbox': det_boxes[i],
+                    'confidence': det_confidences[i]
                 }
         else:
             # Calculate distances between existing objects and new detections
-            object_ids = list(self.objects.keys())
-            object_centroids = [obj[0] for obj in self.objects.values()]
-            
-            # Convert lists to numpy arrays for distance calculation
-            object_centroids = np.array(object_centroids)
-            detection_centroids = np.array(detection_centroids)
-            
-            # Ensure 2D arrays
-            if len(object_centroids.shape) == 1:
-                object_centroids = object_centroids.reshape(1, -1)
-            if len(detection_centroids.shape) == 1:
-                detection_centroids = detection_centroids.reshape(1, -1)
+            object_ids = list(self.track_ids)
+            num_objs = len(object_ids)
             
-            D = distance.cdist(object_centroids, detection_centroids)
-            
-            # Find best matches using Hungarian algorithm
-            rows = D.min(axis=1).argsort()
-            cols = D.argmin(axis=1)[rows]
+            if num_objs <= self.MAX_TRACKS and num_dets <= self.MAX_DETS:
+                size = num_objs * num_dets
+                object_centroids = self._obj_buf[:num_objs]
+                D = self._D_buf[:size].reshape(num_objs, num_dets)
+                cost = self._cost_buf[:size].reshape(num_objs, num_dets)
+                gate = self._gate_buf[:size].reshape(num_objs, num_dets)
+            else:
+                object_centroids = np.empty((num_objs, 2))
+                D = np.empty((num_objs, num_dets))
+                cost = np.empty((num_objs, num_dets))
+                gate = np.empty((num_objs, num_dets), dtype=bool)
+                
+            for row, obj_id in enumerate(object_ids):
+                object_centroids[row] = self.objects[obj_id]
+                
+            distance.cdist(object_centroids, detection_centroids, out=D)
             
-            used_rows = set()
-            used_cols = set()
+            # Find optimal matches using Hungarian algorithm (gated by max_distance)
+            np.greater(D, self.max_distance, out=gate)
+            np.copyto(cost, D)
+            cost[gate] = 1e9
+            row_ind, col_ind = linear_sum_assignment(cost)
+            valid = D[row_ind, col_ind] <= self.max_distance
+            matched_rows = row_ind[valid]
+            matched_cols = col_ind[valid]
             
-            for (row, col) in zip(rows, cols):
-                if row in used_rows or col in used_cols:
-                    continue
-                    
-                if D[row, col] > self.max_distance:
-                    continue
-                    
-                object_id = object_ids[row]
-                det = detection_list[col]
-                centroid = det['centroid']
-                kf = self.objects[object_id][1]
+            # Predict every track in one step, then correct the matched ones
+            predictions = self._predict()
+            if len(matched_rows) > 0:
+                self._correct(matched_rows, detection_centroids[matched_cols])
                 
-                # Update Kalman Filter
-                prediction = kf.predict()
-                measurement = np.array([[centroid[0]], [centroid[1]]], dtype=np.float32)
-                kf.correct(measurement)
+            for (row, col) in zip(matched_rows, matched_cols):
+                object_id = object_ids[row]
                 
                 # Update object position with Kalman Filter prediction
-                predicted_centroid = (prediction[0][0], prediction[1][0])
-                self.objects[object_id] = (predicted_centroid, kf)
+                predicted_centroid = tuple(predictions[row])
+                self.objects[object_id] = predicted_centroid
                 self.disappeared[object_id] = 0
                 
                 # Add to tracked objects
                 tracked_objects[object_id] = {
                     'centroid': predicted_centroid,
-                    'bbox': det['bbox'],
-                    'confidence': det['confidence']
+                    'bbox': det_boxes[col],
+                    'confidence': det_confidences[col]
                 }
                 
-                used_rows.add(row)
-                used_cols.add(col)
-            
             # Handle unmatched existing objects
-            unused_rows = set(range(0, D.shape[0])).difference(used_rows)
+            unused_rows = set(range(0, D.shape[0])).difference(matched_rows)
             for row in unused_rows:
                 object_id = object_ids[row]
                 self.disappeared[object_id] += 1
@@ -179,11 +414,9 @@ class KalmanTracker:
                 if self.disappeared[object_id] > self.max_disappeared:
                     self.deregister(object_id)
                 else:
-                    # Predict new position using Kalman Filter
-                    kf = self.objects[object_id][1]
-                    prediction = kf.predict()
-                    predicted_centroid = (prediction[0][0], prediction[1][0])
-                    self.objects[object_id] = (predicted_centroid, kf)
+                    # Use predicted position from Kalman Filter
+                    predicted_centroid = tuple(predictions[row])
+                    self.objects[object_id] = predicted_centroid
                     
                     # Add prediction to tracked objects
                     tracked_objects[object_id] = {
@@ -192,17 +425,18 @@ class KalmanTracker:
                                 predicted_centroid[0]+50, predicted_centroid[1]+50],
                         'confidence': 0.5  # Lower confidence for predictions
                     }
-            
+                    
             # Register unmatched detections as new objects
-            unused_cols = set(range(0, D.shape[1])).difference(used_cols)
+            unused_cols = set(range(0, D.shape[1])).difference(matched_cols)
             for col in unused_cols:
-                det = detection_list[col]
-                self.register(det['centroid'])
+                centroid = tuple(detection_centroids[col])
+                self.register(centroid)
                 new_id = self.next_object_id - 1  # ID of just registered object
                 tracked_objects[new_id] = {
-                    'centroid': det['centroid'],
-                    'bbox': det['bbox'],
-                    'confidence': det['confidence']
+                    'centroid': centroid,
+                    'bbox': det_boxes[col],
+                    'confidence': det_confidences[col]
                 }
-        
+                
+        self._remember_boxes(tracked_objects)
         return tracked_objects 
\ No newline at end of file
@@ -1,7 +1,9 @@
+import os
+import math
 import time
+import ctypes
 import threading
-import numpy as np
-from typing import Dict, Tuple, Optional, List
+from typing import Dict, List
 
 # Raspberry Pi üzerinde çalışıyorsa GPIO kütüphanesini içe aktar
 try:
@@ -12,6 +14,20 @@ except ImportError:
     RPI_AVAILABLE = False
     print("Uyarı: RPi.GPIO veya pigpio kütüphanesi bulunamadı. Simülasyon modu kullanılacak.")
 
+# Donanım PWM destekli GPIO pinleri (PWM0: 12/18, PWM1: 13/19)
+HARDWARE_PWM_PINS = (12, 13, 18, 19)
+SERVO_PWM_FREQUENCY = 50  # Hz (20 ms periyot)
+
+# Servo iş parçacığı için gerçek zamanlı öncelik (SCHED_FIFO, 1-99)
+SERVO_THREAD_PRIORITY = 40
+PR_SET_TIMERSLACK = 29  # linux/prctl.h
+
+# Bu değerden küçük açı farklarında servo hedefe ulaşmış sayılır (derece)
+SERVO_DEADBAND = 0.05
+
+# Açı -> darbe tablosunun çözünürlüğü (derece başına adım, 10 = 0.1°)
+PULSE_LUT_STEPS_PER_DEGREE = 10
+
 class ServoController:
     """
     Pan/Tilt servo motorlarını kontrol eden sınıf
@@ -32,6 +48,7 @@ class ServoController:
                  tilt_angle_min: float = -45.0, # Tilt minimum açı (derece)
                  tilt_angle_max: float = 45.0,  # Tilt maximum açı (derece)
                  update_rate: float = 50.0,     # Güncelleme hızı (Hz)
+                 smoothing_tau: float = 0.056,  # Yumuşatma zaman sabiti (s)
                  simulation_mode: bool = not RPI_AVAILABLE):  # Simülasyon modu
         """
         Servo kontrolörünü başlat
@@ -48,6 +65,8 @@ class ServoController:
             tilt_angle_min: Tilt minimum açı (derece)
             tilt_angle_max: Tilt maximum açı (derece)
             update_rate: Güncelleme hızı (Hz)
+            smoothing_tau: Yumuşatma zaman sabiti (s); 0.056 s, 20 ms'lik adımda
+                eski 0.3 yumuşatma faktörüne karşılık gelir
             simulation_mode: Simülasyon modu
         """
         self.pan_pin = pan_pin
@@ -61,8 +80,26 @@ class ServoController:
         self.tilt_angle_min = tilt_angle_min
         self.tilt_angle_max = tilt_angle_max
         self.update_rate = update_rate
+        self.smoothing_tau = smoothing_tau
         self.simulation_mode = simulation_mode
         
+        # Açı -> darbe dönüşüm katsayıları (pulse = offset + scale * açı)
+        self._pan_scale = (pan_max - pan_min) / (pan_angle_max - pan_angle_min)
+        self._pan_offset = pan_min - pan_angle_min * self._pan_scale
+        self._tilt_scale = (tilt_max - tilt_min) / (tilt_angle_max - tilt_angle_min)
+        self._tilt_offset = tilt_min - tilt_angle_min * self._tilt_scale
+        
+        # 0.1° çözünürlüklü darbe tabloları (±90° için 1801 eleman)
+        self._pan_lut = self._build_pulse_lut(pan_angle_min, pan_angle_max,
+                                              self._pan_offset, self._pan_scale)
+        self._tilt_lut = self._build_pulse_lut(tilt_angle_min, tilt_angle_max,
+                                               self._tilt_offset, self._tilt_scale)
+        self._pan_lut_last = len(self._pan_lut) - 1
+        self._tilt_lut_last = len(self._tilt_lut) - 1
+        
+        self._pan_center_pulse = self._pan_to_pulse(0)
+        self._tilt_center_pulse = self._tilt_to_pulse(0)
+        
         # Mevcut açılar
         self.current_pan = 0.0
         self.current_tilt = 0.0
@@ -72,6 +109,12 @@ class ServoController:
         # Durum değişkenleri
         self.is_running = False
         self.update_thread = None
+        self.missed_ticks = 0  # Gecikme nedeniyle atlanan güncelleme sayısı
+        self._last_pulse = {}  # Pine en son yazılan darbe genişliği
+        
+        # Hedef değiştiğinde güncelleme iş parçacığını uyandırmak için
+        self._cv = threading.Condition()
+        self._dirty = False
         
         # Raspberry Pi üzerinde çalışıyorsa GPIO'yu ayarla
         if not self.simulation_mode and RPI_AVAILABLE:
@@ -87,8 +130,7 @@ class ServoController:
                     self.pi.set_mode(self.tilt_pin, pigpio.OUTPUT)
                     
                     # Başlangıç pozisyonuna getir
-                    self._set_servo_pulse(self.pan_pin, self._angle_to_pulse(0, self.pan_min, self.pan_max, self.pan_angle_min, self.pan_angle_max))
-                    self._set_servo_pulse(self.tilt_pin, self._angle_to_pulse(0, self.tilt_min, self.tilt_max, self.tilt_angle_min, self.tilt_angle_max))
+                    self._center_servos()
                     print("Servo kontrolörü başlatıldı")
             except Exception as e:
                 print(f"GPIO başlatılırken hata oluştu: {e}")
@@ -97,83 +139,205 @@ class ServoController:
         if self.simulation_mode:
             print("Servo kontrolörü simülasyon modunda başlatıldı")
     
-    def _angle_to_pulse(self, angle: float, pulse_min: int, pulse_max: int, angle_min: float, angle_max: float) -> int:
+    @staticmethod
+    def _build_pulse_lut(angle_min: float, angle_max: float, offset: float, scale: float) -> List[int]:
         """
-        Açıyı PWM darbe genişliğine dönüştür
+        Açı aralığı için darbe genişliği tablosu oluştur
         
         Args:
-            angle: Açı (derece)
-            pulse_min: Minimum darbe genişliği (μs)
-            pulse_max: Maximum darbe genişliği (μs)
             angle_min: Minimum açı (derece)
             angle_max: Maximum açı (derece)
+            offset: Dönüşüm sabiti (μs)
+            scale: Dönüşüm katsayısı (μs/derece)
             
         Returns:
-            PWM darbe genişliği (μs)
+            PULSE_LUT_STEPS_PER_DEGREE çözünürlüklü darbe genişlikleri (μs)
         """
-        # Açıyı sınırla
-        angle = max(angle_min, min(angle_max, angle))
-        
-        # Açıyı 0-1 aralığına normalize et
-        normalized = (angle - angle_min) / (angle_max - angle_min)
+        steps = int(round((angle_max - angle_min) * PULSE_LUT_STEPS_PER_DEGREE))
+        return [int(round(offset + scale * (angle_min + i / PULSE_LUT_STEPS_PER_DEGREE)))
+                for i in range(steps + 1)]
+    
+    def _pan_to_pulse(self, angle: float) -> int:
+        """
+        Pan açısını PWM darbe genişliğine dönüştür
         
-        # Darbe genişliğini hesapla
-        pulse = int(pulse_min + normalized * (pulse_max - pulse_min))
+        Args:
+            angle: Açı (derece)
+            
+        Returns:
+            PWM darbe genişliği (μs)
+        """
+        # En yakın tablo elemanı, tablo sınırlarına kırpılarak
+        i = int((angle - self.pan_angle_min) * PULSE_LUT_STEPS_PER_DEGREE + 0.5)
+        last = self._pan_lut_last
+        return self._pan_lut[0 if i < 0 else last if i > last else i]
+    
+    def _tilt_to_pulse(self, angle: float) -> int:
+        """
+        Tilt açısını PWM darbe genişliğine dönüştür
         
-        return pulse
+        Args:
+            angle: Açı (derece)
+            
+        Returns:
+            PWM darbe genişliği (μs)
+        """
+        # En yakın tablo elemanı, tablo sınırlarına kırpılarak
+        i = int((angle - self.tilt_angle_min) * PULSE_LUT_STEPS_PER_DEGREE + 0.5)
+        last = self._tilt_lut_last
+        return self._tilt_lut[0 if i < 0 else last if i > last else i]
     
     def _set_servo_pulse(self, pin: int, pulse: int):
         """
         Servo motorun darbe genişliğini ayarla
         
+        Donanım PWM destekli pinlerde darbeler PWM birimi tarafından üretilir;
+        diğer pinlerde pigpio'nun DMA tabanlı servo çıkışı kullanılır. Değişmeyen
+        darbe genişlikleri tekrar yazılmaz.
+        
         Args:
             pin: Servo pin numarası
             pulse: Darbe genişliği (μs)
         """
+        if self._last_pulse.get(pin) == pulse:
+            return
+        self._last_pulse[pin] = pulse
+        
         if not self.simulation_mode and RPI_AVAILABLE:
             try:
-                self.pi.set_servo_pulsewidth(pin, pulse)
+                if pin in HARDWARE_PWM_PINS:
+                    # Görev oranı milyonda bir cinsinden: pulse / 20000 μs * 1e6
+                    self.pi.hardware_PWM(pin, SERVO_PWM_FREQUENCY, pulse * SERVO_PWM_FREQUENCY)
+                else:
+                    self.pi.set_servo_pulsewidth(pin, pulse)
             except Exception as e:
                 print(f"Servo kontrolünde hata: {e}")
         else:
             # Simülasyon modunda sadece değeri yazdır
             pass
     
+    def _set_servo_pulses(self, pan_pulse: int, tilt_pulse: int):
+        """
+        Pan ve tilt darbe genişliklerini birlikte ayarla
+        
+        Her iki kanal art arda yazılır; değişmeyen kanal için pigpio'ya
+        mesaj gönderilmez.
+        
+        Args:
+            pan_pulse: Pan darbe genişliği (μs)
+            tilt_pulse: Tilt darbe genişliği (μs)
+        """
+        self._set_servo_pulse(self.pan_pin, pan_pulse)
+        self._set_servo_pulse(self.tilt_pin, tilt_pulse)
+    
+    def _center_servos(self):
+        """Servo motorları merkez (0°) pozisyona getir"""
+        self._set_servo_pulses(self._pan_center_pulse, self._tilt_center_pulse)
+    
+    def _release_servo(self, pin: int):
+        """
+        Servo pinindeki PWM çıkışını kapat
+        
+        Args:
+            pin: Servo pin numarası
+        """
+        if pin in HARDWARE_PWM_PINS:
+            self.pi.hardware_PWM(pin, 0, 0)
+        else:
+            self.pi.set_servo_pulsewidth(pin, 0)
+        self._last_pulse.pop(pin, None)
+    
+    def _set_realtime_priority(self):
+        """
+        Çağıran iş parçacığını SCHED_FIFO önceliğine al ve zamanlayıcı
+        gevşekliğini 1 ns'ye düşür (yalnızca Linux, root/CAP_SYS_NICE gerekir)
+        
+        Linux'ta pid 0 çağıran iş parçacığını ifade eder, bu nedenle ana
+        iş parçacığının önceliği değişmez.
+        """
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(SERVO_THREAD_PRIORITY))
+            print(f"Servo iş parçacığı SCHED_FIFO önceliğinde çalışıyor ({SERVO_THREAD_PRIORITY})")
+        except (AttributeError, OSError) as e:
+            print(f"Uyarı: Gerçek zamanlı öncelik ayarlanamadı ({e}). "
+                  "Daha kararlı zamanlama için root olarak çalıştırın.")
+        
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.prctl(PR_SET_TIMERSLACK, 1, 0, 0, 0)
+        except (AttributeError, OSError):
+            pass
+    
     def _update_servos(self):
         """Servo motorları güncelle (ayrı bir iş parçacığında çalışır)"""
-        last_update = time.time()
+        self._set_realtime_priority()
+        
+        # Mutlak zamanlı döngü: her adım bir önceki hedef zamana göre
+        # planlanır, böylece sleep gecikmeleri birikmez. Yumuşatmadaki dt de
+        # aynı monoton saatten alınır; sistem saati (NTP, RTC) ayarlanınca
+        # dt eksiye düşmez ya da sıçramaz
+        period_ns = int(1e9 / self.update_rate)
+        deadline_ns = time.perf_counter_ns()
+        last_update_ns = deadline_ns
+        
+        # Döngüde kullanılan sabitler yerel değişkenlerde
+        exp = math.exp
+        tau = self.smoothing_tau
+        pan_lo, pan_hi = self.pan_angle_min, self.pan_angle_max
+        tilt_lo, tilt_hi = self.tilt_angle_min, self.tilt_angle_max
         
         while self.is_running:
-            current_time = time.time()
-            dt = current_time - last_update
+            current_ns = time.perf_counter_ns()
+            dt = (current_ns - last_update_ns) / 1e9
             
             # Hedef açılara doğru yumuşak geçiş
             pan_diff = self.target_pan - self.current_pan
             tilt_diff = self.target_tilt - self.current_tilt
             
-            # Yumuşatma faktörü (0.1 = yavaş, 0.5 = orta, 1.0 = anında)
-            smoothing = 0.3
+            # Yumuşatma faktörü geçen süreye göre hesaplanır, böylece
+            # zamanlama sapmaları geçiş hızını değiştirmez
+            smoothing = 1.0 - exp(-dt / tau)
             
-            self.current_pan += pan_diff * smoothing
-            self.current_tilt += tilt_diff * smoothing
+            pan = self.current_pan + pan_diff * smoothing
+            tilt = self.current_tilt + tilt_diff * smoothing
             
             # Açıları sınırla
-            self.current_pan = max(self.pan_angle_min, min(self.pan_angle_max, self.current_pan))
-            self.current_tilt = max(self.tilt_angle_min, min(self.tilt_angle_max, self.current_tilt))
+            self.current_pan = pan_lo if pan < pan_lo else pan_hi if pan > pan_hi else pan
+            self.current_tilt = tilt_lo if tilt < tilt_lo else tilt_hi if tilt > tilt_hi else tilt
             
             # Servo motorları güncelle
-            pan_pulse = self._angle_to_pulse(self.current_pan, self.pan_min, self.pan_max, self.pan_angle_min, self.pan_angle_max)
-            tilt_pulse = self._angle_to_pulse(self.current_tilt, self.tilt_min, self.tilt_max, self.tilt_angle_min, self.tilt_angle_max)
-            
-            self._set_servo_pulse(self.pan_pin, pan_pulse)
-            self._set_servo_pulse(self.tilt_pin, tilt_pulse)
+            self._set_servo_pulses(self._pan_to_pulse(self.current_pan),
+                                   self._tilt_to_pulse(self.current_tilt))
             
             if self.simulation_mode and (abs(pan_diff) > 0.1 or abs(tilt_diff) > 0.1):
                 print(f"Servo pozisyonları - Pan: {self.current_pan:.1f}°, Tilt: {self.current_tilt:.1f}°")
             
-            # Güncelleme hızına göre bekle
-            last_update = current_time
-            time.sleep(1.0 / self.update_rate)
+            # Hedefe ulaşıldıysa yeni bir hedef gelene kadar uyu
+            if abs(pan_diff) < SERVO_DEADBAND and abs(tilt_diff) < SERVO_DEADBAND:
+                with self._cv:
+                    self._cv.wait_for(lambda: self._dirty or not self.is_running)
+                    self._dirty = False
+                # İlk adım tam bir periyot olarak sayılır
+                deadline_ns = time.perf_counter_ns()
+                last_update_ns = deadline_ns - period_ns
+                continue
+                
+            # Bir sonraki hedef zamana kadar bekle
+            last_update_ns = current_ns
+            deadline_ns += period_ns
+            remaining_ns = deadline_ns - time.perf_counter_ns()
+            
+            if remaining_ns < -period_ns:
+                # Bir periyottan fazla geride kalındı, yetişmeye çalışma
+                self.missed_ticks += 1
+                deadline_ns = time.perf_counter_ns()
+                continue
+                
+            # Çoğunu sleep ile bekle, son ~300 μs'yi aktif bekleyerek tamamla
+            if remaining_ns > 500_000:
+                time.sleep((remaining_ns - 300_000) / 1e9)
+            while time.perf_counter_ns() < deadline_ns:
+                pass
     
     def start(self):
         """Servo kontrolörünü başlat"""
@@ -186,7 +350,9 @@ class ServoController:
     
     def stop(self):
         """Servo kontrolörünü durdur"""
-        self.is_running = False
+        with self._cv:
+            self.is_running = False
+            self._cv.notify()
         if self.update_thread:
             self.update_thread.join(timeout=1.0)
             self.update_thread = None
@@ -194,13 +360,12 @@ class ServoController:
         # Servo motorları merkez pozisyona getir
         if not self.simulation_mode and RPI_AVAILABLE:
             try:
-                self._set_servo_pulse(self.pan_pin, self._angle_to_pulse(0, self.pan_min, self.pan_max, self.pan_angle_min, self.pan_angle_max))
-                self._set_servo_pulse(self.tilt_pin, self._angle_to_pulse(0, self.tilt_min, self.tilt_max, self.tilt_angle_min, self.tilt_angle_max))
+                self._center_servos()
                 time.sleep(0.5)  # Servo motorların hareket etmesi için bekle
                 
                 # Servo motorları kapat
-                self.pi.set_servo_pulsewidth(self.pan_pin, 0)
-                self.pi.set_servo_pulsewidth(self.tilt_pin, 0)
+                self._release_servo(self.pan_pin)
+                self._release_servo(self.tilt_pin)
                 self.pi.stop()
             except Exception as e:
                 print(f"Servo kapatılırken hata oluştu: {e}")
@@ -215,9 +380,12 @@ class ServoController:
             pan: Pan açısı (derece)
             tilt: Tilt açısı (derece)
         """
-        # Açıları sınırla
-        self.target_pan = max(self.pan_angle_min, min(self.pan_angle_max, pan))
-        self.target_tilt = max(self.tilt_angle_min, min(self.tilt_angle_max, tilt))
+        # Açıları sınırla ve güncelleme iş parçacığını uyandır
+        with self._cv:
+            self.target_pan = max(self.pan_angle_min, min(self.pan_angle_max, pan))
+            self.target_tilt = max(self.tilt_angle_min, min(self.tilt_angle_max, tilt))
+            self._dirty = True
+            self._cv.notify()
     
     def update_from_tracking(self, tracking_commands: Dict):
         """
@@ -242,5 +410,6 @@ class ServoController:
             'target_pan': self.target_pan,
             'target_tilt': self.target_tilt,
             'is_running': self.is_running,
+            'missed_ticks': self.missed_ticks,
             'simulation_mode': self.simulation_mode
         } 
\ No newline at end of file
@@ -2,13 +2,24 @@ import cv2
 import numpy as np
 import time
 import os
+import re
+import sys
+import sysconfig
 from detection.models.yolo_detector import YOLODetector
 from detection.tracking.kalman_tracker import KalmanTracker
 from vision.targeting.target_lock import TargetLockSystem
 from detection.qr.qr_detector import QRDetector
 from detection.qr.qr_processor import QRProcessor
 from vision.mission.mission_controller import MissionController, MissionState
+from vision.overlay import TextPatch, text_advance
 import argparse
+import signal
+import queue
+import threading
+
+# OpenCV builds with GStreamer support can capture and encode through
+# GStreamer pipelines (V4L2 capture, hardware H.264 encoder on the Pi)
+GSTREAMER_AVAILABLE = re.search(r'GStreamer:\s*YES', cv2.getBuildInformation()) is not None
 
 class UAVSystem:
     """
@@ -21,7 +32,11 @@ class UAVSystem:
                  frame_height: int = 720,
                  output_path: str = "output.mp4",
                  team_name: str = "Team_Name",
-                 match_number: int = 1):
+                 match_number: int = 1,
+                 inference_stride: int = 1,
+                 qr_stride: int = 1,
+                 display: bool = False,
+                 use_gstreamer: bool = False):
         """
         Initialize UAV system
         
@@ -33,9 +48,19 @@ class UAVSystem:
             output_path: Path to save output video
             team_name: Team name for video filename
             match_number: Match number for video filename
+            inference_stride: Run the detector every Nth frame, Kalman predictions
+                fill the frames in between and the boxes drawn on the last
+                detector frame follow them (1 = every frame)
+            qr_stride: Scan for QR codes every Nth frame, the last detections
+                are drawn again in between (1 = every frame)
+            display: Show the annotated frames in a window (off for headless runs)
+            use_gstreamer: Use GStreamer pipelines for capture and encoding when
+                OpenCV supports them
         """
         self.team_name = team_name
         self.match_number = match_number
+        self.display = display
+        self.stop_requested = False
         
         # Ensure minimum resolution
         self.frame_width = max(frame_width, 640)
@@ -43,13 +68,30 @@ class UAVSystem:
         
         # Initialize video capture
         self.video_source = video_source
-        try:
-            if video_source.isdigit():
-                self.cap = cv2.VideoCapture(int(video_source))
-            else:
-                self.cap = cv2.VideoCapture(video_source)
-        except:
-            raise ValueError(f"Could not open video source: {video_source}")
+        self.is_live = video_source.isdigit()
+        
+        if use_gstreamer and not GSTREAMER_AVAILABLE:
+            print("Warning: OpenCV was built without GStreamer, using the default backend")
+        self.use_gstreamer = use_gstreamer and GSTREAMER_AVAILABLE
+        
+        if self.use_gstreamer:
+            self.cap = cv2.VideoCapture(self._gst_capture_pipeline(), cv2.CAP_GSTREAMER)
+            if not self.cap.isOpened():
+                print("Warning: GStreamer capture pipeline failed, using the default backend")
+                self.use_gstreamer = False
+                
+        if not self.use_gstreamer:
+            try:
+                if video_source.isdigit():
+                    self.cap = cv2.VideoCapture(int(video_source))
+                else:
+                    self.cap = cv2.VideoCapture(video_source)
+            except:
+                raise ValueError(f"Could not open video source: {video_source}")
+        
+        # Live cameras: keep the driver queue short so frames don't go stale
+        if self.is_live:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             
         # Set frame size
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
@@ -74,17 +116,51 @@ class UAVSystem:
         date_str = time.strftime("%d_%m_%Y")
         self.output_path = f"{self.match_number}_{self.team_name}_{date_str}.mp4"
         
-        # Initialize video writer with MP4V codec
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        self.writer = cv2.VideoWriter(self.output_path, fourcc, self.fps,
-                                    (actual_width, actual_height))
+        # Initialize video writer: hardware H.264 through GStreamer if
+        # requested, otherwise the MP4V codec
+        self.writer = None
+        if self.use_gstreamer:
+            self.writer = cv2.VideoWriter(self._gst_writer_pipeline(), cv2.CAP_GSTREAMER, 0,
+                                          self.fps, (actual_width, actual_height), True)
+            if not self.writer.isOpened():
+                print("Warning: GStreamer encoder pipeline failed, using MP4V")
+                self.writer = None
+                
+        if self.writer is None:
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            self.writer = cv2.VideoWriter(self.output_path, fourcc, self.fps,
+                                        (actual_width, actual_height))
         
         if not self.writer.isOpened():
             raise ValueError("Could not initialize video writer. Please check codec support.")
+            
+        # Asynchronous writer: frames are queued for a dedicated thread, the
+        # queue absorbs encoder stalls (about a quarter second at 30 FPS)
+        self._write_queue = queue.Queue(maxsize=8)
+        self._write_thread = None
+        
+        # First writer error, reported at shutdown. The encoder thread keeps
+        # draining the queue after it, a dead consumer would block the
+        # processing loop and cleanup() on the full queue.
+        self._write_error = None
+        
+        # Capture buffers are preallocated and recycled instead of allocating
+        # a new frame per read: one per slot a frame can occupy (capture
+        # queue, writer queue, plus capture, processing and encoder)
+        self._capture_queue_size = 2
+        pool_size = self._capture_queue_size + self._write_queue.maxsize + 3
+        self._frame_pool = queue.Queue()
+        self._pool_ids = set()
+        for _ in range(pool_size):
+            buf = np.empty((actual_height, actual_width, 3), np.uint8)
+            self._pool_ids.add(id(buf))
+            self._frame_pool.put(buf)
         
         # Initialize components
         self.detector = YOLODetector(model_path)
         self.tracker = KalmanTracker()
+        self.inference_stride = max(1, inference_stride)
+        self._drawn_tracks = {}
         self.target_lock = TargetLockSystem(
             frame_width=actual_width,
             frame_height=actual_height
@@ -92,9 +168,17 @@ class UAVSystem:
         
         # Initialize QR and mission components
         self.qr_detector = QRDetector(debug_mode=True)
+        self.qr_stride = max(1, qr_stride)
+        self._qr_detections = []
         self.qr_processor = QRProcessor()
         self.mission_controller = MissionController()
         
+        # Statistics overlay: the labels are rendered once, only the values
+        # are drawn per frame
+        self._build_stats_overlay(actual_width)
+        self._last_stats_key = None
+        self._last_stats_text = None
+        
         # Performance monitoring
         self.prev_time = 0
         self.fps = 0
@@ -108,40 +192,215 @@ class UAVSystem:
         self.lock_history = []  # List to store lock history
         self.uav_stats = {}  # Dictionary to store per-UAV statistics
         
+        # Stale frame dropping (live sources only)
+        self.dropped_frames = 0
+        self.dropped_frames_window = 0
+        self.drop_log_time = time.time()
+        
+    def _gst_capture_pipeline(self) -> str:
+        """
+        Build the GStreamer capture pipeline for the video source
+        
+        Cameras keep only the newest buffer (drop=1 max-buffers=1); files are
+        decoded as fast as they are consumed, without dropping.
+        """
+        if self.is_live:
+            return (f"v4l2src device=/dev/video{self.video_source} ! "
+                    f"video/x-raw,width={self.frame_width},height={self.frame_height} ! "
+                    "videoconvert ! video/x-raw,format=BGR ! appsink drop=1 max-buffers=1")
+        return (f"filesrc location={self.video_source} ! decodebin ! "
+                "videoconvert ! video/x-raw,format=BGR ! appsink sync=false")
+        
+    def _gst_writer_pipeline(self) -> str:
+        """Build the GStreamer encoding pipeline (V4L2 hardware H.264 encoder, MP4 container)"""
+        return ("appsrc ! videoconvert ! v4l2h264enc ! h264parse ! "
+                f"mp4mux ! filesink location={self.output_path}")
+        
     def set_server_time(self, server_time: float):
         """Update server time"""
         self.server_time = server_time
         self.target_lock.set_server_time(server_time)
         
-    def _update_uav_stats(self, uav_id: str, lock_status: dict, position: tuple):
-        """Update statistics for a specific UAV"""
-        if uav_id not in self.uav_stats:
-            self.uav_stats[uav_id] = {
+    def _build_stats_overlay(self, frame_width: int):
+        """Render the static statistics labels into a patch for the top-right corner"""
+        labels = ["FPS: ", "Frames: ", "Locks: ", "Success Rate: ", "Mission: "]
+        
+        # Patch starts a few pixels left of the text, glyph strokes extend
+        # past the text origin
+        self._stats_x = frame_width - 250
+        height = 30 + (len(labels) - 1) * 25 + 10
+        self._stats_labels = TextPatch(255, height, x=self._stats_x - 5)
+        
+        # Values start at the label's advance width
+        self._stats_value_x = []
+        for i, label in enumerate(labels):
+            self._stats_labels.put_text(label, (5, 30 + (i * 25)), (0, 255, 0))
+            self._stats_value_x.append(self._stats_x + text_advance(label))
+        
+    def _draw_stats(self, frame: np.ndarray, values: list):
+        """Draw the statistics overlay with the given values onto the frame (in place)"""
+        self._stats_labels.draw(frame)
+        
+        for i, text in enumerate(values):
+            cv2.putText(frame, text,
+                       (self._stats_value_x[i], 30 + (i * 25)),
+                       cv2.FONT_HERSHEY_SIMPLEX,
+                       0.7, (0, 255, 0), 2)
+        
+    def _update_uav_stats(self, uav_id: str, lock_status: dict, position: tuple) -> dict:
+        """Update statistics for a specific UAV and return its stats entry"""
+        stats = self.uav_stats.get(uav_id)
+        if stats is None:
+            stats = self.uav_stats[uav_id] = {
                 'total_frames_tracked': 0,
                 'total_lock_attempts': 0,
                 'successful_locks': 0,
                 'total_lock_duration': 0.0,
-                'lock_positions': [],  # List of positions where locks occurred
+                'lock_positions': set(),  # Positions where locks occurred (0.1 px grid)
                 'average_confidence': 0.0,
                 'confidence_samples': 0
             }
         
-        stats = self.uav_stats[uav_id]
         stats['total_frames_tracked'] += 1
         
         if lock_status['is_locked']:
-            if position not in stats['lock_positions']:
-                stats['lock_positions'].append(position)
+            stats['lock_positions'].add((round(position[0], 1), round(position[1], 1)))
             stats['total_lock_duration'] = lock_status['lock_duration']
+        return stats
+        
+    def _release_frame(self, frame: np.ndarray):
+        """Return a capture buffer to the pool (other arrays are ignored)"""
+        if frame is not None and id(frame) in self._pool_ids:
+            self._frame_pool.put(frame)
+            
+    def _put_latest(self, frame_queue: queue.Queue, item):
+        """
+        Put an item into a bounded queue, dropping the oldest entry when full
+        
+        Used for live sources so the processing loop always gets the newest
+        frame instead of working through a backlog.
+        """
+        while True:
+            try:
+                frame_queue.put_nowait(item)
+                break
+            except queue.Full:
+                try:
+                    self._release_frame(frame_queue.get_nowait())
+                    self.dropped_frames += 1
+                    self.dropped_frames_window += 1
+                except queue.Empty:
+                    pass
+                    
+        # Log dropped frames once per second
+        now = time.time()
+        if now - self.drop_log_time >= 1.0:
+            if self.dropped_frames_window > 0:
+                print(f"Dropped {self.dropped_frames_window} stale frames in the last second")
+            self.dropped_frames_window = 0
+            self.drop_log_time = now
+            
+    def _put_blocking(self, frame_queue: queue.Queue, item) -> bool:
+        """Put an item into a queue, waiting for space until a stop is requested"""
+        while not self.stop_requested:
+            try:
+                frame_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+        
+    def _capture_worker(self, frame_queue: queue.Queue):
+        """
+        Read frames on a separate thread (pipeline stage 1)
+        
+        Live sources keep only the newest frames, video files are passed on
+        without dropping. None marks the end of the stream.
+        """
+        while not self.stop_requested:
+            try:
+                buf = self._frame_pool.get(timeout=0.1)
+            except queue.Empty:
+                continue
+                
+            ret, frame = self.cap.read(buf)
+            if not ret:
+                self._release_frame(buf)
+                break
+            if frame is not buf:
+                # Frame size changed and OpenCV allocated a new array
+                self._release_frame(buf)
+            if self.is_live:
+                self._put_latest(frame_queue, frame)
+            else:
+                self._put_blocking(frame_queue, frame)
+                
+        # The end marker must arrive even when stopping, drop a frame for it
+        if self.is_live or not self._put_blocking(frame_queue, None):
+            self._put_latest(frame_queue, None)
+            
+    def _encode_worker(self, output_queue: queue.Queue):
+        """
+        Write annotated frames to the output video (pipeline stage 3)
+        
+        Every frame is written, the recording has to be complete. None marks
+        the end of the stream. After a writer error the remaining frames are
+        only returned to the pool.
+        """
+        while True:
+            frame = output_queue.get()
+            if frame is None:
+                break
+            if self._write_error is None:
+                try:
+                    self.writer.write(frame)
+                except Exception as e:
+                    self._write_error = e
+                    print(f"Error: video writer failed, recording stopped: {e}")
+            self._release_frame(frame)
+            
+    def _check_free_threading(self):
+        """
+        Warn when a free-threaded (no-GIL) Python build runs with the GIL enabled
+        
+        On 3.13t the capture, encoder and servo threads run Python code in
+        parallel, but importing an extension that does not support free
+        threading silently re-enables the GIL. Standard builds are not reported.
+        """
+        if not sysconfig.get_config_var('Py_GIL_DISABLED'):
+            return
+        is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+        if is_gil_enabled is not None and is_gil_enabled():
+            print("Warning: free-threaded Python is running with the GIL enabled, "
+                  "pipeline threads will not run in parallel (set PYTHON_GIL=0)")
+            
+    def _request_stop(self, signum, frame):
+        """Signal handler, lets the run loop finish the current frame and exit"""
+        self.stop_requested = True
         
     def run(self):
         """Main processing loop"""
+        # Without a window there is no 'q' key, stop cleanly on Ctrl+C / SIGTERM
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        
+        self._check_free_threading()
+        
+        # Capture and encoding run on their own threads and overlap with the
+        # detection/tracking work done here
+        frame_queue = queue.Queue(maxsize=self._capture_queue_size)
+        capture_thread = threading.Thread(target=self._capture_worker, args=(frame_queue,), daemon=True)
+        self._write_thread = threading.Thread(target=self._encode_worker, args=(self._write_queue,), daemon=True)
+        capture_thread.start()
+        self._write_thread.start()
+        
         try:
-            while True:
-                # Read frame
-                ret, frame = self.cap.read()
-                if not ret:
+            while not self.stop_requested:
+                # Get newest frame
+                frame = frame_queue.get()
+                if frame is None:
                     break
+                captured = frame
                 
                 self.total_frames += 1
                 
@@ -154,20 +413,44 @@ class UAVSystem:
                 self.fps = 1 / (current_time - self.prev_time)
                 self.prev_time = current_time
                 
-                # Detect QR codes first
-                frame, qr_detections = self.qr_detector.detect(frame)
-                
-                # Process QR commands
-                for qr_detection in qr_detections:
-                    command_info = self.qr_processor.process_qr_data(qr_detection['data'])
-                    if command_info:
-                        self.mission_controller.process_command(command_info)
-                
-                # Detect objects
-                frame, detections = self.detector.detect(frame)
+                # Detect QR codes first (payloads rarely change between frames and
+                # repeated commands are dropped by the processor cooldown anyway)
+                if (self.total_frames - 1) % self.qr_stride == 0:
+                    frame, self._qr_detections = self.qr_detector.detect(frame, draw=True)
+                    
+                    # Process QR commands
+                    for qr_detection in self._qr_detections:
+                        command_info = self.qr_processor.process_qr_data(qr_detection['data'])
+                        if command_info:
+                            self.mission_controller.process_command(command_info)
+                else:
+                    # Commands are only processed on scanned frames, the
+                    # overlay is repeated so it does not blink in the video
+                    self.qr_detector.draw(frame, self._qr_detections)
                 
-                # Update tracker with detections
-                tracked_objects = self.tracker.update(detections)
+                # Detect objects (skipped frames coast on the Kalman prediction)
+                if (self.total_frames - 1) % self.inference_stride == 0:
+                    frame, detections = self.detector.detect(frame, draw=True)
+                    
+                    # Update tracker with detections
+                    tracked_objects = self.tracker.update(detections)
+                    
+                    # Tracks matched to a drawn detection keep their box on
+                    # the skipped frames, otherwise the boxes flicker in the video
+                    self._drawn_tracks = {
+                        obj_id: detection
+                        for detection in detections
+                        for obj_id, obj in tracked_objects.items()
+                        if np.array_equal(obj['bbox'], detection['bbox'])
+                    }
+                else:
+                    tracked_objects = self.tracker.predict()
+                    self.detector.draw(frame, [
+                        dict(detection, bbox=tracked_objects[obj_id]['bbox'],
+                             centroid=tracked_objects[obj_id]['centroid'])
+                        for obj_id, detection in self._drawn_tracks.items()
+                        if obj_id in tracked_objects
+                    ])
                 
                 # Update target lock status based on mission state
                 mission_status = self.mission_controller.get_mission_status()
@@ -184,27 +467,31 @@ class UAVSystem:
                     # Update statistics
                     if tracked_objects and lock_status['uav_id']:
                         # Get UAV position
-                        obj = list(tracked_objects.values())[0]
+                        obj = next(iter(tracked_objects.values()))
                         position = obj['centroid']
                         
                         # Update UAV specific stats
-                        self._update_uav_stats(lock_status['uav_id'], lock_status, position)
+                        uav_stats = self._update_uav_stats(lock_status['uav_id'], lock_status, position)
                         
                         # Update lock statistics
                         if lock_status['is_locked']:
                             self.lock_frames += 1
                             if self.lock_frames == 1:  # Just achieved lock
                                 self.successful_locks += 1
-                                # Record detailed lock information
+                                # Record detailed lock information (single clock read
+                                # so the milliseconds match the seconds)
+                                now = time.time()
+                                lt = time.localtime(now)
                                 lock_info = {
                                     'uav_id': lock_status['uav_id'],
-                                    'time': time.strftime('%H:%M:%S') + f'.{int((time.time() % 1) * 1000):03d}',
+                                    'time': "%02d:%02d:%02d.%03d" % (lt.tm_hour, lt.tm_min, lt.tm_sec,
+                                                                   int((now % 1) * 1000)),
                                     'duration': lock_status['lock_duration'],
                                     'position': position,
                                     'frame_number': self.total_frames
                                 }
                                 self.lock_history.append(lock_info)
-                                self.uav_stats[lock_status['uav_id']]['successful_locks'] += 1
+                                uav_stats['successful_locks'] += 1
                                 print(f"\nNew Lock Achieved!")
                                 print(f"UAV: {lock_status['uav_id']}")
                                 print(f"Time: {lock_info['time']}")
@@ -212,35 +499,42 @@ class UAVSystem:
                         else:
                             if self.lock_frames > 0:  # Was trying to lock
                                 self.lock_attempts += 1
-                                self.uav_stats[lock_status['uav_id']]['total_lock_attempts'] += 1
+                                uav_stats['total_lock_attempts'] += 1
                             self.lock_frames = 0
                 
-                # Draw enhanced statistics
-                stats_text = [
-                    f"FPS: {self.fps:.1f}",
-                    f"Frames: {self.total_frames}",
-                    f"Locks: {self.successful_locks}",
-                    f"Success Rate: {(self.successful_locks/max(1, self.lock_attempts))*100:.1f}%",
-                    f"Mission: {mission_status['current_state'].value}"
-                ]
+                # Draw enhanced statistics (lock and mission values only change
+                # on lock events, format them again only then)
+                stats_key = (self.successful_locks, self.lock_attempts, mission_status['current_state'])
+                if stats_key != self._last_stats_key:
+                    self._last_stats_key = stats_key
+                    self._last_stats_text = [
+                        f"{self.successful_locks}",
+                        f"{(self.successful_locks/max(1, self.lock_attempts))*100:.1f}%",
+                        f"{mission_status['current_state'].value}"
+                    ]
+                stats_values = [f"{self.fps:.1f}", f"{self.total_frames}"] + self._last_stats_text
+                self._draw_stats(frame, stats_values)
                 
-                for i, text in enumerate(stats_text):
-                    cv2.putText(frame, text,
-                               (frame.shape[1] - 250, 30 + (i * 25)),
-                               cv2.FONT_HERSHEY_SIMPLEX,
-                               0.7, (0, 255, 0), 2)
-                
-                # Write frame to output video
-                self.writer.write(frame)
+                # Hand frame to the encoder thread, it returns the capture
+                # buffer to the pool once written. If processing produced a
+                # new array, the capture buffer is free already.
+                if frame is not captured:
+                    self._release_frame(captured)
+                self._write_queue.put(frame)
                 
                 # Display frame
-                cv2.imshow('UAV Vision System', frame)
-                
-                # Check for exit
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
+                if self.display:
+                    cv2.imshow('UAV Vision System', frame)
+                    
+                    # Check for exit
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
                     
         finally:
+            # Stop capturing, the encoder is drained in cleanup()
+            self.stop_requested = True
+            capture_thread.join(timeout=1.0)
+            
             # Cleanup
             self.cleanup()
             
@@ -248,6 +542,8 @@ class UAVSystem:
             print(f"\nProcessing Complete!")
             print(f"Total Frames: {self.total_frames}")
             print(f"Successful Locks: {self.successful_locks}")
+            if self.is_live:
+                print(f"Dropped Stale Frames: {self.dropped_frames}")
             
             # Print QR statistics
             qr_stats = self.qr_detector.get_stats()
@@ -288,16 +584,24 @@ class UAVSystem:
                     print(f"   Position: ({lock['position'][0]:.1f}, {lock['position'][1]:.1f})")
                     print(f"   Frame: {lock['frame_number']}")
             
+            if self._write_error is not None:
+                print(f"\nOutput incomplete, the video writer failed: {self._write_error}")
             print(f"\nOutput saved to: {self.output_path}")
             print(f"Video format: {self.frame_width}x{self.frame_height} @ {self.fps}fps")
     
     def cleanup(self):
         """Cleanup resources"""
+        # Let the writer thread finish the queued frames before releasing
+        if getattr(self, '_write_thread', None) is not None:
+            self._write_queue.put(None)
+            self._write_thread.join()
+            self._write_thread = None
         if hasattr(self, 'cap'):
             self.cap.release()
         if hasattr(self, 'writer'):
             self.writer.release()
-        cv2.destroyAllWindows()
+        if getattr(self, 'display', False):
+            cv2.destroyAllWindows()
         
     def __del__(self):
         """Destructor to ensure cleanup"""
@@ -320,6 +624,14 @@ if __name__ == "__main__":
                       help='Team name for video filename')
     parser.add_argument('--match_number', type=int, default=1,
                       help='Match number for video filename')
+    parser.add_argument('--inference_stride', type=int, default=1,
+                      help='Run YOLO every Nth frame (Kalman prediction in between, boxes follow it)')
+    parser.add_argument('--qr_stride', type=int, default=1,
+                      help='Scan for QR codes every Nth frame, the last codes are drawn in between (5 is plenty on the Pi)')
+    parser.add_argument('--display', action='store_true',
+                      help='Show the output window (press q to quit)')
+    parser.add_argument('--gstreamer', action='store_true',
+                      help='Capture and encode through GStreamer pipelines (hardware H.264 on the Pi)')
     
     args = parser.parse_args()
     
@@ -331,7 +643,11 @@ if __name__ == "__main__":
         frame_height=args.height,
         team_name=args.team_name,
         match_number=args.match_number,
-        output_path=args.output
+        output_path=args.output,
+        inference_stride=args.inference_stride,
+        qr_stride=args.qr_stride,
+        display=args.display,
+        use_gstreamer=args.gstreamer
     )
     
     print("\nUAV Vision System Starting...")
@@ -339,6 +655,6 @@ if __name__ == "__main__":
     print(f"Model: {args.model}")
     print(f"Output: {args.output}")
     print(f"Resolution: {args.width}x{args.height}")
-    print("\nPress 'q' to quit\n")
+    print("\nPress 'q' to quit\n" if args.display else "\nPress Ctrl+C to quit\n")
     
     uav_system.run() 
\ No newline at end of file
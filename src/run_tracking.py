@@ -1,10 +1,13 @@
 import cv2
 import numpy as np
+import math
 import time
 import argparse
 import os
+import re
 import sys
 import threading
+import queue
 import signal
 
 # Proje kök dizinini Python yoluna ekle
@@ -14,24 +17,184 @@ from detection.tracking.kalman_tracker import KalmanTracker
 from vision.targeting.tracking_manager import TrackingManager
 from hardware.servo_controller import ServoController
 
-def load_yolo_model(model_path):
-    """YOLO modelini yükle"""
-    try:
-        # OpenCV DNN ile YOLO modelini yükle
-        net = cv2.dnn.readNet(model_path)
+# GStreamer destekli OpenCV derlemelerinde çıktı donanım H.264 kodlayıcıyla yazılabilir
+GSTREAMER_AVAILABLE = re.search(r'GStreamer:\s*YES', cv2.getBuildInformation()) is not None
+
+# ONNX Runtime opsiyonel, yoksa .onnx modeller de OpenCV DNN ile çalıştırılır
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
+# ONNX Runtime'ın ürettiği INT8 kalibrasyon tablosu (TensorRT motor önbelleğinde)
+INT8_CALIBRATION_TABLE = 'calibration.flatbuffers'
+
+def trt_cache_dir(model_path):
+    """Model için TensorRT motor ve kalibrasyon önbelleği dizini"""
+    return os.path.splitext(model_path)[0] + '_trt'
+
+def preprocess_frame(frame):
+    """Kareyi YOLO giriş blob'una (1x3x416x416 float32) dönüştür"""
+    # Yeniden boyutlandırma, BGR->RGB ve CHW dönüşümü uint8 üzerinde yapılır,
+    # ölçekleme tek geçişte float32'ye yazılır (doğrudan float blob üretmekten
+    # ~3 kat hızlı, sonuç aynı)
+    blob = cv2.dnn.blobFromImage(frame, 1.0, (416, 416), (0, 0, 0), True, crop=False, ddepth=cv2.CV_8U)
+    return np.multiply(blob, np.float32(0.00392), dtype=np.float32)
+
+class OrtNet:
+    """
+    ONNX Runtime oturumu için cv2.dnn.Net benzeri sarmalayıcı (setInput/forward)
+    
+    Sağlayıcı sırası TensorRT -> CUDA -> CPU, kurulu olmayanlar atlanır.
+    TensorRT motorları trt_cache_dir altında saklanır, sonraki açılışlarda
+    yeniden derlenmez. int8=True ile aynı dizindeki kalibrasyon tablosu
+    kullanılır (bkz. calibrate_int8), INT8 desteklemeyen katmanlar FP16'da kalır.
+    """
+    def __init__(self, model_path, use_fp16=True, int8=False):
+        available = ort.get_available_providers()
+        providers = []
+        if 'TensorrtExecutionProvider' in available:
+            cache_dir = trt_cache_dir(model_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            trt_options = {
+                'trt_fp16_enable': use_fp16,
+                'trt_engine_cache_enable': True,
+                'trt_engine_cache_path': cache_dir
+            }
+            if int8:
+                trt_options.update({
+                    'trt_int8_enable': True,
+                    'trt_int8_calibration_table_name': INT8_CALIBRATION_TABLE,
+                    'trt_int8_use_native_calibration_table': False
+                })
+            providers.append(('TensorrtExecutionProvider', trt_options))
+        elif int8:
+            print("Uyarı: INT8 çıkarım için TensorRT gerekli, FP16/FP32 kullanılacak")
+        providers += [p for p in ('CUDAExecutionProvider', 'CPUExecutionProvider') if p in available]
         
-        # CUDA kullanılabilirse GPU'yu kullan
-        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-        print("CUDA backend kullanılıyor")
-    except:
-        # CUDA kullanılamıyorsa CPU kullan
-        net = cv2.dnn.readNet(model_path)
-        print("CPU backend kullanılıyor")
+        self.session = ort.InferenceSession(model_path, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if model_input.type == 'tensor(float16)' else np.float32
+        self.blob = None
+        
+    def setInput(self, blob):
+        self.blob = blob.astype(self.input_dtype, copy=False)
+        
+    def forward(self, output_layers=None):
+        return self.session.run(None, {self.input_name: self.blob})
+
+def open_video_writer(output_path, fps, frame_size, gst_encoder=None):
+    """
+    Çıktı video yazıcısını aç
+    
+    gst_encoder verilirse (örn. v4l2h264enc, nvh264enc) kodlama GStreamer
+    üzerinden donanımda yapılır, açılamazsa yazılımsal XVID kullanılır.
+    """
+    if gst_encoder:
+        if GSTREAMER_AVAILABLE:
+            mux = 'avimux' if output_path.lower().endswith('.avi') else 'mp4mux'
+            pipeline = (f"appsrc ! videoconvert ! {gst_encoder} ! h264parse ! "
+                        f"{mux} ! filesink location={output_path}")
+            out = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, fps, frame_size, True)
+            if out.isOpened():
+                print(f"Donanım kodlayıcı kullanılıyor: {gst_encoder}")
+                return out
+            print("Uyarı: GStreamer kodlayıcı açılamadı, XVID kullanılacak")
+        else:
+            print("Uyarı: OpenCV GStreamer desteği olmadan derlenmiş, XVID kullanılacak")
+    
+    return cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'XVID'), fps, frame_size)
+
+def calibrate_int8(model_path, video_source, num_frames=500):
+    """
+    TensorRT INT8 için entropi kalibrasyon tablosu üret
+    
+    Videodan eşit aralıklarla num_frames kare alınır, detect_uavs ile aynı
+    ön işlemden geçirilir. Tablo trt_cache_dir altına yazılır, sonraki
+    çalıştırmalarda kalibrasyon tekrarlanmaz.
+    """
+    from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod,
+                                          create_calibrator, write_calibration_table)
+    
+    cap = cv2.VideoCapture(int(video_source) if video_source.isdigit() else video_source)
+    if not cap.isOpened():
+        print(f"Hata: Kalibrasyon videosu açılamadı: {video_source}")
+        return False
+    
+    # Kareleri tüm videoya yay (kamerada kare sayısı bilinmez, art arda alınır)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    step = max(1, total // num_frames) if total > 0 else 1
+    blobs = []
+    frame_id = 0
+    while len(blobs) < num_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_id % step == 0:
+            blobs.append(preprocess_frame(frame))
+        frame_id += 1
+    cap.release()
+    
+    if not blobs:
+        print("Hata: Kalibrasyon için kare okunamadı")
+        return False
+    
+    session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+    
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self.blobs = iter(blobs)
+            
+        def get_next(self):
+            blob = next(self.blobs, None)
+            return None if blob is None else {input_name: blob}
     
+    cache_dir = trt_cache_dir(model_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    print(f"INT8 kalibrasyonu: {len(blobs)} kare")
+    calibrator = create_calibrator(model_path,
+                                   augmented_model_path=os.path.join(cache_dir, 'augmented_model.onnx'),
+                                   calibrate_method=CalibrationMethod.Entropy)
+    calibrator.collect_data(FrameReader())
+    write_calibration_table(calibrator.compute_data(), dir=cache_dir)
+    return True
+
+def load_yolo_model(model_path, use_fp16=True, int8=False):
+    """YOLO modelini yükle"""
     # Sınıf isimlerini yükle (İHA tespiti için)
     classes = ["IHA"]
     
+    # ONNX modelleri ONNX Runtime ile çalıştır (OpenCV DNN CUDA backend'i
+    # bazı sürümlerde GPU'da hatalı güven değerleri üretiyor)
+    if ORT_AVAILABLE and model_path.lower().endswith('.onnx'):
+        net = OrtNet(model_path, use_fp16, int8)
+        print(f"ONNX Runtime kullanılıyor ({net.session.get_providers()[0]})")
+        return net, classes, None
+    
+    # OpenCV DNN ile YOLO modelini yükle
+    net = cv2.dnn.readNet(model_path)
+    
+    if int8:
+        print("Uyarı: INT8 yalnızca ONNX Runtime ile çalışan .onnx modellerde destekleniyor")
+    
+    # CUDA kullanılabilirse GPU'yu kullan
+    if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+        if use_fp16:
+            # FP16 hedefi Tensor Core'ları kullanır, konvolüsyon süresini
+            # yaklaşık yarıya indirir
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+            print("CUDA backend kullanılıyor (FP16)")
+        else:
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+            print("CUDA backend kullanılıyor")
+    else:
+        # CUDA kullanılamıyorsa CPU kullan
+        print("CPU backend kullanılıyor")
+    
     # Çıkış katmanlarını al
     layer_names = net.getLayerNames()
     output_layers = [layer_names[i - 1] for i in net.getUnconnectedOutLayers()]
@@ -39,77 +202,98 @@ def load_yolo_model(model_path):
     return net, classes, output_layers
 
 def detect_uavs(frame, net, output_layers, classes, conf_threshold=0.5):
-    """YOLO ile İHA'ları tespit et"""
+    """
+    YOLO ile İHA'ları tespit et
+    
+    Returns:
+        (K, 6) float32 dizi, satırlar [x1, y1, x2, y2, güven, sınıf_id]
+        (sınıf adı classes[int(sınıf_id)]); takipçiye doğrudan
+        KalmanTracker.update_array ile verilir
+    """
     height, width, _ = frame.shape
     
     # Görüntüyü YOLO için hazırla
-    blob = cv2.dnn.blobFromImage(frame, 0.00392, (416, 416), (0, 0, 0), True, crop=False)
-    net.setInput(blob)
+    net.setInput(preprocess_frame(frame))
     
     # Çıktıları al
     outs = net.forward(output_layers)
     
-    # Tespit edilen nesneleri işle
-    class_ids = []
-    confidences = []
-    boxes = []
+    # Tespit edilen nesneleri işle (satır satır döngü yerine tek seferde,
+    # ONNX çıktılarındaki toplu iş boyutu da düzleştirilir)
+    rows = np.concatenate([out.reshape(-1, out.shape[-1]) for out in outs], axis=0)
+    scores = rows[:, 5:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
     
-    for out in outs:
-        for detection in out:
-            scores = detection[5:]
-            class_id = np.argmax(scores)
-            confidence = scores[class_id]
-            
-            if confidence > conf_threshold:
-                # Nesne koordinatlarını hesapla
-                center_x = int(detection[0] * width)
-                center_y = int(detection[1] * height)
-                w = int(detection[2] * width)
-                h = int(detection[3] * height)
-                
-                # Dikdörtgen koordinatları
-                x = int(center_x - w / 2)
-                y = int(center_y - h / 2)
-                
-                boxes.append([x, y, w, h])
-                confidences.append(float(confidence))
-                class_ids.append(class_id)
+    keep = confidences > conf_threshold
+    if not keep.any():
+        return np.empty((0, 6), np.float32)
+    rows = rows[keep]
+    class_ids = class_ids[keep]
+    confidences = confidences[keep]
+    
+    # Nesne koordinatlarını hesapla
+    geometry = rows[:, :4] * np.array([width, height, width, height], np.float32)
+    center_x, center_y, w, h = geometry.astype(np.int32).T
+    
+    # Dikdörtgen koordinatları
+    x = (center_x - w / 2).astype(np.int32)
+    y = (center_y - h / 2).astype(np.int32)
+    boxes = np.stack([x, y, w, h], axis=1).tolist()
+    confidences = confidences.tolist()
     
     # Non-maximum suppression uygula
     indexes = cv2.dnn.NMSBoxes(boxes, confidences, conf_threshold, 0.4)
     
-    detections = []
-    for i in range(len(boxes)):
-        if i in indexes:
-            x, y, w, h = boxes[i]
-            label = classes[class_ids[i]]
-            confidence = confidences[i]
-            
-            # Tespit bilgilerini ekle
-            detections.append({
-                'bbox': [x, y, x+w, y+h],
-                'confidence': confidence,
-                'class': label
-            })
+    # NMSBoxes skor sırasıyla döner, tespitler giriş sırasında kalsın
+    keep = np.sort(np.asarray(indexes, np.int64).reshape(-1))
+    detections = np.empty((len(keep), 6), np.float32)
+    detections[:, 0] = x[keep]
+    detections[:, 1] = y[keep]
+    detections[:, 2] = x[keep] + w[keep]
+    detections[:, 3] = y[keep] + h[keep]
+    detections[:, 4] = np.asarray(confidences, np.float32)[keep]
+    detections[:, 5] = class_ids[keep]
     
     return detections
 
+def draw_hud(frame, lines, origin=(10, 390), line_height=30):
+    """Durum satırlarını karenin sol altına çiz"""
+    x, y = origin
+    for i, text in enumerate(lines):
+        cv2.putText(frame, text, (x, y + i * line_height),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
 def main():
     # Komut satırı argümanlarını ayarla
     parser = argparse.ArgumentParser(description='İHA Takip ve Kilitlenme Sistemi')
     parser.add_argument('--video', type=str, default='0', help='Video kaynağı (0=webcam, dosya yolu=video dosyası)')
-    parser.add_argument('--model', type=str, default='models/yolov5s.pt', help='YOLO model dosyası')
+    parser.add_argument('--model', type=str, default='models/yolov5s.pt', help='YOLO model dosyası (.onnx modeller ONNX Runtime ile çalışır)')
     parser.add_argument('--conf', type=float, default=0.5, help='Tespit güven eşiği')
     parser.add_argument('--output', type=str, default='output/tracking_output.avi', help='Çıktı video dosyası')
     parser.add_argument('--simulation', action='store_true', help='Servo simülasyon modunu zorla')
     parser.add_argument('--pan_pin', type=int, default=12, help='Pan servo pin numarası')
     parser.add_argument('--tilt_pin', type=int, default=13, help='Tilt servo pin numarası')
     parser.add_argument('--no_display', action='store_true', help='Görüntü gösterme')
+    parser.add_argument('--detect_interval', type=int, default=2, help='Her N karede bir tespit yap (aradaki karelerde Kalman tahmini kullanılır)')
+    parser.add_argument('--no_overlay', action='store_true', help='Karelere takip ve durum bilgisi çizme')
+    parser.add_argument('--hw_decode', action='store_true', help='Video dosyasını donanım kod çözücüyle oku (NVDEC/VA-API)')
+    parser.add_argument('--gst_encoder', type=str, default=None, help='GStreamer donanım H.264 kodlayıcısı (örn. v4l2h264enc, nvh264enc)')
+    parser.add_argument('--no_fp16', action='store_true', help='CUDA üzerinde FP16 yerine FP32 çıkarım kullan')
+    parser.add_argument('--int8', action='store_true', help='TensorRT INT8 çıkarım (.onnx model, kalibrasyon tablosu yoksa üretilir)')
+    parser.add_argument('--calib_video', type=str, default=None, help='INT8 kalibrasyon videosu (varsayılan: --video)')
+    parser.add_argument('--calib_frames', type=int, default=500, help='INT8 kalibrasyonunda kullanılacak kare sayısı')
     args = parser.parse_args()
     
     # Video kaynağını aç
     if args.video.isdigit():
         cap = cv2.VideoCapture(int(args.video))
+    elif args.hw_decode and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        # Donanım kod çözücü (NVDEC, VA-API, ...), yoksa FFmpeg yazılımla çözer
+        cap = cv2.VideoCapture(args.video, cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.get(cv2.CAP_PROP_HW_ACCELERATION) == cv2.VIDEO_ACCELERATION_NONE:
+            print("Uyarı: Donanım kod çözücü bulunamadı, yazılımsal çözme kullanılıyor")
     else:
         cap = cv2.VideoCapture(args.video)
     
@@ -124,11 +308,22 @@ def main():
     
     # Çıktı video yazıcısını ayarla
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    out = cv2.VideoWriter(args.output, cv2.VideoWriter_fourcc(*'XVID'), fps, (frame_width, frame_height))
+    out = open_video_writer(args.output, fps, (frame_width, frame_height), args.gst_encoder)
     
     # YOLO modelini yükle
     try:
-        net, classes, output_layers = load_yolo_model(args.model)
+        # INT8 kalibrasyon tablosu bir kez üretilir, sonra önbellekten okunur
+        int8 = args.int8
+        if (int8 and ORT_AVAILABLE and args.model.lower().endswith('.onnx') and
+                not os.path.exists(os.path.join(trt_cache_dir(args.model), INT8_CALIBRATION_TABLE))):
+            int8 = calibrate_int8(args.model, args.calib_video or args.video, args.calib_frames)
+        
+        net, classes, output_layers = load_yolo_model(args.model, use_fp16=not args.no_fp16, int8=int8)
+        
+        # İlk forward çağrısı CUDA/cuDNN başlatmasını yapar ve çok uzun sürer,
+        # FPS ölçümüne girmemesi için döngüden önce boş bir kareyle çalıştır
+        net.setInput(cv2.dnn.blobFromImage(np.zeros((416, 416, 3), np.uint8), 0.00392, (416, 416), (0, 0, 0), True, crop=False))
+        net.forward(output_layers)
     except Exception as e:
         print(f"Model yüklenirken hata oluştu: {e}")
         print("Varsayılan tespit kullanılacak")
@@ -144,7 +339,7 @@ def main():
         required_lock_time=5.0,
         max_pan_rate=30.0,
         max_tilt_rate=20.0,
-        debug_mode=True
+        debug_mode=not args.no_overlay
     )
     
     # Servo kontrolörünü oluştur
@@ -159,8 +354,20 @@ def main():
     
     # Çalışma değişkenleri
     frame_count = 0
-    start_time = time.time()
     running = True
+    is_live = args.video.isdigit()
+    detect_interval = max(1, args.detect_interval)
+    
+    # Boru hattı kuyrukları: yakalama -> tespit -> takip/servo/çıktı
+    frame_q = queue.Queue(maxsize=2)
+    det_q = queue.Queue(maxsize=2)
+    
+    # Yazma kuyruğu kodlayıcı gecikmelerini karşılar (30 FPS'te ~0.25 sn),
+    # kayıt eksiksiz olmalı, bu yüzden kare atılmaz
+    write_q = queue.Queue(maxsize=8)
+    
+    # Ekranda yalnızca en yeni kare gösterilir, eskisi beklemeden atılır
+    display_q = queue.Queue(maxsize=1)
     
     # Ctrl+C işleyicisi
     def signal_handler(sig, frame):
@@ -170,86 +377,216 @@ def main():
     
     signal.signal(signal.SIGINT, signal_handler)
     
-    print("İHA Takip ve Kilitlenme Sistemi başlatılıyor...")
+    def put_latest(q, item):
+        """Kuyruğa ekle, doluysa en eski öğeyi at (canlı kaynak en yeni kareyle çalışır)"""
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
     
-    try:
+    def put_blocking(q, item):
+        """Kuyrukta yer açılana kadar bekle (video dosyasında kare atlanmaz)"""
         while running:
-            # Kareyi oku
-            ret, frame = cap.read()
-            if not ret:
-                if args.video.isdigit():
-                    # Webcam için tekrar dene
-                    continue
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def put(q, item):
+        if is_live:
+            put_latest(q, item)
+        else:
+            put_blocking(q, item)
+    
+    def put_end(q):
+        # Akış sonu işareti (None) durdurulurken de ulaşmalı
+        if is_live or not put_blocking(q, None):
+            put_latest(q, None)
+    
+    def capture_loop():
+        """Kareleri ayrı thread'de oku (1. aşama)"""
+        nonlocal running
+        frame_id = 0
+        try:
+            while running:
+                ret, frame = cap.read()
+                if not ret:
+                    if is_live:
+                        # Webcam için tekrar dene
+                        continue
+                    else:
+                        # Video dosyası için çık
+                        break
+                
+                frame_id += 1
+                put(frame_q, (frame_id, frame))
+        except Exception as e:
+            print(f"Kare okuma hatası: {e}")
+            running = False
+        finally:
+            put_end(frame_q)
+    
+    def inference_loop():
+        """İHA tespitini ayrı thread'de yap (2. aşama)"""
+        nonlocal running
+        try:
+            while True:
+                item = frame_q.get()
+                if item is None:
+                    break
+                frame_id, frame = item
+                
+                # YOLO ile İHA'ları tespit et (atlanan karelerde None gönderilir,
+                # takipçi Kalman tahminiyle devam eder)
+                if (frame_id - 1) % detect_interval != 0:
+                    detections = None
+                elif net is not None:
+                    detections = detect_uavs(frame, net, output_layers, classes, args.conf)
                 else:
-                    # Video dosyası için çık
+                    # Test için simüle edilmiş tespit
+                    # Ekranın ortasında hareket eden bir İHA simüle et
+                    # (skaler math fonksiyonları NumPy'nin 0 boyutlu dizi yükünü taşımaz)
+                    center_x = int(frame_width/2 + 100 * math.sin(frame_id / 50.0))
+                    center_y = int(frame_height/2 + 80 * math.cos(frame_id / 30.0))
+                    w, h = 100, 60
+                    
+                    detections = np.array([[center_x - w//2, center_y - h//2,
+                                            center_x + w//2, center_y + h//2, 0.9, 0]], np.float32)
+                
+                put(det_q, (frame_id, frame, detections))
+        except Exception as e:
+            print(f"Tespit hatası: {e}")
+            running = False
+        finally:
+            put_end(det_q)
+    
+    def write_loop():
+        """İşlenmiş kareleri ayrı thread'de videoya yaz (4. aşama)"""
+        while True:
+            frame = write_q.get()
+            if frame is None:
+                break
+            try:
+                out.write(frame)
+            except Exception as e:
+                print(f"Video yazma hatası: {e}")
+    
+    def tracking_loop():
+        """Takip, servo ve kaplama işlerini ayrı thread'de yap (3. aşama)"""
+        nonlocal running, frame_count
+        try:
+            while running:
+                # Tespit edilmiş kareyi al
+                item = det_q.get()
+                if item is None:
                     break
-            
-            frame_count += 1
-            
-            # Her 30 karede bir FPS hesapla
-            if frame_count % 30 == 0:
-                elapsed_time = time.time() - start_time
-                fps_current = frame_count / elapsed_time
-                print(f"İşlenen kare: {frame_count}, FPS: {fps_current:.2f}")
-            
-            # YOLO ile İHA'ları tespit et
-            if net is not None:
-                detections = detect_uavs(frame, net, output_layers, classes, args.conf)
-            else:
-                # Test için simüle edilmiş tespit
-                # Ekranın ortasında hareket eden bir İHA simüle et
-                center_x = int(frame_width/2 + 100 * np.sin(frame_count / 50.0))
-                center_y = int(frame_height/2 + 80 * np.cos(frame_count / 30.0))
-                w, h = 100, 60
+                frame_id, frame, detections = item
                 
-                detections = [{
-                    'bbox': [center_x - w//2, center_y - h//2, center_x + w//2, center_y + h//2],
-                    'confidence': 0.9,
-                    'class': 'IHA'
-                }]
-            
-            # Kalman takipçisini güncelle
-            tracked_objects = tracker.update(detections)
-            
-            # Takip yöneticisini güncelle
-            commands, processed_frame = tracking_manager.update(tracked_objects, frame)
-            
-            # Servo kontrolörünü güncelle
-            servo_controller.update_from_tracking(commands)
-            
-            # Durum bilgilerini ekle
-            cv2.putText(processed_frame, f"Frame: {frame_count}", (10, 390),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
-            # Servo durumunu al
-            servo_status = servo_controller.get_status()
-            
-            # Servo bilgilerini ekle
-            cv2.putText(processed_frame, f"Servo Pan: {servo_status['current_pan']:.1f}°", (10, 420),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
-            cv2.putText(processed_frame, f"Servo Tilt: {servo_status['current_tilt']:.1f}°", (10, 450),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
-            # Görüntüyü göster
-            if not args.no_display:
-                cv2.imshow('İHA Takip ve Kilitlenme Sistemi', processed_frame)
+                frame_count += 1
+                
+                # Her 30 karede bir FPS hesapla
+                if frame_count % 30 == 0:
+                    elapsed_time = time.time() - start_time
+                    fps_current = frame_count / elapsed_time
+                    print(f"İşlenen kare: {frame_count}, FPS: {fps_current:.2f}")
+                
+                # Kalman takipçisini güncelle
+                if detections is None:
+                    tracked_objects = tracker.predict()
+                else:
+                    tracked_objects = tracker.update_array(detections)
+                
+                # Takip yöneticisini güncelle
+                commands, processed_frame = tracking_manager.update(tracked_objects, frame)
                 
-                # 'q' tuşuna basılırsa çık
+                # Servo kontrolörünü güncelle
+                servo_controller.update_from_tracking(commands)
+                
+                # Durum ve servo bilgilerini ekle (kaplama kapalıysa hiç çizilmez)
+                if not args.no_overlay:
+                    servo_status = servo_controller.get_status()
+                    draw_hud(processed_frame, [
+                        f"Frame: {frame_count}",
+                        f"Servo Pan: {servo_status['current_pan']:.1f}°",
+                        f"Servo Tilt: {servo_status['current_tilt']:.1f}°"
+                    ])
+                
+                # Görüntüyü göster (ana thread çizer)
+                if not args.no_display:
+                    put_latest(display_q, processed_frame)
+                
+                # Çıktı videosuna yaz (yazma thread'i kodlar)
+                write_q.put(processed_frame)
+        except Exception as e:
+            print(f"Hata oluştu: {e}")
+            running = False
+        finally:
+            put_latest(display_q, None)
+    
+    def display_loop():
+        """Kareleri göster (5. aşama), imshow/waitKey takip işini bekletmez"""
+        nonlocal running
+        try:
+            while True:
+                frame = display_q.get()
+                if frame is None:
+                    break
+                cv2.imshow('İHA Takip ve Kilitlenme Sistemi', frame)
+                
+                # 'q' tuşuna basılırsa tüm boru hattını durdur
                 if cv2.waitKey(1) & 0xFF == ord('q'):
+                    running = False
                     break
             
-            # Çıktı videosuna yaz
-            out.write(processed_frame)
+            cv2.destroyAllWindows()
+        except Exception as e:
+            print(f"Gösterim hatası: {e}")
+            running = False
     
-    except Exception as e:
-        print(f"Hata oluştu: {e}")
+    print("İHA Takip ve Kilitlenme Sistemi başlatılıyor...")
+    
+    # Yakalama, tespit ve takip kendi thread'lerinde çalışır. Gösterim ana
+    # thread'de kalır: HighGUI arka uçları (Cocoa, pip paketlerindeki Qt)
+    # pencere ve olay döngüsünü ana thread'de bekler
+    capture_thread = threading.Thread(target=capture_loop, daemon=True)
+    inference_thread = threading.Thread(target=inference_loop, daemon=True)
+    tracking_thread = threading.Thread(target=tracking_loop, daemon=True)
+    write_thread = threading.Thread(target=write_loop, daemon=True)
+    start_time = time.time()
+    capture_thread.start()
+    inference_thread.start()
+    tracking_thread.start()
+    write_thread.start()
+    
+    try:
+        if not args.no_display:
+            display_loop()
+        
+        # Zaman aşımlı join, Ctrl+C işleyicisinin ana thread'de çalışmasına izin verir
+        while tracking_thread.is_alive():
+            tracking_thread.join(timeout=0.1)
     
     finally:
+        # Thread'leri durdur, yakalama bitmeden kamera kapatılmamalı
+        running = False
+        capture_thread.join(timeout=1.0)
+        inference_thread.join(timeout=1.0)
+        tracking_thread.join(timeout=1.0)
+        
+        # Kuyruktaki kareler yazılana kadar bekle
+        write_q.put(None)
+        write_thread.join()
+        
         # Kaynakları serbest bırak
         cap.release()
         out.release()
-        cv2.destroyAllWindows()
         
         # Servo kontrolörünü durdur
         servo_controller.stop()
@@ -0,0 +1,33 @@
+"""
+Lazy Numba compilation of the scalar helpers used by the controllers
+"""
+
+# Modules whose helpers were already handled (compiled or left as Python)
+_compiled_modules = set()
+
+def compile_helpers(module_globals: dict, helpers, **options):
+    """
+    Swap in Numba compiled versions of module-level helpers, once per module
+
+    Numba is imported here rather than at module level (the import alone
+    takes ~0.3 s) and the explicit signatures compile eagerly, so the cost
+    is paid when the first controller is created instead of on its first
+    update. Without numba the Python versions are kept.
+
+    Args:
+        module_globals: globals() of the module that owns the helpers
+        helpers: (global name, Python function, signature) triples; the
+            signature is a Numba argument type string, e.g. "(float64,) * 7",
+            so callers do not need numba to build it
+        options: Extra njit options (cache=True is always set)
+    """
+    module = module_globals['__name__']
+    if module in _compiled_modules:
+        return
+    _compiled_modules.add(module)
+    try:
+        from numba import njit
+    except ImportError:
+        return
+    for name, func, signature in helpers:
+        module_globals[name] = njit(signature, cache=True, **options)(func)
\ No newline at end of file
@@ -1,7 +1,44 @@
+import math
 import numpy as np
 from typing import Dict, Tuple, Optional
-import cv2
 import time
+from .._jit import compile_helpers
+
+def _escape_vector(ox, oy, oz, ex, ey, ez, min_altitude, max_altitude,
+                   escape_speed, side, t):
+    """
+    Escape vector on scalars (3-element NumPy ops are dominated by call overhead)
+    
+    Returns:
+        Tuple of (vx, vy, vz), all zero when both positions coincide
+    """
+    dx = ox - ex
+    dy = oy - ey
+    dz = oz - ez
+    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+    if distance <= 0:
+        return 0.0, 0.0, 0.0
+        
+    # Normalized direction away from enemy plus perpendicular evasion
+    ux = dx / distance
+    uy = dy / distance
+    vx = 0.6 * ux + 0.4 * (side * -uy)
+    vy = 0.6 * uy + 0.4 * (side * ux)
+    
+    # Vertical component based on current altitude
+    if oz < min_altitude:
+        vz = 0.4
+    elif oz > max_altitude:
+        vz = -0.4
+    else:
+        vz = 0.2 * math.sin(t * 2)
+        
+    norm = math.sqrt(vx * vx + vy * vy + vz * vz)
+    speed = escape_speed * 1.5
+    return vx / norm * speed, vy / norm * speed, vz / norm * speed
+
+# Compiled with Numba when the first controller is created (see vision._jit)
+_JIT_HELPERS = [('_escape_vector', _escape_vector, '(float64,) * 11')]
 
 class EscapeController:
     """
@@ -25,14 +62,32 @@ class EscapeController:
         self.max_altitude = max_altitude
         self.escape_speed = escape_speed
         self.safe_distance = safe_distance
+        compile_helpers(globals(), _JIT_HELPERS)
         
         # Escape state
         self.is_escaping = False
         self.escape_start_time = None
         self.last_enemy_position = None
-        self.escape_trajectory = []
         self.current_maneuver = None
         
+        # Trajectory ring buffer (last 50 x,y points), drawn without conversion
+        self._trajectory = np.empty((50, 2), dtype=np.int32)
+        self._trajectory_idx = 0
+        self._trajectory_len = 0
+        
+    @property
+    def escape_trajectory(self) -> np.ndarray:
+        """Trajectory points from oldest to newest (N x 2 int32)"""
+        if self._trajectory_len < len(self._trajectory):
+            return self._trajectory[:self._trajectory_len]
+        return np.concatenate((self._trajectory[self._trajectory_idx:],
+                               self._trajectory[:self._trajectory_idx]))
+        
+    def _clear_trajectory(self):
+        """Forget all trajectory points"""
+        self._trajectory_idx = 0
+        self._trajectory_len = 0
+        
     def detect_enemy_lock(self, enemy_data: Dict) -> bool:
         """
         Detect if enemy UAV has locked onto us
@@ -46,12 +101,13 @@ class EscapeController:
         if not enemy_data:
             return False
             
-        # Check if enemy is in attack position
-        enemy_pos = np.array(enemy_data.get('position', [0, 0, 0]))
-        our_pos = np.array(enemy_data.get('our_position', [0, 0, 0]))
+        # Check if enemy is in attack position (positions are used as plain
+        # sequences, converting 3-element tuples to arrays costs more than the math)
+        enemy_pos = enemy_data.get('position', (0, 0, 0))
+        our_pos = enemy_data.get('our_position', (0, 0, 0))
         
         # Calculate distance and angle
-        distance = np.linalg.norm(enemy_pos - our_pos)
+        distance = math.dist(enemy_pos, our_pos)
         
         # Get enemy's facing direction if available
         enemy_direction = enemy_data.get('direction')
@@ -65,51 +121,69 @@ class EscapeController:
         
         # If enemy direction is available, check if they're facing us
         if enemy_direction is not None:
-            to_us = our_pos - enemy_pos
-            angle = np.arccos(np.dot(enemy_direction, to_us) / 
-                            (np.linalg.norm(enemy_direction) * np.linalg.norm(to_us)))
-            is_facing_us = abs(angle) < np.pi/3  # Increased angle threshold to 60 degrees
+            to_us = (our_pos[0] - enemy_pos[0], our_pos[1] - enemy_pos[1], our_pos[2] - enemy_pos[2])
+            norms = math.hypot(*enemy_direction) * distance
+            if norms > 0:
+                cos_angle = (enemy_direction[0] * to_us[0] + enemy_direction[1] * to_us[1] +
+                             enemy_direction[2] * to_us[2]) / norms
+                angle = math.acos(max(-1.0, min(1.0, cos_angle)))
+                is_facing_us = angle < math.pi/3  # Increased angle threshold to 60 degrees
+            else:
+                is_facing_us = False
         else:
             is_facing_us = True
             
         # Make detection more sensitive
         return (is_in_range and is_above) or (is_in_range and is_facing_us)
         
+    def detect_enemy_lock_batch(self, enemy_positions: np.ndarray,
+                                our_position: np.ndarray,
+                                enemy_directions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized detect_enemy_lock for several enemies at once
+        
+        Args:
+            enemy_positions: Enemy positions (N x 3)
+            our_position: Our position (x,y,z)
+            enemy_directions: Enemy facing directions (N x 3), rows with NaN
+                (or None for all) count as facing us
+            
+        Returns:
+            Boolean mask (N), True where that enemy has locked onto us
+        """
+        enemy_positions = np.asarray(enemy_positions, dtype=np.float64).reshape(-1, 3)
+        our_position = np.asarray(our_position, dtype=np.float64)
+        
+        # Squared distances avoid the square root for the range check
+        to_us = our_position - enemy_positions
+        dist2 = np.einsum('ij,ij->i', to_us, to_us)
+        is_in_range = dist2 < (self.safe_distance * 2.0) ** 2
+        is_above = enemy_positions[:, 2] > our_position[2]
+        
+        if enemy_directions is None:
+            return is_in_range
+            
+        # Facing us within 60 degrees: cos(angle) > 0.5, zero length is not facing
+        enemy_directions = np.asarray(enemy_directions, dtype=np.float64).reshape(-1, 3)
+        unknown = np.isnan(enemy_directions).any(axis=1)
+        dot = np.einsum('ij,ij->i', enemy_directions, to_us)
+        norms = np.sqrt(np.einsum('ij,ij->i', enemy_directions, enemy_directions) * dist2)
+        is_facing_us = unknown | (dot > 0.5 * norms)
+        
+        return is_in_range & (is_above | is_facing_us)
+        
     def calculate_escape_vector(self, our_position: np.ndarray, 
                               enemy_position: np.ndarray) -> np.ndarray:
         """Calculate optimal escape vector"""
-        # Get direction away from enemy
-        direction = our_position - enemy_position
-        distance = np.linalg.norm(direction)
-        
-        if distance > 0:
-            # Normalize direction
-            direction = direction / distance
-            
-            # Add stronger evasive maneuver
-            perp = np.array([-direction[1], direction[0], 0])
-            if not hasattr(self, 'last_perp') or np.random.random() < 0.1:
-                self.last_perp = 1 if np.random.random() < 0.5 else -1
-            
-            # Add perpendicular component for more aggressive evasion
-            direction = 0.6 * direction + 0.4 * (self.last_perp * perp)
-            
-            # Add vertical component based on current altitude
-            if our_position[2] < self.min_altitude:
-                direction[2] = 0.4  # Stronger upward movement
-            elif our_position[2] > self.max_altitude:
-                direction[2] = -0.4
-            else:
-                # Add oscillating vertical movement
-                direction[2] = 0.2 * np.sin(time.time() * 2)
-                
-            # Normalize final vector
-            direction = direction / np.linalg.norm(direction)
+        # Randomly switch the evasion side (random numbers stay in Python)
+        if not hasattr(self, 'last_perp') or np.random.random() < 0.1:
+            self.last_perp = 1 if np.random.random() < 0.5 else -1
             
-            # Apply higher escape speed
-            return direction * (self.escape_speed * 1.5)
-            
-        return np.zeros(3)
+        return np.array(_escape_vector(
+            float(our_position[0]), float(our_position[1]), float(our_position[2]),
+            float(enemy_position[0]), float(enemy_position[1]), float(enemy_position[2]),
+            self.min_altitude, self.max_altitude, self.escape_speed,
+            float(self.last_perp), time.time()))
         
     def update(self, enemy_data: Dict, our_position: Tuple[float, float, float],
                our_velocity: Tuple[float, float, float], 
@@ -126,58 +200,56 @@ class EscapeController:
         Returns:
             Tuple of (command dict, annotated frame)
         """
-        our_pos = np.array(our_position)
-        enemy_pos = np.array(enemy_data.get('position', [0, 0, 0]))
+        enemy_pos = enemy_data.get('position', (0, 0, 0))
         
         # Check for enemy lock
         enemy_lock = self.detect_enemy_lock(enemy_data)
         
-        # Initialize commands
-        commands = {
-            'escape': False,
-            'vector': np.zeros(3),
-            'message': 'Monitoring'
-        }
-        
         if enemy_lock:
             if not self.is_escaping:
                 self.is_escaping = True
                 self.escape_start_time = time.time()
-                self.escape_trajectory = []  # Reset trajectory on new escape
+                self._clear_trajectory()  # Reset trajectory on new escape
             
             # Calculate escape vector
-            escape_vector = self.calculate_escape_vector(our_pos, enemy_pos)
+            escape_vector = self.calculate_escape_vector(our_position, enemy_pos)
             
-            # Update commands
-            commands.update({
+            commands = {
                 'escape': True,
                 'vector': escape_vector,
                 'message': 'Executing escape maneuver'
-            })
+            }
             
-            # Store trajectory point (only x,y coordinates)
-            self.escape_trajectory.append([int(our_position[0]), int(our_position[1])])
-            
-            # Keep only last 50 points
-            if len(self.escape_trajectory) > 50:
-                self.escape_trajectory.pop(0)
+            # Store trajectory point (only x,y coordinates), the oldest of
+            # the last 50 points is overwritten
+            self._trajectory[self._trajectory_idx] = (int(our_position[0]), int(our_position[1]))
+            self._trajectory_idx = (self._trajectory_idx + 1) % len(self._trajectory)
+            self._trajectory_len = min(self._trajectory_len + 1, len(self._trajectory))
             
         else:
+            commands = {
+                'escape': False,
+                'vector': np.zeros(3),
+                'message': 'Monitoring'
+            }
+            
             # Reset escape state if we're safe
             self.is_escaping = False
             self.escape_start_time = None
-            self.escape_trajectory = []
+            self._clear_trajectory()
             
         # Visualize if frame provided
         if frame is not None:
+            # OpenCV is only needed for drawing
+            import cv2
+            
             # Draw enemy position
             cv2.circle(frame, (int(enemy_pos[0]), int(enemy_pos[1])), 
                       8, (0, 0, 255), -1)
             
             # Draw escape trajectory
-            if len(self.escape_trajectory) > 1:
-                points = np.array(self.escape_trajectory, dtype=np.int32)
-                cv2.polylines(frame, [points], False, (255, 0, 0), 2)
+            if self._trajectory_len > 1:
+                cv2.polylines(frame, [self.escape_trajectory], False, (255, 0, 0), 2)
             
             # Add status text
             cv2.putText(frame, f"Status: {commands['message']}", 
@@ -194,5 +266,5 @@ class EscapeController:
         self.is_escaping = False
         self.escape_start_time = None
         self.last_enemy_position = None
-        self.escape_trajectory = []
+        self._clear_trajectory()
         self.current_maneuver = None 
\ No newline at end of file
@@ -1,7 +1,37 @@
+import math
 import numpy as np
 from typing import Dict, Tuple, Optional
 import cv2
 import time
+from .._jit import compile_helpers
+
+# WeChat QR detector ships with opencv-contrib, it is faster and more robust
+# than the classic cv2.QRCodeDetector
+WECHAT_QR_AVAILABLE = hasattr(cv2, 'wechat_qrcode')
+
+def _dive_vector(ox, oy, oz, tx, ty, tz, sin_dive):
+    """
+    Unit dive vector on scalars (3-element NumPy ops are dominated by call overhead)
+    
+    Returns:
+        Tuple of (vx, vy, vz, distance), the vector is zero when distance is 0
+    """
+    dx = tx - ox
+    dy = ty - oy
+    dz = tz - oz
+    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+    if distance <= 0:
+        return 0.0, 0.0, 0.0, distance
+        
+    # Horizontal direction to target with the fixed dive angle
+    ux = dx / distance
+    uy = dy / distance
+    uz = -sin_dive  # negative for descent
+    norm = math.sqrt(ux * ux + uy * uy + uz * uz)
+    return ux / norm, uy / norm, uz / norm, distance
+
+# Compiled with Numba when the first controller is created (see vision._jit)
+_JIT_HELPERS = [('_dive_vector', _dive_vector, '(float64,) * 7')]
 
 class KamikazeController:
     """
@@ -11,7 +41,9 @@ class KamikazeController:
                  min_altitude: float = 20.0,     # Minimum safe altitude in meters
                  dive_angle: float = 45.0,       # Dive angle in degrees
                  approach_speed: float = 1.0,    # Approach speed factor
-                 qr_size: float = 2.5):          # QR code size in meters
+                 qr_size: float = 2.5,           # QR code size in meters
+                 qr_read_distance: float = 30.0,  # Max distance for QR scans in meters
+                 debug_mode: bool = True):
         """
         Initialize kamikaze controller
         
@@ -20,11 +52,17 @@ class KamikazeController:
             dive_angle: Required dive angle for QR reading
             approach_speed: Speed factor for approach
             qr_size: Size of the QR code target
+            qr_read_distance: Frames are only scanned for the QR code within
+                this distance to the target
+            debug_mode: Print the movement vector on every dive step
         """
         self.min_altitude = min_altitude
         self.dive_angle = dive_angle
         self.approach_speed = approach_speed
         self.qr_size = qr_size
+        self.qr_read_distance = qr_read_distance
+        self.debug_mode = debug_mode
+        compile_helpers(globals(), _JIT_HELPERS)
         
         # Attack state
         self.is_attacking = False
@@ -35,36 +73,22 @@ class KamikazeController:
         self.qr_read_successful = False
         
         # Initialize QR detector
-        self.qr_detector = cv2.QRCodeDetector()
+        if WECHAT_QR_AVAILABLE:
+            self.qr_detector = cv2.wechat_qrcode.WeChatQRCodeDetector()
+        else:
+            self.qr_detector = cv2.QRCodeDetector()
         
     def calculate_dive_path(self, our_position, target_position):
         """Calculate the dive path vector towards the target."""
-        # Convert positions to numpy arrays for vector calculations
-        our_pos = np.array(our_position)
-        target_pos = np.array(target_position)
+        vx, vy, vz, distance = _dive_vector(
+            float(our_position[0]), float(our_position[1]), float(our_position[2]),
+            float(target_position[0]), float(target_position[1]), float(target_position[2]),
+            math.sin(math.radians(self.dive_angle)))
         
-        # Calculate direction vector to target
-        direction = target_pos - our_pos
-        
-        # Normalize the direction vector
-        distance = np.linalg.norm(direction)
         if distance > 0:
-            direction = direction / distance
-            
-            # Calculate dive angle in radians
-            dive_angle = np.radians(self.dive_angle)
-            
-            # Create movement vector with dive angle
-            movement_vector = np.array([
-                direction[0],  # x component
-                direction[1],  # y component
-                -np.sin(dive_angle)  # z component (negative for descent)
-            ])
-            
-            # Normalize final vector
-            movement_vector = movement_vector / np.linalg.norm(movement_vector)
-            
-            print(f"Movement vector: {movement_vector}, Distance: {distance}")
+            movement_vector = np.array([vx, vy, vz])
+            if self.debug_mode:
+                print(f"Movement vector: {movement_vector}, Distance: {distance}")
             return movement_vector
         
         return np.array([0, 0, 0])
@@ -90,10 +114,21 @@ class KamikazeController:
                 self.qr_read_successful = True
                 return "SIMULATED_QR_CODE"
                 
-            decoded_data, points, _ = self.qr_detector.detectAndDecode(frame)
-            if decoded_data and points is not None:
-                self.qr_read_successful = True
-                return decoded_data
+            # The code is too small to decode from far away, skip the scan
+            if not hasattr(self, '_last_distance') or self._last_distance > self.qr_read_distance:
+                return None
+                
+            if WECHAT_QR_AVAILABLE:
+                # Returns the decoded strings and their corner points
+                decoded, _ = self.qr_detector.detectAndDecode(frame)
+                if decoded and decoded[0]:
+                    self.qr_read_successful = True
+                    return decoded[0]
+            else:
+                decoded_data, points, _ = self.qr_detector.detectAndDecode(frame)
+                if decoded_data and points is not None:
+                    self.qr_read_successful = True
+                    return decoded_data
         except Exception as e:
             print(f"QR detection error: {e}")
         return None
@@ -116,7 +151,7 @@ class KamikazeController:
         target_pos = target_data['position']
         
         # Calculate current distance to target
-        self._last_distance = np.linalg.norm(np.array(target_pos) - np.array(our_position))
+        self._last_distance = math.dist(target_pos, our_position)
         
         # Try to read QR code if frame provided
         qr_data = None
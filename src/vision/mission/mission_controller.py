@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import Dict, Optional
 import time
+from collections import deque
 from detection.qr.qr_processor import QRCommand
 
 class MissionState(Enum):
@@ -24,7 +25,16 @@ class MissionController:
         self.previous_state = None
         self.state_change_time = time.time()
         self.mission_data = {}
-        self.state_history = []
+        self.state_history = deque(maxlen=100)  # Last 100 state changes
+        
+        # Command type -> handler, one lookup instead of an if/elif chain
+        self._command_handlers = {
+            QRCommand.KAMIKAZE: self._handle_kamikaze,
+            QRCommand.ESCAPE: self._handle_escape,
+            QRCommand.LOCK: self._handle_lock,
+            QRCommand.MISSION_UPDATE: self._handle_mission_update,
+            QRCommand.STATUS_REQUEST: self._handle_status_request
+        }
         
     def update_state(self, new_state: MissionState):
         """
@@ -38,17 +48,13 @@ class MissionController:
             self.current_state = new_state
             self.state_change_time = time.time()
             
-            # Record state change
+            # Record state change (oldest entries drop out automatically)
             state_info = {
                 'state': new_state,
                 'timestamp': self.state_change_time,
                 'previous_state': self.previous_state
             }
             self.state_history.append(state_info)
-            
-            # Keep only last 100 state changes
-            if len(self.state_history) > 100:
-                self.state_history.pop(0)
     
     def process_command(self, command_info: Dict) -> bool:
         """
@@ -60,36 +66,43 @@ class MissionController:
         Returns:
             True if command was processed successfully
         """
-        command_type = command_info['type']
-        parameters = command_info['parameters']
+        handler = self._command_handlers.get(command_info['type'])
+        if handler is None:
+            return False
+        return handler(command_info['parameters'])
+    
+    def _handle_kamikaze(self, parameters: Dict) -> bool:
+        """Start a kamikaze attack on the locked/tracked target"""
+        if self.current_state in [MissionState.LOCKED, MissionState.TRACKING]:
+            self.update_state(MissionState.KAMIKAZE)
+            self.mission_data['kamikaze_target'] = parameters.get('target_id')
+            return True
+        return False
         
-        if command_type == QRCommand.KAMIKAZE:
-            if self.current_state in [MissionState.LOCKED, MissionState.TRACKING]:
-                self.update_state(MissionState.KAMIKAZE)
-                self.mission_data['kamikaze_target'] = parameters.get('target_id')
-                return True
-                
-        elif command_type == QRCommand.ESCAPE:
-            if self.current_state != MissionState.EMERGENCY:
-                self.update_state(MissionState.ESCAPING)
-                self.mission_data['escape_direction'] = parameters.get('direction')
-                return True
-                
-        elif command_type == QRCommand.LOCK:
-            if self.current_state == MissionState.TRACKING:
-                self.update_state(MissionState.LOCKING)
-                self.mission_data['lock_target'] = parameters.get('target_id')
-                return True
-                
-        elif command_type == QRCommand.MISSION_UPDATE:
-            self.mission_data.update(parameters)
+    def _handle_escape(self, parameters: Dict) -> bool:
+        """Start an escape maneuver unless in emergency"""
+        if self.current_state != MissionState.EMERGENCY:
+            self.update_state(MissionState.ESCAPING)
+            self.mission_data['escape_direction'] = parameters.get('direction')
             return True
-            
-        elif command_type == QRCommand.STATUS_REQUEST:
-            # Handle status request (could trigger telemetry)
+        return False
+        
+    def _handle_lock(self, parameters: Dict) -> bool:
+        """Start locking onto the tracked target"""
+        if self.current_state == MissionState.TRACKING:
+            self.update_state(MissionState.LOCKING)
+            self.mission_data['lock_target'] = parameters.get('target_id')
             return True
-            
         return False
+        
+    def _handle_mission_update(self, parameters: Dict) -> bool:
+        """Merge new mission parameters"""
+        self.mission_data.update(parameters)
+        return True
+        
+    def _handle_status_request(self, parameters: Dict) -> bool:
+        """Handle status request (could trigger telemetry)"""
+        return True
     
     def get_mission_status(self) -> Dict:
         """Get current mission status"""
@@ -98,7 +111,7 @@ class MissionController:
             'previous_state': self.previous_state,
             'state_duration': time.time() - self.state_change_time,
             'mission_data': self.mission_data,
-            'state_history': self.state_history
+            'state_history': self.state_history  # Called every frame, not copied
         }
     
     def reset(self):
@@ -107,4 +120,4 @@ class MissionController:
         self.previous_state = None
         self.state_change_time = time.time()
         self.mission_data = {}
-        self.state_history = [] 
\ No newline at end of file
+        self.state_history.clear() 
\ No newline at end of file
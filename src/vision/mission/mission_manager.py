@@ -1,11 +1,17 @@
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import defaultdict, deque
+from itertools import count
+import heapq
+import os
 import time
-import uuid
 from .mission_types import (
     MissionType, MissionPriority, MissionStatus,
     MissionData, MissionResult
 )
 
+# Statuses that move a mission to the history
+_ARCHIVED_STATUSES = frozenset({MissionStatus.COMPLETED, MissionStatus.FAILED})
+
 class MissionManager:
     """
     Mission management system for UAV autonomous operations
@@ -13,8 +19,36 @@ class MissionManager:
     def __init__(self):
         """Initialize mission manager"""
         self.active_missions: Dict[str, MissionData] = {}
-        self.mission_history: List[MissionData] = []
-        self.current_mission: Optional[MissionData] = None
+        # The current mission is tracked by ID and looked up in active_missions,
+        # so a mission moved to history can never be left as current
+        self._current_id: Optional[str] = None
+        
+        # Only the most recent finished missions are kept, statistics use
+        # running counts over all of them
+        self.mission_history: Deque[MissionData] = deque(maxlen=1024)
+        self._archived_count = 0
+        self._status_counts = dict.fromkeys(MissionStatus, 0)
+        
+        # The same history indexed by mission type and by status (in history
+        # order), missions evicted from the history are dropped here too.
+        # Missions stay mutable after archiving, so type and status are taken
+        # at archive time: _history_keys holds them per history entry and each
+        # index entry carries the other key for the combined filter
+        self._history_keys: Deque[Tuple[MissionType, MissionStatus]] = deque()
+        self._history_by_type: Dict[MissionType, Deque[Tuple[MissionStatus, MissionData]]] = defaultdict(deque)
+        self._history_by_status: Dict[MissionStatus, Deque[Tuple[MissionType, MissionData]]] = defaultdict(deque)
+        
+        # Max-heap of pending missions as (-priority value, creation order, id),
+        # ties go to the older mission. Entries are not removed when a mission
+        # leaves PENDING, they are discarded lazily when they reach the top
+        self._pending_heap: List[Tuple[int, int, str]] = []
+        self._creation_order: Dict[str, int] = {}
+        self._seq = 0
+        
+        # Mission IDs only need to be unique within this process, a counter
+        # with a per-process prefix is much cheaper than uuid4
+        self._id_prefix = f"m{os.getpid():x}-"
+        self._id_counter = count(1)
         
     def create_mission(self, 
                       mission_type: MissionType,
@@ -34,7 +68,7 @@ class MissionManager:
             Created mission data
         """
         # Generate unique mission ID
-        mission_id = str(uuid.uuid4())
+        mission_id = f"{self._id_prefix}{next(self._id_counter):x}"
         
         # Use default priority if not specified
         if priority is None:
@@ -53,8 +87,17 @@ class MissionManager:
         
         # Add to active missions
         self.active_missions[mission_id] = mission
+        self._creation_order[mission_id] = self._seq
+        self._seq += 1
+        self._push_pending(mission)
         return mission
     
+    def _push_pending(self, mission: MissionData):
+        """Add a heap entry for a pending mission"""
+        heapq.heappush(self._pending_heap, (-mission.priority.value,
+                                            self._creation_order[mission.mission_id],
+                                            mission.mission_id))
+    
     def update_mission_status(self, 
                             mission_id: str,
                             new_status: MissionStatus,
@@ -66,41 +109,85 @@ class MissionManager:
         mission = self.active_missions[mission_id]
         mission.update_status(new_status)
         
+        # A mission put back to pending needs a new heap entry (the old one may
+        # already have been discarded)
+        if new_status is MissionStatus.PENDING:
+            self._push_pending(mission)
+        
         # Handle completed missions
-        if new_status in [MissionStatus.COMPLETED, MissionStatus.FAILED]:
-            # Move to history
+        if new_status in _ARCHIVED_STATUSES:
+            # Move to history, the oldest mission of a full history is also
+            # the oldest one in its index lists
+            if len(self.mission_history) == self.mission_history.maxlen:
+                evicted_type, evicted_status = self._history_keys.popleft()
+                self._history_by_type[evicted_type].popleft()
+                self._history_by_status[evicted_status].popleft()
             self.mission_history.append(mission)
-            del self.active_missions[mission_id]
+            self._history_keys.append((mission.mission_type, new_status))
+            self._history_by_type[mission.mission_type].append((new_status, mission))
+            self._history_by_status[new_status].append((mission.mission_type, mission))
+            self._archived_count += 1
+            self._status_counts[new_status] += 1
             
             # Clear current mission if this was it
-            if self.current_mission and self.current_mission.mission_id == mission_id:
-                self.current_mission = None
+            if self._current_id == mission_id:
+                self._current_id = None
+            del self.active_missions[mission_id]
+            del self._creation_order[mission_id]
     
-    def get_highest_priority_mission(self) -> Optional[MissionData]:
-        """Get the highest priority pending mission"""
-        if not self.active_missions:
+    @property
+    def current_mission(self) -> Optional[MissionData]:
+        """Mission currently being executed"""
+        if self._current_id is None:
             return None
+        return self.active_missions.get(self._current_id)
+    
+    @current_mission.setter
+    def current_mission(self, mission: Optional[MissionData]):
+        self._current_id = mission.mission_id if mission else None
+    
+    def update_mission_priority(self, mission_id: str, priority: MissionPriority):
+        """
+        Change the priority of a mission
+        
+        This is the only supported way to change a managed mission's
+        priority, a direct assignment to mission.priority leaves the pending
+        queue with an entry for the old priority only
+        """
+        mission = self.active_missions.get(mission_id)
+        if mission is None:
+            return
             
-        # Sort by priority (CRITICAL = highest)
-        pending_missions = [
-            m for m in self.active_missions.values()
-            if m.status == MissionStatus.PENDING
-        ]
+        # The old heap entry no longer matches the priority and is dropped lazily
+        mission.priority = priority
+        if mission.status is MissionStatus.PENDING:
+            self._push_pending(mission)
+    
+    def get_highest_priority_mission(self) -> Optional[MissionData]:
+        """Get the highest priority pending mission"""
+        heap = self._pending_heap
+        pending = MissionStatus.PENDING
         
-        if not pending_missions:
-            return None
+        # Drop entries of missions that finished, started or changed priority
+        while heap:
+            neg_priority, _, mission_id = heap[0]
+            mission = self.active_missions.get(mission_id)
+            if (mission is not None and mission.status is pending
+                    and mission.priority.value == -neg_priority):
+                return mission
+            heapq.heappop(heap)
             
-        return max(pending_missions, key=lambda m: m.priority.value)
+        return None
     
     def interrupt_current_mission(self, reason: str = "Interrupted by higher priority mission"):
         """Interrupt current mission if any"""
         if self.current_mission:
             self.update_mission_status(
-                self.current_mission.mission_id,
+                self._current_id,
                 MissionStatus.INTERRUPTED,
                 MissionResult(False, reason)
             )
-            self.current_mission = None
+            self._current_id = None
     
     def update(self) -> Optional[MissionData]:
         """
@@ -111,36 +198,30 @@ class MissionManager:
         """
         # Check for higher priority mission
         highest_priority = self.get_highest_priority_mission()
+        current = self.current_mission
         
         if highest_priority:
-            if not self.current_mission:
+            if not current:
                 # No current mission, start the highest priority one
                 highest_priority.update_status(MissionStatus.ACTIVE)
-                self.current_mission = highest_priority
+                current = highest_priority
+                self._current_id = current.mission_id
             elif (highest_priority.priority.value > 
-                  self.current_mission.priority.value):
+                  current.priority.value):
                 # Interrupt current mission for higher priority
                 self.interrupt_current_mission()
                 highest_priority.update_status(MissionStatus.ACTIVE)
-                self.current_mission = highest_priority
+                current = highest_priority
+                self._current_id = current.mission_id
                 
-        return self.current_mission
+        return current
     
     def get_mission_stats(self) -> Dict:
         """Get mission statistics"""
-        total_missions = len(self.mission_history) + len(self.active_missions)
-        completed_missions = len([
-            m for m in self.mission_history
-            if m.status == MissionStatus.COMPLETED
-        ])
-        failed_missions = len([
-            m for m in self.mission_history
-            if m.status == MissionStatus.FAILED
-        ])
-        interrupted_missions = len([
-            m for m in self.mission_history
-            if m.status == MissionStatus.INTERRUPTED
-        ])
+        total_missions = self._archived_count + len(self.active_missions)
+        completed_missions = self._status_counts[MissionStatus.COMPLETED]
+        failed_missions = self._status_counts[MissionStatus.FAILED]
+        interrupted_missions = self._status_counts[MissionStatus.INTERRUPTED]
         
         return {
             'total_missions': total_missions,
@@ -155,11 +236,16 @@ class MissionManager:
                           mission_type: MissionType = None,
                           status: MissionStatus = None) -> List[MissionData]:
         """Get filtered mission history"""
-        history = self.mission_history.copy()
-        
+        if mission_type and status:
+            # Walk the shorter index and check the other filter
+            by_type = self._history_by_type.get(mission_type, ())
+            by_status = self._history_by_status.get(status, ())
+            if len(by_type) <= len(by_status):
+                return [m for s, m in by_type if s is status]
+            return [m for t, m in by_status if t is mission_type]
         if mission_type:
-            history = [m for m in history if m.mission_type == mission_type]
+            return [m for _, m in self._history_by_type.get(mission_type, ())]
         if status:
-            history = [m for m in history if m.status == status]
+            return [m for _, m in self._history_by_status.get(status, ())]
             
-        return history 
\ No newline at end of file
+        return list(self.mission_history) 
\ No newline at end of file
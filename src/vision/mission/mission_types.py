@@ -1,8 +1,13 @@
 from enum import Enum, auto
 from dataclasses import dataclass
 from typing import Dict, Optional
+import sys
 import time
 
+# __slots__ dataclasses (no per-instance __dict__, faster attribute access)
+# need Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 class MissionPriority(Enum):
     """Mission priority levels"""
     CRITICAL = auto()    # Immediate action required (e.g., being locked on)
@@ -39,9 +44,18 @@ class MissionStatus(Enum):
     FAILED = auto()      # Failed to complete
     INTERRUPTED = auto() # Interrupted by higher priority mission
 
-@dataclass
+# Statuses that end a mission (frozenset membership instead of a fresh list)
+_FINISHED_STATUSES = frozenset({MissionStatus.COMPLETED, MissionStatus.FAILED, MissionStatus.INTERRUPTED})
+
+@dataclass(**_DATACLASS_SLOTS)
 class MissionData:
-    """Mission data container"""
+    """
+    Mission data container
+    
+    Change the priority of a managed mission with
+    MissionManager.update_mission_priority, assigning priority directly is
+    not supported: the manager's pending queue would not see the change
+    """
     mission_id: str
     mission_type: MissionType
     priority: MissionPriority
@@ -59,11 +73,13 @@ class MissionData:
     def update_status(self, new_status: MissionStatus):
         """Update mission status"""
         self.status = new_status
-        if new_status in [MissionStatus.COMPLETED, MissionStatus.FAILED, MissionStatus.INTERRUPTED]:
+        if new_status in _FINISHED_STATUSES:
             self.completion_time = time.time()
 
 class MissionResult:
     """Mission execution result"""
+    __slots__ = ('success', 'message', 'data')
+    
     def __init__(self, 
                  success: bool,
                  message: str = "",
@@ -1,16 +1,83 @@
+import math
 import numpy as np
 import cv2
 from typing import Dict, List, Tuple, Optional
+import sys
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from .._jit import compile_helpers
+
+# __slots__ dataclasses (no per-instance __dict__, faster attribute access)
+# need Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+def _zone_repulsion(to_center, dist_sq, radii, radii_sq, safety_margin):
+    """
+    Repulsion from the zones around the UAV (vectorized NumPy version)
+    
+    Args:
+        to_center: 2D offsets from the UAV to the zone centers (N x 2)
+        dist_sq: Squared distances to the zone centers (N)
+        radii: Zone radii (N)
+        radii_sq: Squared zone radii (N)
+        safety_margin: Extra range around the zones for early avoidance
+        
+    Returns:
+        Tuple of (summed x, summed y, total influence, violated zone mask)
+    """
+    # Extended safety range for early avoidance
+    extended_range = radii + safety_margin
+    
+    # Zones in potential violation range push away from their center
+    # (linear repulsion, stronger when closer, no vertical component).
+    # The square root is only taken for these few zones
+    in_range = (dist_sq <= extended_range * extended_range) & (extended_range >= 0)
+    pushing = in_range & (dist_sq > 0)
+    avoid_x = avoid_y = total_influence = 0.0
+    if pushing.any():
+        distances = np.sqrt(dist_sq[pushing])
+        strength = 1.0 - distances / extended_range[pushing]
+        direction = -to_center[pushing] / distances[:, None]  # Away from center
+        avoid_x, avoid_y = (direction * strength[:, None]).sum(axis=0).tolist()
+        total_influence = float(strength.sum())
+    
+    # Check for actual violation using 2D distance
+    return avoid_x, avoid_y, total_influence, in_range & (dist_sq <= radii_sq)
+
+def _zone_repulsion_loop(to_center, dist_sq, radii, radii_sq, safety_margin):
+    """Same as _zone_repulsion as a plain loop, compiled with Numba"""
+    violated = np.zeros(dist_sq.shape[0], dtype=np.bool_)
+    avoid_x = 0.0
+    avoid_y = 0.0
+    total_influence = 0.0
+    for i in range(dist_sq.shape[0]):
+        extended_range = radii[i] + safety_margin
+        if extended_range < 0 or dist_sq[i] > extended_range * extended_range:
+            continue
+        if dist_sq[i] > 0:
+            distance = math.sqrt(dist_sq[i])
+            strength = 1.0 - distance / extended_range
+            avoid_x -= to_center[i, 0] / distance * strength
+            avoid_y -= to_center[i, 1] / distance * strength
+            total_influence += strength
+        violated[i] = dist_sq[i] <= radii_sq[i]
+    return avoid_x, avoid_y, total_influence, violated
+
+# Compiled with Numba when the first controller is created (see
+# vision._jit), the NumPy version is kept without numba since a Python loop
+# would be slower
+_JIT_HELPERS = [
+    ('_zone_repulsion', _zone_repulsion_loop,
+     'float32[:, :], float32[:], float32[:], float32[:], float64'),
+]
 
 class ZoneType(Enum):
     """Types of no-fly zones"""
     AIR_DEFENSE = "AIR_DEFENSE"      # Hava savunma sistemi
     SIGNAL_JAMMING = "SIGNAL_JAMMING"  # Sinyal karıştırma bölgesi
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class NoFlyZone:
     """No-fly zone data container"""
     zone_id: str
@@ -21,6 +88,10 @@ class NoFlyZone:
     is_active: bool = False
     total_violation_time: float = 0.0
     last_violation_check: Optional[float] = None
+    radius_sq: float = field(init=False)  # squared radius for sqrt-free checks
+    
+    def __post_init__(self):
+        self.radius_sq = self.radius * self.radius
 
 class NoFlyZoneController:
     """
@@ -30,7 +101,8 @@ class NoFlyZoneController:
     def __init__(self,
                  penalty_points_per_second: float = 5.0,
                  max_violation_time: float = 30.0,
-                 safety_margin: float = 3.0):  # Reduced from 5.0 to 3.0
+                 safety_margin: float = 3.0,  # Reduced from 5.0 to 3.0
+                 debug_mode: bool = False):
         """
         Initialize no-fly zone controller
         
@@ -38,11 +110,46 @@ class NoFlyZoneController:
             penalty_points_per_second: Penalty points per second in no-fly zone
             max_violation_time: Maximum allowed time in no-fly zones (seconds)
             safety_margin: Additional safety margin around zones (meters)
+            debug_mode: Print the violation time on every update, not only
+                when a zone is entered or left
         """
         self.zones: Dict[str, NoFlyZone] = {}
         self.penalty_points_per_second = penalty_points_per_second
         self.max_violation_time = max_violation_time
         self.safety_margin = safety_margin
+        self.debug_mode = debug_mode
+        compile_helpers(globals(), _JIT_HELPERS, nogil=True)
+        
+        # Avoidance vector returned by every call (refilled, not reallocated)
+        self._avoidance_vector = np.zeros(3)
+        
+        # Zone geometry as parallel arrays (one row per zone, in insertion
+        # order) so all zones are checked with a few vectorized operations.
+        # Capacity doubles when full. float32 halves the memory scanned per
+        # tick, its ~1e-7 relative precision is millimetres at 10 km (only
+        # positions beyond ~10^7 m would lose metre accuracy)
+        self._zone_ids: List[str] = []
+        self._zone_rows: Dict[str, int] = {}
+        self._centers = np.empty((8, 2), dtype=np.float32)
+        self._radii = np.empty(8, dtype=np.float32)
+        self._radii_sq = np.empty(8, dtype=np.float32)
+        
+        # Active zones (in insertion order), rebuilt by add_zone/activate_zone/
+        # deactivate_zone so per-tick loops never look at inactive zones
+        self._active_zones: Dict[str, NoFlyZone] = {}
+        
+        # Coarse grid over the active zones, cell -> zone rows (ascending).
+        # A zone is listed in every cell its extended disc (radius + safety
+        # margin) overlaps, so only the cell under the UAV needs checking
+        self._active_rows = np.empty(0, dtype=np.intp)
+        self._grid: Dict[Tuple[int, int], np.ndarray] = {}
+        self._cell_size = 1.0
+        self._grid_margin = safety_margin
+        self._no_rows = np.empty(0, dtype=np.intp)
+        
+        # Zones with a running violation check (last_violation_check set), the
+        # only zones besides those containing the UAV that update has to visit
+        self._open_checks = set()
         
         # Statistics
         self.total_penalty_points = 0.0
@@ -74,34 +181,113 @@ class NoFlyZoneController:
             activation_time=time.time()
         )
         self.zones[zone_id] = zone
+        
+        row = self._zone_rows.get(zone_id)
+        if row is None:
+            row = len(self._zone_ids)
+            if row == len(self._radii):
+                self._grow_zone_arrays()
+            self._zone_ids.append(zone_id)
+            self._zone_rows[zone_id] = row
+        self._centers[row] = center[:2]
+        self._radii[row] = radius
+        self._radii_sq[row] = zone.radius_sq
+        self._open_checks.discard(zone_id)
+        self._refresh_active_zones()
         return zone
     
+    def _grow_zone_arrays(self):
+        """Double the capacity of the zone arrays"""
+        capacity = 2 * len(self._radii)
+        centers = np.empty((capacity, 2), dtype=np.float32)
+        radii = np.empty(capacity, dtype=np.float32)
+        radii_sq = np.empty(capacity, dtype=np.float32)
+        count = len(self._zone_ids)
+        centers[:count] = self._centers[:count]
+        radii[:count] = self._radii[:count]
+        radii_sq[:count] = self._radii_sq[:count]
+        self._centers, self._radii, self._radii_sq = centers, radii, radii_sq
+    
+    def _refresh_active_zones(self):
+        """Rebuild the active zone cache after a zone was added or toggled"""
+        self._active_zones = {zone_id: zone for zone_id, zone in self.zones.items()
+                              if zone.is_active}
+        rows = [self._zone_rows[zone_id] for zone_id in self._active_zones]
+        self._active_rows = np.array(rows, dtype=np.intp)
+        
+        # Cells twice the largest extended radius keep each zone within 2x2 cells
+        # (the reach also covers the radius itself for a negative margin)
+        self._grid_margin = self.safety_margin
+        radii = self._radii[rows]
+        extended = np.maximum(radii + self.safety_margin, radii).tolist()
+        self._cell_size = cell = max(2.0 * max(extended, default=0.0), 1.0)
+        
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for row, reach in zip(rows, extended):
+            cx, cy = self._centers[row].tolist()
+            for gx in range(math.floor((cx - reach) / cell), math.floor((cx + reach) / cell) + 1):
+                for gy in range(math.floor((cy - reach) / cell), math.floor((cy + reach) / cell) + 1):
+                    grid.setdefault((gx, gy), []).append(row)
+        self._grid = {key: np.array(cell_rows, dtype=np.intp) for key, cell_rows in grid.items()}
+    
+    def _active_zone_offsets(self, point) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        2D offsets and squared distances from a point to the active zones near it
+        
+        Only zones from the grid cell under the point are returned, every zone
+        whose extended range contains the point is among them.
+        
+        Returns:
+            Tuple of (zone rows, offsets to centers (N x 2), squared distances (N))
+        """
+        # The grid depends on the safety margin
+        if self.safety_margin != self._grid_margin:
+            self._refresh_active_zones()
+            
+        cell = self._cell_size
+        rows = self._grid.get((math.floor(point[0] / cell), math.floor(point[1] / cell)),
+                              self._no_rows)
+        to_center = self._centers[rows] - np.array((point[0], point[1]), dtype=np.float32)
+        dist_sq = np.einsum('ij,ij->i', to_center, to_center)
+        return rows, to_center, dist_sq
+    
     def activate_zone(self, zone_id: str):
         """Activate a no-fly zone"""
         if zone_id in self.zones:
             self.zones[zone_id].is_active = True
             self.zones[zone_id].activation_time = time.time()
+            self._refresh_active_zones()
     
     def deactivate_zone(self, zone_id: str):
         """Deactivate a no-fly zone"""
         if zone_id in self.zones:
             self.zones[zone_id].is_active = False
+            self._refresh_active_zones()
     
     def is_point_in_zone(self, point: np.ndarray, zone: NoFlyZone) -> bool:
-        # Calculate 2D distance using only x,y coordinates
-        distance = np.sqrt((point[0] - zone.center[0])**2 + (point[1] - zone.center[1])**2)
-        
-        # Check if point is within zone radius
-        is_in_zone = distance <= zone.radius
+        # Compare the squared 2D distance (x,y only) with the squared radius
+        dx = point[0] - zone.center[0]
+        dy = point[1] - zone.center[1]
+        return dx * dx + dy * dy <= zone.radius_sq
+    
+    def points_in_any_zone(self, points: np.ndarray) -> np.ndarray:
+        """
+        Check many points against all active zones at once
         
-        print(f"\nDetailed zone check for {zone.zone_id}:")
-        print(f"Point coordinates: ({point[0]:.1f}, {point[1]:.1f})")
-        print(f"Zone center: ({zone.center[0]:.1f}, {zone.center[1]:.1f})")
-        print(f"Distance: {distance:.1f}")
-        print(f"Zone radius: {zone.radius}")
-        print(f"Is in zone: {is_in_zone}")
+        Args:
+            points: Candidate positions (M x 2, or M x 3 with z ignored)
+            
+        Returns:
+            Boolean mask (M), True where the point lies inside an active zone
+        """
+        points = np.asarray(points, dtype=np.float32)
+        rows = self._active_rows
         
-        return is_in_zone
+        # Squared 2D distances of every point to every zone center (M x Z)
+        centers = self._centers[rows]
+        dx = points[:, 0, None] - centers[:, 0]
+        dy = points[:, 1, None] - centers[:, 1]
+        return (dx * dx + dy * dy <= self._radii_sq[rows]).any(axis=1)
     
     def calculate_avoidance_vector(self, 
                                  current_pos: Tuple[float, float, float],
@@ -117,67 +303,49 @@ class NoFlyZoneController:
             target_pos: Optional target position to consider
             
         Returns:
-            Tuple of (avoidance vector, list of violated zone IDs)
+            Tuple of (avoidance vector, list of violated zone IDs). The vector
+            is reused by the next call, copy it to keep it
         """
-        current_pos = np.array(current_pos)
-        current_vel = np.array(current_vel)
-        violated_zones = []
-        
-        # Initialize repulsive vector
-        avoidance_vector = np.zeros(3)
-        total_influence = 0.0
+        # Direction and squared distance to every active zone center at once (2D only)
+        return self._avoidance_from_offsets(current_pos, target_pos,
+                                            self._active_zone_offsets(current_pos))
+    
+    def _avoidance_from_offsets(self, current_pos, target_pos, offsets) -> Tuple[np.ndarray, List[str]]:
+        """calculate_avoidance_vector on precomputed _active_zone_offsets"""
+        rows, to_center, dist_sq = offsets
         
-        for zone_id, zone in self.zones.items():
-            if not zone.is_active:
-                continue
-                
-            # Calculate distance and direction to zone center (2D only)
-            to_center = np.array(zone.center) - current_pos
-            to_center[2] = 0  # Ignore Z component for distance calculation
-            distance = np.linalg.norm(to_center[:2])  # 2D distance
-            
-            # Extended safety range for early avoidance
-            extended_range = zone.radius + self.safety_margin
-            
-            # Check if in potential violation range
-            if distance <= extended_range:
-                # Calculate repulsive force (stronger when closer)
-                if distance > 0:
-                    direction = -to_center / np.linalg.norm(to_center)  # Away from center
-                    direction[2] = 0  # Keep movement in 2D plane
-                    
-                    # Linear repulsion force
-                    strength = (1.0 - distance / extended_range)
-                    
-                    # No vertical boost - keep movement in 2D
-                    avoidance_vector += direction * strength
-                    total_influence += strength
-                
-                # Check for actual violation using 2D distance
-                if distance <= zone.radius:
-                    violated_zones.append(zone_id)
+        # Repulsive vector (x,y as plain floats, 3-element NumPy arithmetic
+        # is dominated by call overhead; z always stays 0) and violations
+        avoid_x, avoid_y, total_influence, violated = _zone_repulsion(
+            to_center, dist_sq, self._radii[rows], self._radii_sq[rows], float(self.safety_margin))
+        violated_zones = [self._zone_ids[row] for row in rows[violated]]
         
         # Normalize the avoidance vector if there were any influences
         if total_influence > 0:
-            avoidance_vector = avoidance_vector / total_influence
+            avoid_x /= total_influence
+            avoid_y /= total_influence
             
         # If we have a target position and are in avoidance mode
-        if target_pos is not None and np.any(avoidance_vector):
-            target_pos = np.array(target_pos)
-            to_target = target_pos - current_pos
-            to_target[2] = 0  # Keep movement in 2D plane
-            distance_to_target = np.linalg.norm(to_target[:2])
+        if target_pos is not None and (avoid_x or avoid_y):
+            # Keep movement in 2D plane
+            to_target_x = target_pos[0] - current_pos[0]
+            to_target_y = target_pos[1] - current_pos[1]
+            distance_to_target = math.hypot(to_target_x, to_target_y)
             
             if distance_to_target > 0:
-                target_direction = to_target / np.linalg.norm(to_target)
                 # Give even more weight to target direction
-                avoidance_vector = 0.5 * avoidance_vector + 0.5 * target_direction  # Changed from 0.7/0.3 to 0.5/0.5
+                avoid_x = 0.5 * avoid_x + 0.5 * to_target_x / distance_to_target  # Changed from 0.7/0.3 to 0.5/0.5
+                avoid_y = 0.5 * avoid_y + 0.5 * to_target_y / distance_to_target
         
         # Normalize final vector
-        magnitude = np.linalg.norm(avoidance_vector)
+        magnitude = math.hypot(avoid_x, avoid_y)
         if magnitude > 0:
-            avoidance_vector = avoidance_vector / magnitude
+            avoid_x /= magnitude
+            avoid_y /= magnitude
         
+        avoidance_vector = self._avoidance_vector
+        avoidance_vector[0] = avoid_x
+        avoidance_vector[1] = avoid_y
         return avoidance_vector, violated_zones
     
     def update(self, current_pos: Tuple[float, float, float]) -> Dict:
@@ -190,15 +358,46 @@ class NoFlyZoneController:
         Returns:
             Dictionary with violation status and penalties
         """
+        return self._update_from_offsets(self._active_zone_offsets(current_pos))
+    
+    def step(self,
+             current_pos: Tuple[float, float, float],
+             current_vel: Tuple[float, float, float],
+             target_pos: Optional[Tuple[float, float, float]] = None
+             ) -> Tuple[np.ndarray, List[str], Dict]:
+        """
+        update and calculate_avoidance_vector in one call
+        
+        The zone distances are computed once and shared by both.
+        
+        Args:
+            current_pos: Current UAV position
+            current_vel: Current UAV velocity
+            target_pos: Optional target position to consider
+            
+        Returns:
+            Tuple of (avoidance vector, list of violated zone IDs, update status dict),
+            the vector is reused as in calculate_avoidance_vector
+        """
+        offsets = self._active_zone_offsets(current_pos)
+        status = self._update_from_offsets(offsets)
+        avoidance_vector, violated_zones = self._avoidance_from_offsets(current_pos, target_pos, offsets)
+        return avoidance_vector, violated_zones, status
+    
+    def _update_from_offsets(self, offsets) -> Dict:
+        """update on precomputed _active_zone_offsets"""
         current_time = time.time()
         new_violations = set()
         
-        # Check each active zone
-        for zone_id, zone in self.zones.items():
-            if not zone.is_active:
-                continue
-                
-            if self.is_point_in_zone(current_pos, zone):
+        # Zones containing the current position, all checked at once
+        rows, _, dist_sq = offsets
+        inside = {self._zone_ids[row] for row in rows[dist_sq <= self._radii_sq[rows]]}
+        
+        # Check each active zone the UAV is in or has just left (in zone order)
+        candidates = inside | (self._open_checks & self._active_zones.keys())
+        for zone_id in sorted(candidates, key=self._zone_rows.get):
+            zone = self._active_zones[zone_id]
+            if zone_id in inside:
                 new_violations.add(zone_id)
                 
                 # Initialize last_violation_check if this is a new violation
@@ -210,15 +409,18 @@ class NoFlyZoneController:
                     time_delta = current_time - zone.last_violation_check
                     zone.total_violation_time += time_delta
                     self.total_penalty_points += time_delta * self.penalty_points_per_second
-                    print(f"Zone {zone_id} violation continues - Total time: {zone.total_violation_time:.1f}s")
+                    if self.debug_mode:
+                        print(f"Zone {zone_id} violation continues - Total time: {zone.total_violation_time:.1f}s")
                 
                 # Update last violation check time
                 zone.last_violation_check = current_time
+                self._open_checks.add(zone_id)
             else:
                 if zone.last_violation_check is not None:
                     print(f"Left zone {zone_id} - Total violation time: {zone.total_violation_time:.1f}s")
                 # Reset last_violation_check when leaving the zone
                 zone.last_violation_check = None
+                self._open_checks.discard(zone_id)
         
         # Update current violations
         self.current_violations = new_violations
@@ -247,23 +449,33 @@ class NoFlyZoneController:
         Returns:
             Annotated frame
         """
-        for zone_id, zone in self.zones.items():
-            if not zone.is_active:
-                continue
-                
-            # If we have camera matrix, project 3D circle to 2D
-            if camera_matrix is not None:
-                # Project center point
-                center_2d = camera_matrix @ np.array(zone.center)
-                center_2d = center_2d[:2] / center_2d[2]
-                center = tuple(map(int, center_2d))
-                
-                # Project radius (approximate)
-                radius_px = int(zone.radius * camera_matrix[0,0] / zone.center[2])
-            else:
-                # Simple 2D visualization
-                center = (int(zone.center[0]), int(zone.center[1]))
-                radius_px = int(zone.radius)
+        if not self._active_zones:
+            return frame
+            
+        zones = list(self._active_zones.values())
+        centers_3d = np.array([zone.center for zone in zones], dtype=np.float64)
+        radii = np.array([zone.radius for zone in zones], dtype=np.float64)
+        
+        # If we have camera matrix, project all 3D circles to 2D at once
+        if camera_matrix is not None:
+            # Project center points
+            projected = centers_3d @ np.asarray(camera_matrix, dtype=np.float64).T
+            centers_2d = projected[:, :2] / projected[:, 2:3]
+            
+            # Project radii (approximate)
+            radii_px = radii * camera_matrix[0, 0] / centers_3d[:, 2]
+        else:
+            # Simple 2D visualization
+            centers_2d = centers_3d[:, :2]
+            radii_px = radii
+        
+        # Pixel values as plain ints for the drawing calls
+        centers_px = centers_2d.astype(int).tolist()
+        radii_px = radii_px.astype(int).tolist()
+        
+        for zone, (cx, cy), radius_px in zip(zones, centers_px, radii_px):
+            zone_id = zone.zone_id
+            center = (cx, cy)
             
             # Draw zone circle
             color = (0, 0, 255) if zone_id in self.current_violations else (0, 165, 255)
@@ -291,5 +503,6 @@ class NoFlyZoneController:
             List of corridor dictionaries with start/end points
         """
         # TODO: Implement path finding between zones
-        # This will be used for finding optimal paths for target lock
+        # This will be used for finding optimal paths for target lock,
+        # candidate waypoints can be checked in one call with points_in_any_zone
         pass 
\ No newline at end of file
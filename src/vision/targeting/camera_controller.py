@@ -1,6 +1,46 @@
 import numpy as np
 import time
 from typing import Dict, Tuple, Optional, List
+from .history import HistoryRing
+from .._jit import compile_helpers
+
+# Takip geçmişi kayıt alanları; zaman float32'ye sığmadığı için float64
+_HISTORY_DTYPE = np.dtype([
+    ('time', np.float64),
+    ('position', np.float64, (2,)),
+    ('pan', np.float64),
+    ('tilt', np.float64),
+    ('in_zone', np.bool_),
+])
+
+def _pid_step(kp, ki, kd, min_output, max_output, previous_error, integral, error, dt):
+    """
+    Tek PID adımı, sadece skaler aritmetik
+    
+    Returns:
+        (çıkış, yeni integral) demeti
+    """
+    # Türev hesapla
+    derivative = (error - previous_error) / dt
+    
+    # PID çıkışını yeni integral ile hesapla
+    new_integral = integral + error * dt
+    output = (kp * error) + (ki * new_integral) + (kd * derivative)
+    
+    # Çıkışı sınırla (anti-windup: çıkış doygunken hata onu daha da
+    # doyuracak yöndeyse integral büyütülmez)
+    if output > max_output:
+        output = max_output
+        if ki * error > 0:
+            new_integral = integral
+    elif output < min_output:
+        output = min_output
+        if ki * error < 0:
+            new_integral = integral
+    return output, new_integral
+
+# Numba kuruluysa ilk kontrolör oluşturulurken derlenir (bkz. vision._jit)
+_JIT_HELPERS = [('_pid_step', _pid_step, '(float64,) * 9')]
 
 class PIDController:
     """
@@ -22,6 +62,7 @@ class PIDController:
         self.kd = kd
         self.min_output = min_output
         self.max_output = max_output
+        compile_helpers(globals(), _JIT_HELPERS)
         
         # PID durumu
         self.previous_error = 0.0
@@ -35,13 +76,14 @@ class PIDController:
         Args:
             setpoint: Hedef değer
             process_variable: Mevcut değer
-            current_time: Mevcut zaman (None ise otomatik alınır)
+            current_time: Mevcut zaman, saniye (None ise otomatik alınır)
             
         Returns:
             PID çıkış değeri
         """
+        # Monoton saat, sistem saati ayarlanınca (NTP) dt sıçramaz
         if current_time is None:
-            current_time = time.time()
+            current_time = time.monotonic()
             
         # İlk çağrı için zaman başlat
         if self.last_time is None:
@@ -57,17 +99,10 @@ class PIDController:
         # Hata hesapla
         error = setpoint - process_variable
         
-        # İntegral hesapla (anti-windup ile)
-        self.integral += error * dt
-        
-        # Türev hesapla
-        derivative = (error - self.previous_error) / dt if dt > 0 else 0
-        
-        # PID çıkışını hesapla
-        output = (self.kp * error) + (self.ki * self.integral) + (self.kd * derivative)
-        
-        # Çıkışı sınırla
-        output = max(self.min_output, min(self.max_output, output))
+        # Integral, türev ve sınırlanmış çıkış
+        output, self.integral = _pid_step(
+            self.kp, self.ki, self.kd, self.min_output, self.max_output,
+            self.previous_error, self.integral, error, dt)
         
         # Durumu güncelle
         self.previous_error = error
@@ -92,6 +127,7 @@ class CameraController:
                  target_zone_margin: float = 0.1,  # Hedef bölge marjı (merkeze göre)
                  max_pan_rate: float = 30.0,       # Saniyede maksimum pan açısı (derece)
                  max_tilt_rate: float = 20.0,      # Saniyede maksimum tilt açısı (derece)
+                 max_update_gap: float = 0.5,      # Bu süreden uzun aradan sonra baştan başla (saniye)
                  debug_mode: bool = True):
         """
         Kamera kontrolörünü başlat
@@ -102,6 +138,8 @@ class CameraController:
             target_zone_margin: Hedef bölge marjı (merkeze göre)
             max_pan_rate: Maksimum pan hızı (derece/saniye)
             max_tilt_rate: Maksimum tilt hızı (derece/saniye)
+            max_update_gap: İki güncelleme arasında bundan uzun süre geçerse
+                (takılma, hedef kaybı) PID'ler sıfırlanır ve ilk güncelleme gibi davranılır
             debug_mode: Hata ayıklama modu
         """
         self.frame_width = frame_width
@@ -109,21 +147,25 @@ class CameraController:
         self.target_zone_margin = target_zone_margin
         self.max_pan_rate = max_pan_rate
         self.max_tilt_rate = max_tilt_rate
+        self.max_update_gap = max_update_gap
         self.debug_mode = debug_mode
         
         # Kamera merkezi
         self.center_x = frame_width / 2
         self.center_y = frame_height / 2
         
-        # Hedef bölge (merkez etrafında)
+        # Hedef bölge (merkez etrafında), kontroller için (x1, y1, x2, y2)
+        # demeti ve dışarıdan kullanım için aynı değerlerle sözlük
         margin_x = frame_width * target_zone_margin
         margin_y = frame_height * target_zone_margin
-        self.target_zone = {
-            'x1': self.center_x - margin_x,
-            'y1': self.center_y - margin_y,
-            'x2': self.center_x + margin_x,
-            'y2': self.center_y + margin_y
-        }
+        self.target_zone_xyxy = (self.center_x - margin_x, self.center_y - margin_y,
+                                 self.center_x + margin_x, self.center_y + margin_y)
+        self.target_zone = dict(zip(('x1', 'y1', 'x2', 'y2'), self.target_zone_xyxy))
+        
+        # Görselleştirme için sabit piksel koordinatları
+        x1, y1, x2, y2 = self.target_zone_xyxy
+        self._target_zone_corners = ((int(x1), int(y1)), (int(x2), int(y2)))
+        self._center_pixel = (int(self.center_x), int(self.center_y))
         
         # PID kontrolörleri oluştur
         # Pan (yatay hareket) için PID
@@ -149,8 +191,18 @@ class CameraController:
         self.last_target_position = None
         self.current_pan_angle = 0.0
         self.current_tilt_angle = 0.0
-        self.tracking_history = []
         self.last_update_time = None
+        # Son çağrının zamanı; hedef merkezde beklerken last_update_time
+        # ilerlemez, aradaki boşluk bununla ölçülür
+        self._last_call_time = None
+        
+        # Takip geçmişi halka tamponu (son 100 kayıt)
+        self._history = HistoryRing(_HISTORY_DTYPE, 100)
+        
+    @property
+    def tracking_history(self) -> np.ndarray:
+        """Takip geçmişi, eskiden yeniye (_HISTORY_DTYPE alanlı yapısal dizi)"""
+        return self._history.to_array()
         
     def is_target_in_zone(self, target_position: Tuple[float, float]) -> bool:
         """
@@ -163,8 +215,8 @@ class CameraController:
             Hedef merkez bölgede ise True
         """
         x, y = target_position
-        return (self.target_zone['x1'] <= x <= self.target_zone['x2'] and
-                self.target_zone['y1'] <= y <= self.target_zone['y2'])
+        x1, y1, x2, y2 = self.target_zone_xyxy
+        return x1 <= x <= x2 and y1 <= y <= y2
                 
     def calculate_camera_movement(self, target_position: Tuple[float, float], 
                                 current_time: float = None) -> Dict:
@@ -173,13 +225,23 @@ class CameraController:
         
         Args:
             target_position: Hedef pozisyonu (x, y)
-            current_time: Mevcut zaman (None ise otomatik alınır)
+            current_time: Mevcut zaman, saniye (None ise time.monotonic() alınır)
             
         Returns:
             Kamera hareket komutları içeren sözlük
         """
+        # Zaman bir kez okunur, iki PID de aynı değeri kullanır
         if current_time is None:
-            current_time = time.time()
+            current_time = time.monotonic()
+            
+        # Uzun bir aradan sonra eski durumla devam etmek büyük bir dt ile açı
+        # sıçramasına ve integral birikmesine yol açar, baştan başla
+        if (self._last_call_time is not None and
+                current_time - self._last_call_time > self.max_update_gap):
+            self.last_update_time = None
+            self.pan_pid.reset()
+            self.tilt_pid.reset()
+        self._last_call_time = current_time
             
         # İlk güncelleme için zamanı başlat
         if self.last_update_time is None:
@@ -214,18 +276,9 @@ class CameraController:
         self.last_target_position = target_position
         self.last_update_time = current_time
         
-        # Takip geçmişine ekle
-        self.tracking_history.append({
-            'time': current_time,
-            'position': target_position,
-            'pan': self.current_pan_angle,
-            'tilt': self.current_tilt_angle,
-            'in_zone': in_zone
-        })
-        
-        # Geçmişi sınırla (son 100 kayıt)
-        if len(self.tracking_history) > 100:
-            self.tracking_history.pop(0)
+        # Takip geçmişine ekle, doluysa en eski kaydın üzerine yazılır
+        self._history.append(current_time, target_position, self.current_pan_angle,
+                             self.current_tilt_angle, in_zone)
             
         return {
             'pan': pan_rate,
@@ -235,13 +288,15 @@ class CameraController:
             'in_zone': in_zone
         }
         
-    def update(self, target_data: Dict, frame=None) -> Tuple[Dict, Optional[np.ndarray]]:
+    def update(self, target_data: Dict, frame=None,
+               current_time: float = None) -> Tuple[Dict, Optional[np.ndarray]]:
         """
         Kamera kontrolörünü güncelle
         
         Args:
             target_data: Hedef verisi (centroid, bbox, vb.)
             frame: İsteğe bağlı görüntü karesi
+            current_time: Mevcut zaman, saniye (None ise time.monotonic() alınır)
             
         Returns:
             Kamera komutları ve işlenmiş kare
@@ -259,7 +314,7 @@ class CameraController:
             return {'pan': 0.0, 'tilt': 0.0, 'in_zone': False, 'tracking': False}, frame
             
         # Kamera hareketini hesapla
-        camera_commands = self.calculate_camera_movement(target_position)
+        camera_commands = self.calculate_camera_movement(target_position, current_time)
         camera_commands['tracking'] = self.is_tracking
         
         # Görüntü karesi varsa, görselleştir
@@ -285,13 +340,11 @@ class CameraController:
         
         # Hedef bölgeyi çiz (yeşil/kırmızı)
         color = (0, 255, 0) if commands['in_zone'] else (0, 0, 255)
-        cv2.rectangle(frame, 
-                     (int(self.target_zone['x1']), int(self.target_zone['y1'])),
-                     (int(self.target_zone['x2']), int(self.target_zone['y2'])),
-                     color, 2)
+        cv2.rectangle(frame, *self._target_zone_corners, color, 2)
         
         # Merkezi çiz
-        cv2.circle(frame, (int(self.center_x), int(self.center_y)), 5, (255, 255, 255), -1)
+        center = self._center_pixel
+        cv2.circle(frame, center, 5, (255, 255, 255), -1)
         
         # Hedef pozisyonunu çiz
         cv2.circle(frame, (int(target_position[0]), int(target_position[1])), 8, color, -1)
@@ -303,13 +356,13 @@ class CameraController:
             tilt_length = commands['tilt'] * 5
             
             cv2.arrowedLine(frame, 
-                          (int(self.center_x), int(self.center_y)),
-                          (int(self.center_x + pan_length), int(self.center_y)),
+                          center,
+                          (int(self.center_x + pan_length), center[1]),
                           (255, 0, 0), 2)
             
             cv2.arrowedLine(frame, 
-                          (int(self.center_x), int(self.center_y)),
-                          (int(self.center_x), int(self.center_y + tilt_length)),
+                          center,
+                          (center[0], int(self.center_y + tilt_length)),
                           (0, 255, 0), 2)
         
         # Durum bilgilerini ekle
@@ -333,7 +386,8 @@ class CameraController:
         self.last_target_position = None
         self.current_pan_angle = 0.0
         self.current_tilt_angle = 0.0
-        self.tracking_history = []
+        self._history.clear()
         self.last_update_time = None
+        self._last_call_time = None
         self.pan_pid.reset()
         self.tilt_pid.reset() 
\ No newline at end of file
@@ -0,0 +1,38 @@
+import numpy as np
+
+class HistoryRing:
+    """
+    Sabit boyutlu geçmiş halka tamponu
+
+    Kayıtlar adlandırılmış ve tiplenmiş alanları olan yapısal bir diziye
+    yazılır (örn. history['pan'], history[-1]['is_locked']); her kayıt için
+    sözlük oluşturulmaz, doluysa en eski kaydın üzerine yazılır.
+    """
+    def __init__(self, dtype: np.dtype, capacity: int = 100):
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._idx = 0
+        self._len = 0
+
+    def append(self, *values):
+        """Alan sırasıyla bir kayıt ekle"""
+        self._buffer[self._idx] = values
+        self._idx = (self._idx + 1) % len(self._buffer)
+        self._len = min(self._len + 1, len(self._buffer))
+
+    def clear(self):
+        self._idx = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def to_array(self) -> np.ndarray:
+        """
+        Kayıtlar eskiden yeniye, her zaman kopya
+
+        Görünüm döndürülseydi get_status() anlık görüntüleri sonraki
+        kayıtlarla ve clear()/reset() sonrası sessizce değişirdi.
+        """
+        if self._len < len(self._buffer):
+            return self._buffer[:self._len].copy()
+        return np.concatenate((self._buffer[self._idx:], self._buffer[:self._idx]))
\ No newline at end of file
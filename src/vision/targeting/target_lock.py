@@ -2,6 +2,67 @@ import numpy as np
 import cv2
 from typing import Dict, List, Tuple, Optional
 import time
+from ..overlay import FONT, TextPatch, text_advance
+
+def _rect_dict(xyxy: Tuple) -> Dict:
+    """(x1, y1, x2, y2) rectangle as a dict keyed by 'x1'..'y2'"""
+    return dict(zip(('x1', 'y1', 'x2', 'y2'), xyxy))
+
+def _overlap_areas(bboxes: np.ndarray, xyxy: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intersection of each box with one rectangle
+    
+    Args:
+        bboxes: Boxes as rows of (x1, y1, x2, y2) (N x 4)
+        xyxy: Rectangle (x1, y1, x2, y2)
+        
+    Returns:
+        Tuple of (intersection areas, box areas), 0 area where they do not overlap
+    """
+    top_left = np.maximum(bboxes[:, :2], xyxy[:2])
+    bottom_right = np.minimum(bboxes[:, 2:4], xyxy[2:])
+    overlap = np.clip(bottom_right - top_left, 0, None)
+    size = bboxes[:, 2:4] - bboxes[:, :2]
+    return overlap[:, 0] * overlap[:, 1], size[:, 0] * size[:, 1]
+
+# Lock state changes returned by _lock_step
+_LOCK_KEEP = 0
+_LOCK_UPDATE = 1
+_LOCK_RESET = 2
+
+def _lock_step(in_lock_zone, hysteresis, lock_start_time, now, required_lock_time):
+    """
+    One step of the lock hysteresis on scalars
+    
+    Kept free of attributes and OpenCV so the state machine can be checked
+    on its own. It is not compiled with Numba, with this few operations the
+    call overhead of a jitted function is larger than the work.
+    
+    Args:
+        in_lock_zone: Target centroid is inside the lock zone
+        hysteresis: Current hysteresis counter (-3..5)
+        lock_start_time: Start of the running lock, 0 when there is none
+        now: Current monotonic time
+        required_lock_time: Lock duration needed to count as locked
+        
+    Returns:
+        Tuple of (hysteresis, lock_start_time, lock_duration, is_locked, action),
+        the lock values are only meaningful when action is _LOCK_UPDATE
+    """
+    if in_lock_zone:
+        hysteresis = min(hysteresis + 1, 5)
+        if hysteresis >= 2:
+            if lock_start_time == 0.0:
+                lock_start_time = now
+            lock_duration = now - lock_start_time
+            return (hysteresis, lock_start_time, lock_duration,
+                    lock_duration >= required_lock_time, _LOCK_UPDATE)
+        return hysteresis, lock_start_time, 0.0, False, _LOCK_KEEP
+        
+    hysteresis = max(hysteresis - 1, -3)
+    if hysteresis <= -3:
+        return hysteresis, 0.0, 0.0, False, _LOCK_RESET
+    return hysteresis, lock_start_time, 0.0, False, _LOCK_KEEP
 
 class TargetLockSystem:
     """
@@ -12,7 +73,8 @@ class TargetLockSystem:
                  frame_height: int = 720,
                  required_lock_time: float = 5.0,  # Changed to 5 seconds as per competition rules
                  total_lock_window: float = 5.0,
-                 lock_box_coverage: float = 0.70):  # Reduced coverage requirement to 70%
+                 lock_box_coverage: float = 0.70,  # Reduced coverage requirement to 70%
+                 enable_viz: bool = True):
         """
         Initialize target locking system
         
@@ -22,6 +84,8 @@ class TargetLockSystem:
             required_lock_time: Required continuous lock duration (5 seconds)
             total_lock_window: Total time window for locking (5 seconds)
             lock_box_coverage: Required target coverage inside lock box (70%)
+            enable_viz: Draw zones and target info on the frames, when False
+                update() only tracks the lock state and returns the frame as is
         """
         self.frame_width = frame_width
         self.frame_height = frame_height
@@ -29,6 +93,8 @@ class TargetLockSystem:
         self.total_lock_window = total_lock_window
         self.lock_box_coverage = lock_box_coverage
         self.lock_tolerance = 0.20  # Increased tolerance to 20%
+        self.enable_viz = enable_viz
+        self._build_status_overlay()
         
         # Define competition zones
         self._setup_competition_zones()
@@ -50,66 +116,98 @@ class TargetLockSystem:
         
     def _setup_competition_zones(self):
         """Setup competition-specific targeting zones"""
+        # Zones are kept as (x1, y1, x2, y2) tuples for the hit tests, the
+        # dict versions are built once for the lock status and external users
+        
         # Camera view area (AK) is full frame
-        self.camera_view = {
-            'x1': 0,
-            'y1': 0,
-            'x2': self.frame_width,
-            'y2': self.frame_height
-        }
+        self.camera_view_xyxy = (0, 0, self.frame_width, self.frame_height)
         
         # Target hit area (AV) - Yellow rectangle
         # 25% margin from left/right, 10% from top/bottom
         margin_x = int(0.25 * self.frame_width)
         margin_y = int(0.10 * self.frame_height)
-        self.target_hit_area = {
-            'x1': margin_x,
-            'y1': margin_y,
-            'x2': self.frame_width - margin_x,
-            'y2': self.frame_height - margin_y
-        }
+        self.target_hit_area_xyxy = (margin_x, margin_y,
+                                     self.frame_width - margin_x,
+                                     self.frame_height - margin_y)
         
         # Lock rectangle (AH) - Red rectangle
         # ≥5% margins within target hit area
         lock_margin_x = int(0.05 * self.frame_width)
         lock_margin_y = int(0.05 * self.frame_height)
-        self.lock_zone = {
-            'x1': self.target_hit_area['x1'] + lock_margin_x,
-            'y1': self.target_hit_area['y1'] + lock_margin_y,
-            'x2': self.target_hit_area['x2'] - lock_margin_x,
-            'y2': self.target_hit_area['y2'] - lock_margin_y
-        }
+        area_x1, area_y1, area_x2, area_y2 = self.target_hit_area_xyxy
+        self.lock_zone_xyxy = (area_x1 + lock_margin_x, area_y1 + lock_margin_y,
+                               area_x2 - lock_margin_x, area_y2 - lock_margin_y)
+        
+        self.camera_view = _rect_dict(self.camera_view_xyxy)
+        self.target_hit_area = _rect_dict(self.target_hit_area_xyxy)
+        self.lock_zone = _rect_dict(self.lock_zone_xyxy)
+        
+        # Pixel corners for drawing the static zones (drawing them with
+        # cv2.rectangle is cheaper than blending a cached overlay image)
+        self._target_area_corners = ((int(area_x1), int(area_y1)), (int(area_x2), int(area_y2)))
+        lock_x1, lock_y1, lock_x2, lock_y2 = self.lock_zone_xyxy
+        self._lock_zone_corners = ((int(lock_x1), int(lock_y1)), (int(lock_x2), int(lock_y2)))
+        self._lock_text_origin = (int(self.frame_width/2 - 200), int(self.frame_height - 50))
+        
+        # Target hit area grown by the point tolerance (1% of frame size) and
+        # by lock_tolerance, as (x1, y1, x2, y2). These only depend on the frame
+        # size and tolerances, call this method again if those change
+        tolerance_x = self.frame_width * 0.01
+        tolerance_y = self.frame_height * 0.01
+        self._point_area = (area_x1 - tolerance_x, area_y1 - tolerance_y,
+                            area_x2 + tolerance_x, area_y2 + tolerance_y)
+        
+        tolerance_x = self.frame_width * self.lock_tolerance
+        tolerance_y = self.frame_height * self.lock_tolerance
+        self._tolerant_area = (area_x1 - tolerance_x, area_y1 - tolerance_y,
+                               area_x2 + tolerance_x, area_y2 + tolerance_y)
+    
+    def _build_status_overlay(self):
+        """Render the static status labels into a patch for the top-left corner"""
+        labels = ["Objects: ", "Current UAV: ", "Lock time: ", "Locked: ", "Total Tracked: "]
+        
+        # Patch starts a few pixels left of the text, glyph strokes extend
+        # past the text origin
+        width = max(cv2.getTextSize(label, FONT, 0.7, 2)[0][0] for label in labels) + 10
+        height = 30 + (len(labels) - 1) * 30 + 10
+        self._status_labels = TextPatch(width, height, x=5)
+        
+        # Values start at the label's advance width
+        self._status_value_x = []
+        for i, label in enumerate(labels):
+            self._status_labels.put_text(label, (5, 30 + (i * 30)), (255, 255, 255))
+            self._status_value_x.append(10 + text_advance(label))
     
     def is_point_in_lock_zone(self, point: Tuple[float, float]) -> bool:
         """Check if point is within the lock zone"""
         x, y = point
-        return (self.lock_zone['x1'] < x < self.lock_zone['x2'] and
-                self.lock_zone['y1'] < y < self.lock_zone['y2'])
+        x1, y1, x2, y2 = self.lock_zone_xyxy
+        return x1 < x < x2 and y1 < y < y2
     
     def is_point_in_target_area(self, point: Tuple[float, float]) -> bool:
         """Check if point is within the target hit area"""
         x, y = point
-        # Add small tolerance (1% of frame size)
-        tolerance_x = self.frame_width * 0.01
-        tolerance_y = self.frame_height * 0.01
+        # Area includes a small tolerance (1% of frame size)
+        area_x1, area_y1, area_x2, area_y2 = self._point_area
         
-        return (self.target_hit_area['x1'] - tolerance_x <= x <= self.target_hit_area['x2'] + tolerance_x and
-                self.target_hit_area['y1'] - tolerance_y <= y <= self.target_hit_area['y2'] + tolerance_y)
+        return area_x1 <= x <= area_x2 and area_y1 <= y <= area_y2
     
     def is_bbox_in_target_area(self, bbox: np.ndarray) -> bool:
         """Check if bounding box overlaps significantly with target area"""
+        area_x1, area_y1, area_x2, area_y2 = self.target_hit_area_xyxy
+        
         # Calculate overlap area
-        x1 = max(bbox[0], self.target_hit_area['x1'])
-        y1 = max(bbox[1], self.target_hit_area['y1'])
-        x2 = min(bbox[2], self.target_hit_area['x2'])
-        y2 = min(bbox[3], self.target_hit_area['y2'])
+        x1 = max(bbox[0], area_x1)
+        y1 = max(bbox[1], area_y1)
+        x2 = min(bbox[2], area_x2)
+        y2 = min(bbox[3], area_y2)
         
         if x2 <= x1 or y2 <= y1:
             return False
             
         overlap_area = (x2 - x1) * (y2 - y1)
         bbox_area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
-        target_area = (self.target_hit_area['x2'] - self.target_hit_area['x1']) * (self.target_hit_area['y2'] - self.target_hit_area['y1'])
+        target_area = (area_x2 - area_x1) * (area_y2 - area_y1)
         
         # Calculate both relative to bbox and target area
         bbox_overlap_ratio = overlap_area / bbox_area
@@ -118,13 +216,33 @@ class TargetLockSystem:
         # Return true if either ratio is significant
         return bbox_overlap_ratio >= 0.3 or target_overlap_ratio >= 0.01
     
-    def _calculate_coverage(self, target_bbox: np.ndarray, lock_box: dict) -> float:
-        """Calculate what percentage of target is inside lock box"""
+    def is_bbox_in_target_area_batch(self, bboxes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized is_bbox_in_target_area for several boxes at once
+        
+        Args:
+            bboxes: Bounding boxes (N x 4)
+            
+        Returns:
+            Boolean mask (N), True where that box overlaps the target area
+        """
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        area_x1, area_y1, area_x2, area_y2 = self.target_hit_area_xyxy
+        target_area = (area_x2 - area_x1) * (area_y2 - area_y1)
+        
+        overlap_area, bbox_area = _overlap_areas(bboxes, self.target_hit_area_xyxy)
+        
+        # Ratio checks without division, any overlap implies a non-empty box
+        return (overlap_area > 0) & ((overlap_area >= 0.3 * bbox_area) |
+                                     (overlap_area >= 0.01 * target_area))
+    
+    def _calculate_coverage(self, target_bbox: np.ndarray, lock_box: Tuple) -> float:
+        """Calculate what percentage of target is inside lock box (x1, y1, x2, y2)"""
         # Calculate intersection
-        x1 = max(target_bbox[0], lock_box['x1'])
-        y1 = max(target_bbox[1], lock_box['y1'])
-        x2 = min(target_bbox[2], lock_box['x2'])
-        y2 = min(target_bbox[3], lock_box['y2'])
+        x1 = max(target_bbox[0], lock_box[0])
+        y1 = max(target_bbox[1], lock_box[1])
+        x2 = min(target_bbox[2], lock_box[2])
+        y2 = min(target_bbox[3], lock_box[3])
         
         if x2 <= x1 or y2 <= y1:
             return 0.0
@@ -134,66 +252,152 @@ class TargetLockSystem:
         
         return intersection_area / target_area if target_area > 0 else 0.0
         
+    def _calculate_coverage_batch(self, bboxes: np.ndarray, lock_box: Tuple) -> np.ndarray:
+        """Vectorized _calculate_coverage, fraction of each box (N x 4) inside lock box"""
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        intersection_area, target_area = _overlap_areas(bboxes, lock_box)
+        
+        coverage = np.zeros(len(bboxes))
+        np.divide(intersection_area, target_area, out=coverage, where=target_area > 0)
+        return coverage
+        
     def is_target_in_area(self, bbox):
         """Check if target is in area with increased tolerance"""
         x1, y1, x2, y2 = bbox
         
-        # Target area with 15% tolerance
-        area_x1 = self.target_hit_area['x1'] - self.frame_width * self.lock_tolerance
-        area_y1 = self.target_hit_area['y1'] - self.frame_height * self.lock_tolerance
-        area_x2 = self.target_hit_area['x2'] + self.frame_width * self.lock_tolerance
-        area_y2 = self.target_hit_area['y2'] + self.frame_height * self.lock_tolerance
+        # Target area with lock_tolerance
+        area_x1, area_y1, area_x2, area_y2 = self._tolerant_area
         
         # Check if any part of the bbox overlaps with target area
         return not (x2 < area_x1 or x1 > area_x2 or y2 < area_y1 or y1 > area_y2)
     
-    def update(self, tracked_objects, frame):
-        """Update target lock status with hysteresis"""
-        self.frame = frame.copy()
-        
-        # Draw target area first (yellow)
-        cv2.rectangle(self.frame, 
-                     (int(self.target_hit_area['x1']), int(self.target_hit_area['y1'])),
-                     (int(self.target_hit_area['x2']), int(self.target_hit_area['y2'])), 
-                     (0, 255, 255), 2)
-        
-        # Draw lock zone (red/green based on lock status)
-        color = (0, 255, 0) if self.is_locked else (0, 0, 255)
-        cv2.rectangle(self.frame, 
-                     (int(self.lock_zone['x1']), int(self.lock_zone['y1'])),
-                     (int(self.lock_zone['x2']), int(self.lock_zone['y2'])), 
-                     color, 2)
+    def evaluate_target(self, bbox, centroid) -> Tuple[bool, bool, float, float]:
+        """
+        Check a target against all zones in one pass
+        
+        Args:
+            bbox: Target bounding box (x1, y1, x2, y2)
+            centroid: Target center (x, y)
+            
+        Returns:
+            Tuple of (in_lock_zone, in_target_area, lock_coverage,
+            target_overlap_ratio), same values as is_point_in_lock_zone,
+            is_target_in_area, _calculate_coverage against the lock zone and
+            the box overlap ratio of is_bbox_in_target_area
+        """
+        x, y = centroid
+        x1, y1, x2, y2 = bbox
+        lock_x1, lock_y1, lock_x2, lock_y2 = self.lock_zone_xyxy
+        
+        in_lock_zone = lock_x1 < x < lock_x2 and lock_y1 < y < lock_y2
+        
+        area_x1, area_y1, area_x2, area_y2 = self._tolerant_area
+        in_target_area = not (x2 < area_x1 or x1 > area_x2 or y2 < area_y1 or y1 > area_y2)
+        
+        # Overlaps relative to the box area
+        bbox_area = (x2 - x1) * (y2 - y1)
+        if bbox_area <= 0:
+            return in_lock_zone, in_target_area, 0.0, 0.0
+            
+        overlap_w = min(x2, lock_x2) - max(x1, lock_x1)
+        overlap_h = min(y2, lock_y2) - max(y1, lock_y1)
+        lock_coverage = overlap_w * overlap_h / bbox_area if overlap_w > 0 and overlap_h > 0 else 0.0
+        
+        area_x1, area_y1, area_x2, area_y2 = self.target_hit_area_xyxy
+        overlap_w = min(x2, area_x2) - max(x1, area_x1)
+        overlap_h = min(y2, area_y2) - max(y1, area_y1)
+        target_overlap_ratio = overlap_w * overlap_h / bbox_area if overlap_w > 0 and overlap_h > 0 else 0.0
+        
+        return in_lock_zone, in_target_area, lock_coverage, target_overlap_ratio
+    
+    def update(self, tracked_objects, frame, inplace: bool = True):
+        """
+        Update target lock status with hysteresis
+        
+        Args:
+            tracked_objects: Tracked objects keyed by ID
+            frame: Video frame to annotate
+            inplace: Draw on frame itself, pass False if the caller still
+                needs the frame without annotations (costs a full frame copy)
+            
+        Returns:
+            Tuple of (annotated frame, lock status dict)
+        """
+        self.frame = frame if inplace or not self.enable_viz else frame.copy()
+        
+        if self.enable_viz:
+            # Draw target area first (yellow)
+            cv2.rectangle(self.frame, *self._target_area_corners, (0, 255, 255), 2)
+            
+            # Draw lock zone (red/green based on lock status)
+            color = (0, 255, 0) if self.is_locked else (0, 0, 255)
+            cv2.rectangle(self.frame, *self._lock_zone_corners, color, 2)
         
         if not tracked_objects:
-            self.lock_hysteresis = max(self.lock_hysteresis - 1, -3)
-            if self.lock_hysteresis <= -3:
-                self.reset_lock()
+            self._update_lock_state(False, None, None)
             return self.frame, self._get_lock_status()
         
         # Get the first (and only) tracked object
-        obj_id = list(tracked_objects.keys())[0]
-        obj = tracked_objects[obj_id]
+        obj_id, obj = next(iter(tracked_objects.items()))
         bbox = obj['bbox']
-        conf = obj['confidence']
         centroid = obj['centroid']
         
-        # Assign or get UAV ID
-        if obj_id not in self.tracked_uavs:
+        # Assign or get UAV ID (the record is looked up once per frame)
+        uav_info = self.tracked_uavs.get(obj_id)
+        if uav_info is None:
             self.uav_counter += 1
-            self.tracked_uavs[obj_id] = {
+            uav_info = self.tracked_uavs[obj_id] = {
                 'uav_id': f"UAV_{self.uav_counter:03d}",
                 'first_seen': time.time(),
                 'total_tracked_frames': 0,
                 'total_lock_time': 0.0
             }
         
-        uav_id = self.tracked_uavs[obj_id]['uav_id']
-        self.tracked_uavs[obj_id]['total_tracked_frames'] += 1
+        uav_info['total_tracked_frames'] += 1
         
         # Check target position
         in_lock_zone = self.is_point_in_lock_zone(centroid)
         in_target_area = self.is_target_in_area(bbox)
         
+        # Update lock status
+        self._update_lock_state(in_lock_zone, obj_id, uav_info)
+        
+        if self.enable_viz:
+            self._draw_target(self.frame, tracked_objects, obj_id, uav_info, in_lock_zone, in_target_area)
+        
+        return self.frame, self._get_lock_status()
+    
+    def _update_lock_state(self, in_lock_zone: bool, obj_id, uav_info: Optional[Dict]):
+        """Apply one hysteresis step of _lock_step to the lock attributes"""
+        # Lock timing uses the monotonic clock so a system clock adjustment
+        # cannot shorten or stretch a lock
+        hysteresis, lock_start_time, lock_duration, is_locked, action = _lock_step(
+            in_lock_zone, self.lock_hysteresis, self.lock_start_time or 0.0,
+            time.monotonic(), self.required_lock_time)
+        self.lock_hysteresis = hysteresis
+        
+        if action == _LOCK_UPDATE:
+            if not self.lock_start_time:
+                self.lock_start_time = lock_start_time
+                self.current_target_id = obj_id
+                
+            self.lock_duration = lock_duration
+            self.is_locked = is_locked
+            self.lock_duration_elapsed = lock_duration
+            
+            if is_locked:
+                uav_info['total_lock_time'] = lock_duration
+        elif action == _LOCK_RESET:
+            self.reset_lock()
+    
+    def _draw_target(self, frame: np.ndarray, tracked_objects: Dict, obj_id, uav_info: Dict,
+                     in_lock_zone: bool, in_target_area: bool):
+        """Draw the tracked target and the lock info"""
+        obj = tracked_objects[obj_id]
+        bbox = obj['bbox']
+        conf = obj['confidence']
+        uav_id = uav_info['uav_id']
+        
         # Draw bbox with color based on status
         if in_lock_zone:
             color = (0, 255, 0)  # Green for in lock zone
@@ -202,56 +406,44 @@ class TargetLockSystem:
         else:
             color = (0, 0, 255)  # Red for outside
         
-        cv2.rectangle(self.frame, 
-                     (int(bbox[0]), int(bbox[1])), 
+        top_left = (int(bbox[0]), int(bbox[1]))
+        cv2.rectangle(frame, 
+                     top_left, 
                      (int(bbox[2]), int(bbox[3])), 
                      color, 2)
         
-        # Update lock status
-        if in_lock_zone:
-            self.lock_hysteresis = min(self.lock_hysteresis + 1, 5)
-            if self.lock_hysteresis >= 2:
-                if not self.lock_start_time:
-                    self.lock_start_time = time.time()
-                    self.current_target_id = obj_id
-                
-                self.lock_duration = time.time() - self.lock_start_time
-                self.is_locked = self.lock_duration >= self.required_lock_time
-                self.lock_duration_elapsed = self.lock_duration
-                
-                if self.is_locked:
-                    self.tracked_uavs[obj_id]['total_lock_time'] = self.lock_duration
-        else:
-            self.lock_hysteresis = max(self.lock_hysteresis - 1, -3)
-            if self.lock_hysteresis <= -3:
-                self.reset_lock()
-        
         # Add status label with UAV ID
         status = "LOCKED" if self.is_locked else "TRACKING"
         label = f"{uav_id} | {status} {conf:.2f}"
-        cv2.putText(self.frame, label,
-                   (int(bbox[0]), int(bbox[1])-10),
+        cv2.putText(frame, label,
+                   (top_left[0], top_left[1]-10),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
         
-        # Add debug info
-        cv2.putText(self.frame, f"Objects: {len(tracked_objects)}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(self.frame, f"Current UAV: {uav_id}", (10, 60),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(self.frame, f"Lock time: {self.lock_duration:.1f}s", (10, 90),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(self.frame, f"Locked: {self.is_locked}", (10, 120),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(self.frame, f"Total Tracked: {self.tracked_uavs[obj_id]['total_tracked_frames']}", (10, 150),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        # Add debug info (labels come from the prerendered patch, only the
+        # values are drawn per frame)
+        self._draw_status(frame, [
+            f"{len(tracked_objects)}",
+            uav_id,
+            f"{self.lock_duration:.1f}s",
+            f"{self.is_locked}",
+            f"{uav_info['total_tracked_frames']}"
+        ])
         
         if self.is_locked:
             lock_text = f"LOCKED ON {uav_id}"
-            cv2.putText(self.frame, lock_text, 
-                       (int(self.frame_width/2 - 200), int(self.frame_height - 50)),
+            cv2.putText(frame, lock_text, 
+                       self._lock_text_origin,
                        cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 255, 0), 3)
-        
-        return self.frame, self._get_lock_status()
+    
+    def _draw_status(self, frame: np.ndarray, values: list):
+        """Draw the status labels and the given values onto the frame (in place)"""
+        self._status_labels.draw(frame)
+        
+        for i, text in enumerate(values):
+            cv2.putText(frame, text,
+                       (self._status_value_x[i], 30 + (i * 30)),
+                       cv2.FONT_HERSHEY_SIMPLEX,
+                       0.7, (255, 255, 255), 2)
     
     def reset_lock(self):
         """Reset all locking parameters"""
@@ -265,8 +457,10 @@ class TargetLockSystem:
     def _get_lock_status(self) -> Dict:
         """Get current lock status"""
         current_uav_id = None
-        if self.current_target_id and self.current_target_id in self.tracked_uavs:
-            current_uav_id = self.tracked_uavs[self.current_target_id]['uav_id']
+        if self.current_target_id:
+            current_info = self.tracked_uavs.get(self.current_target_id)
+            if current_info is not None:
+                current_uav_id = current_info['uav_id']
             
         return {
             'is_locked': self.is_locked,
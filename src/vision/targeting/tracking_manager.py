@@ -5,6 +5,40 @@ import time
 
 from .target_lock import TargetLockSystem
 from .camera_controller import CameraController
+from .history import HistoryRing
+from ..overlay import FONT, TextPatch, text_advance
+from .._jit import compile_helpers
+
+# Takip geçmişi kayıt alanları (takipçi ID'leri tamsayı)
+_HISTORY_DTYPE = np.dtype([
+    ('time', np.float64),
+    ('target_id', np.int64),
+    ('is_tracking', np.bool_),
+    ('is_locked', np.bool_),
+    ('pan', np.float64),
+    ('tilt', np.float64),
+    ('in_zone', np.bool_),
+])
+
+def _servo_step(current_pan, current_tilt, target_pan, target_tilt,
+                pan_rate, tilt_rate, dt, smoothing):
+    """
+    Servo hedeflerini ilerlet ve mevcut açıları yumuşatarak hedefe yaklaştır
+    
+    Returns:
+        (current_pan, current_tilt, target_pan, target_tilt) demeti
+    """
+    # Hedefleri hıza göre ilerlet ve sınırla (-90 ile 90 derece arası)
+    target_pan = max(-90.0, min(90.0, target_pan + pan_rate * dt))
+    target_tilt = max(-90.0, min(90.0, target_tilt + tilt_rate * dt))
+    
+    # Yumuşak geçiş için mevcut değerleri hedefe doğru güncelle
+    current_pan += (target_pan - current_pan) * smoothing
+    current_tilt += (target_tilt - current_tilt) * smoothing
+    return current_pan, current_tilt, target_pan, target_tilt
+
+# Numba kuruluysa ilk yönetici oluşturulurken derlenir (bkz. vision._jit)
+_JIT_HELPERS = [('_servo_step', _servo_step, '(float64,) * 8')]
 
 class TrackingManager:
     """
@@ -34,12 +68,15 @@ class TrackingManager:
         self.frame_width = frame_width
         self.frame_height = frame_height
         self.debug_mode = debug_mode
+        compile_helpers(globals(), _JIT_HELPERS)
+        self._build_label_overlay()
         
         # Hedef kilitleme sistemi
         self.target_lock = TargetLockSystem(
             frame_width=frame_width,
             frame_height=frame_height,
-            required_lock_time=required_lock_time
+            required_lock_time=required_lock_time,
+            enable_viz=debug_mode
         )
         
         # Kamera kontrolörü
@@ -57,7 +94,9 @@ class TrackingManager:
         self.current_target_id = None
         self.lock_start_time = None
         self.last_update_time = None
-        self.tracking_history = []
+        
+        # Takip geçmişi halka tamponu (son 100 kayıt)
+        self._history = HistoryRing(_HISTORY_DTYPE, 100)
         
         # Servo kontrol değişkenleri
         self.current_pan = 0.0
@@ -65,6 +104,43 @@ class TrackingManager:
         self.target_pan = 0.0
         self.target_tilt = 0.0
         
+    @staticmethod
+    def _render_label(text: str, color: Tuple[int, int, int], y: int) -> Tuple[TextPatch, int]:
+        """
+        Sabit bir etiketi kareye kopyalanacak bir yamaya çiz
+        
+        Returns:
+            (yama, değer metninin x konumu)
+        """
+        # Yama metnin biraz solundan ve üstünden başlar, harf çizgileri
+        # metin başlangıcının dışına taşar
+        width = cv2.getTextSize(text, FONT, 0.7, 2)[0][0] + 10
+        label = TextPatch(width, 40, x=5, y=y - 30)
+        label.put_text(text, (5, 30), color)
+        
+        # Değer, etiketin ilerleme genişliğinden başlar
+        return label, 10 + text_advance(text)
+    
+    def _build_label_overlay(self):
+        """Görselleştirmedeki sabit etiketleri bir kez çiz"""
+        white = (255, 255, 255)
+        self._pan_label = self._render_label("Pan: ", white, 180)
+        self._tilt_label = self._render_label("Tilt: ", white, 210)
+        self._target_id_label = self._render_label("Target ID: ", white, 270)
+        
+        # Durum satırı yalnızca üç farklı metin alır, tamamı hazır çizilir
+        self._status_labels = {
+            status: self._render_label(f"Status: {status}", color, 240)
+            for status, color in (("LOCKED", (0, 255, 0)),
+                                  ("TRACKING", (0, 255, 255)),
+                                  ("SEARCHING", (0, 0, 255)))
+        }
+    
+    @property
+    def tracking_history(self) -> np.ndarray:
+        """Takip geçmişi, eskiden yeniye (_HISTORY_DTYPE alanlı yapısal dizi)"""
+        return self._history.to_array()
+        
     def update(self, tracked_objects: Dict, frame: np.ndarray) -> Tuple[Dict, np.ndarray]:
         """
         Takip yöneticisini güncelle
@@ -76,7 +152,8 @@ class TrackingManager:
         Returns:
             Komutlar ve işlenmiş kare
         """
-        current_time = time.time()
+        # Monoton saat, sistem saati ayarlanınca dt sıçramaz
+        current_time = time.monotonic()
         
         # İlk güncelleme için zamanı başlat
         if self.last_update_time is None:
@@ -85,19 +162,22 @@ class TrackingManager:
         # Zaman farkını hesapla
         dt = current_time - self.last_update_time
         
-        # Hedef kilitleme sistemini güncelle
+        # Hedef kilitleme sistemini güncelle (hata ayıklama modu kapalıyken
+        # kareye çizim yapılmaz)
         lock_frame, lock_status = self.target_lock.update(tracked_objects, frame)
         
-        # Kamera kontrolörünü güncelle (eğer takip edilen nesne varsa)
-        camera_commands = {'pan': 0.0, 'tilt': 0.0, 'in_zone': False, 'tracking': False}
-        
-        if tracked_objects and len(tracked_objects) > 0:
-            # İlk hedefi al (şu an için sadece bir hedef destekleniyor)
-            target_id = list(tracked_objects.keys())[0]
-            target_data = tracked_objects[target_id]
+        # Kamera kontrolörünü güncelle (eğer takip edilen nesne varsa), kamera
+        # komutları bir kez yerel değişkenlere alınır
+        if tracked_objects:
+            # İlk hedefi al (şu an için sadece bir hedef destekleniyor),
+            # anahtar listesi oluşturmadan
+            target_id, target_data = next(iter(tracked_objects.items()))
             
             # Kamera kontrolörünü güncelle
-            camera_commands, _ = self.camera_controller.update(target_data)
+            camera_commands, _ = self.camera_controller.update(target_data, current_time=current_time)
+            pan_rate = camera_commands['pan']
+            tilt_rate = camera_commands['tilt']
+            in_zone = camera_commands['in_zone']
             
             # Hedef takip durumunu güncelle
             self.is_tracking = camera_commands['tracking']
@@ -106,42 +186,22 @@ class TrackingManager:
             # Kilitlenme durumunu güncelle
             self.is_locked = lock_status['is_locked']
             
-            # Takip geçmişine ekle
-            self.tracking_history.append({
-                'time': current_time,
-                'target_id': target_id,
-                'is_tracking': self.is_tracking,
-                'is_locked': self.is_locked,
-                'pan': camera_commands['pan'],
-                'tilt': camera_commands['tilt'],
-                'in_zone': camera_commands['in_zone']
-            })
-            
-            # Geçmişi sınırla (son 100 kayıt)
-            if len(self.tracking_history) > 100:
-                self.tracking_history.pop(0)
+            # Takip geçmişine ekle, doluysa en eski kaydın üzerine yazılır
+            self._history.append(current_time, target_id, self.is_tracking, self.is_locked,
+                                 pan_rate, tilt_rate, in_zone)
         else:
             # Hedef yoksa, takibi sıfırla
+            pan_rate = tilt_rate = 0.0
+            in_zone = False
             self.is_tracking = False
             self.current_target_id = None
             
-        # Servo kontrol değerlerini güncelle
-        self.target_pan += camera_commands['pan'] * dt
-        self.target_tilt += camera_commands['tilt'] * dt
-        
-        # Servo pozisyonlarını sınırla (-90 ile 90 derece arası)
-        self.target_pan = max(-90.0, min(90.0, self.target_pan))
-        self.target_tilt = max(-90.0, min(90.0, self.target_tilt))
-        
-        # Yumuşak geçiş için mevcut değerleri hedefe doğru güncelle
-        pan_diff = self.target_pan - self.current_pan
-        tilt_diff = self.target_tilt - self.current_tilt
-        
-        # Yumuşatma faktörü (0.1 = yavaş, 0.5 = orta, 1.0 = anında)
+        # Servo kontrol değerlerini güncelle, yumuşatma faktörü
+        # (0.1 = yavaş, 0.5 = orta, 1.0 = anında)
         smoothing = 0.3
-        
-        self.current_pan += pan_diff * smoothing
-        self.current_tilt += tilt_diff * smoothing
+        self.current_pan, self.current_tilt, self.target_pan, self.target_tilt = _servo_step(
+            self.current_pan, self.current_tilt, self.target_pan, self.target_tilt,
+            pan_rate, tilt_rate, dt, smoothing)
         
         # Komutları hazırla
         commands = {
@@ -150,9 +210,9 @@ class TrackingManager:
             'target_id': self.current_target_id,
             'pan': self.current_pan,
             'tilt': self.current_tilt,
-            'pan_rate': camera_commands['pan'],
-            'tilt_rate': camera_commands['tilt'],
-            'in_zone': camera_commands['in_zone'],
+            'pan_rate': pan_rate,
+            'tilt_rate': tilt_rate,
+            'in_zone': in_zone,
             'lock_status': lock_status
         }
         
@@ -176,23 +236,26 @@ class TrackingManager:
         Returns:
             Görselleştirilmiş kare
         """
+        # Etiketler hazır yamalardan kopyalanır, her karede yalnızca
+        # değerler çizilir
+        
         # Servo pozisyonlarını göster
-        cv2.putText(frame, f"Pan: {commands['pan']:.1f} deg", (10, 180),
+        self._pan_label[0].draw(frame)
+        cv2.putText(frame, f"{commands['pan']:.1f} deg", (self._pan_label[1], 180),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
-        cv2.putText(frame, f"Tilt: {commands['tilt']:.1f} deg", (10, 210),
+        self._tilt_label[0].draw(frame)
+        cv2.putText(frame, f"{commands['tilt']:.1f} deg", (self._tilt_label[1], 210),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         # Takip ve kilitlenme durumunu göster
         status_text = "LOCKED" if commands['is_locked'] else "TRACKING" if commands['is_tracking'] else "SEARCHING"
-        status_color = (0, 255, 0) if commands['is_locked'] else (0, 255, 255) if commands['is_tracking'] else (0, 0, 255)
-        
-        cv2.putText(frame, f"Status: {status_text}", (10, 240),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
+        self._status_labels[status_text][0].draw(frame)
         
         # Hedef ID'sini göster
         if commands['target_id'] is not None:
-            cv2.putText(frame, f"Target ID: {commands['target_id']}", (10, 270),
+            self._target_id_label[0].draw(frame)
+            cv2.putText(frame, f"{commands['target_id']}", (self._target_id_label[1], 270),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         return frame
@@ -204,7 +267,7 @@ class TrackingManager:
         self.current_target_id = None
         self.lock_start_time = None
         self.last_update_time = None
-        self.tracking_history = []
+        self._history.clear()
         self.current_pan = 0.0
         self.current_tilt = 0.0
         self.target_pan = 0.0
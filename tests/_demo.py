@@ -0,0 +1,66 @@
+import os
+import time
+import cv2
+import numpy as np
+
+# HEADLESS=1 in the environment runs this many frames (30 s of simulated
+# time at the 50 ms frame period) without drawing, windows or key
+# handling, for timing the controllers
+HEADLESS_FRAMES = 600
+
+def is_headless() -> bool:
+    return bool(os.environ.get("HEADLESS"))
+
+def _draw_grid_frame(width: int, height: int) -> np.ndarray:
+    """Draw the white background with a 50 px grid"""
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    for x in range(0, width, 50):
+        cv2.line(frame, (x, 0), (x, height), (200, 200, 200), 1)
+    for y in range(0, height, 50):
+        cv2.line(frame, (0, y), (width, y), (200, 200, 200), 1)
+    return frame
+
+# The grid never changes, it is drawn once per size and copied for each frame
+_grid_templates = {}
+
+def grid_frame(width: int = 800, height: int = 800) -> np.ndarray:
+    """Fresh copy of the grid background"""
+    template = _grid_templates.get((width, height))
+    if template is None:
+        template = _grid_templates[(width, height)] = _draw_grid_frame(width, height)
+    return template.copy()
+
+def run_demo(window_name: str, step, on_key=None, period: float = 0.05):
+    """
+    Run a demo loop, one step(headless) call per frame
+    
+    step returns the frame to show, or None when there is nothing to show
+    (then no key is read either). With HEADLESS set, HEADLESS_FRAMES steps
+    run back to back and the time per frame is printed. Otherwise frames
+    are paced to period, the time spent in step counts towards it instead
+    of being added on top; 'q' quits and other keys go to on_key.
+    """
+    if is_headless():
+        start = time.perf_counter()
+        for _ in range(HEADLESS_FRAMES):
+            step(True)
+        elapsed = time.perf_counter() - start
+        print(f"{HEADLESS_FRAMES} frames in {elapsed:.3f}s "
+              f"({elapsed / HEADLESS_FRAMES * 1e3:.3f} ms/frame)")
+        return
+    
+    while True:
+        frame_start = time.perf_counter()
+        frame = step(False)
+        if frame is None:
+            continue
+        cv2.imshow(window_name, frame)
+        
+        delay = frame_start + period - time.perf_counter()
+        key = cv2.waitKey(max(1, int(delay * 1000))) & 0xFF
+        if key == ord('q'):
+            break
+        if on_key is not None:
+            on_key(key)
+    
+    cv2.destroyAllWindows()
\ No newline at end of file
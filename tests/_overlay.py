@@ -0,0 +1,20 @@
+from vision.overlay import TextPatch
+
+class InfoOverlay:
+    """Text lines drawn from a mask that is only updated for lines whose text changed"""
+    def __init__(self, num_lines: int, baseline_y: int, color: tuple, width: int = 400):
+        # Each line owns a 30 row band around its baseline (baseline_y + i * 30),
+        # the patch is the text color so only the mask changes per line
+        self._text = TextPatch(width, num_lines * 30, y=baseline_y - 20, background=color)
+        self._color = color
+        self._lines = [None] * num_lines
+    
+    def draw(self, frame, lines):
+        for i, text in enumerate(lines):
+            if text == self._lines[i]:
+                continue
+            self._text.put_text(text, (10, i * 30 + 20), self._color, band=(i * 30, (i + 1) * 30))
+            self._lines[i] = text
+        
+        # Clipped to the frame, which may be narrower or shorter than the bands
+        self._text.draw(frame)
\ No newline at end of file
@@ -1,52 +1,41 @@
 import cv2
-import numpy as np
-import time
+import math
 from vision.mission.escape_controller import EscapeController
-
-def create_visualization_frame():
-    """Create visualization frame with grid"""
-    frame = np.zeros((800, 800, 3), dtype=np.uint8)
-    frame.fill(255)
-    
-    # Draw grid lines
-    for i in range(0, 800, 50):
-        cv2.line(frame, (i, 0), (i, 800), (200, 200, 200), 1)
-        cv2.line(frame, (0, i), (800, i), (200, 200, 200), 1)
-    
-    return frame
+from _demo import grid_frame, run_demo
 
 def simulate_enemy_movement(t: float, center_pos: tuple, our_position: tuple,
                           radius: float = 100.0, speed: float = 1.0) -> tuple:
     """Simulate aggressive enemy movement that pursues our UAV"""
-    our_pos = np.array(our_position)
-    center = np.array(center_pos)
+    # Plain float math, NumPy calls on 3-element vectors cost more than the math
+    cx, cy, cz = center_pos
     
     # Calculate base circular movement
-    circular_x = center[0] + radius * np.cos(speed * t)
-    circular_y = center[1] + radius * np.sin(speed * t)
-    circular_z = center[2] + 10 * np.sin(speed * t / 2)
-    circular_pos = np.array([circular_x, circular_y, circular_z])
+    circular_x = cx + radius * math.cos(speed * t)
+    circular_y = cy + radius * math.sin(speed * t)
+    circular_z = cz + 10 * math.sin(speed * t / 2)
     
     # Calculate direction to our UAV
-    to_target = our_pos - circular_pos
-    distance = np.linalg.norm(to_target)
+    dx = our_position[0] - circular_x
+    dy = our_position[1] - circular_y
+    dz = our_position[2] - circular_z
+    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
     
     if distance > 0:
+        # Calculate movement direction
+        direction = (dx / distance, dy / distance, dz / distance)
+        
         # Combine circular movement with pursuit
         pursuit_weight = 0.7  # 70% pursuit, 30% circular
-        final_pos = (1 - pursuit_weight) * circular_pos + pursuit_weight * (
-            circular_pos + to_target / distance * min(distance, 50)
-        )
-        
-        # Calculate movement direction
-        direction = to_target / distance
+        step = min(distance, 50)
+        final_x = (1 - pursuit_weight) * circular_x + pursuit_weight * (circular_x + direction[0] * step)
+        final_y = (1 - pursuit_weight) * circular_y + pursuit_weight * (circular_y + direction[1] * step)
         
         # Add some vertical oscillation
-        final_pos[2] = center[2] + 20 * np.sin(speed * t / 2)
+        final_z = cz + 20 * math.sin(speed * t / 2)
         
-        return tuple(final_pos), direction
+        return (final_x, final_y, final_z), direction
     
-    return tuple(circular_pos), np.array([0, 0, 1])
+    return (circular_x, circular_y, circular_z), (0, 0, 1)
 
 def main():
     # Initialize escape controller with more aggressive settings
@@ -66,13 +55,17 @@ def main():
     print("Press 'q' to quit, 'r' to reset")
     
     t = 0
-    while True:
+    
+    def step(headless):
+        nonlocal our_position, our_velocity, t
+        
         # Create visualization frame
-        frame = create_visualization_frame()
+        frame = None if headless else grid_frame()
         
         # Simulate enemy movement that pursues our UAV
         enemy_pos, enemy_dir = simulate_enemy_movement(t, enemy_center, our_position, 
                                                      speed=1.5)  # Increased speed
+        t += 0.05  # Time increment
         
         # Update enemy data
         enemy_data = {
@@ -95,7 +88,8 @@ def main():
             movement_scale = 5.0  # Movement speed
             
             # Print debug info
-            print(f"Vector: {vector}, Position: {our_position}, Status: {commands['message']}")
+            if not headless:
+                print(f"Vector: {vector}, Position: {our_position}, Status: {commands['message']}")
             
             # Apply movement vector
             our_position = [
@@ -112,10 +106,14 @@ def main():
             ]
             
             # Draw escape vector
-            start_point = (int(our_position[0]), int(our_position[1]))
-            end_point = (int(our_position[0] + vector[0] * 50),
-                        int(our_position[1] + vector[1] * 50))
-            cv2.arrowedLine(frame, start_point, end_point, (255, 0, 0), 2)
+            if not headless:
+                start_point = (int(our_position[0]), int(our_position[1]))
+                end_point = (int(our_position[0] + vector[0] * 50),
+                            int(our_position[1] + vector[1] * 50))
+                cv2.arrowedLine(frame, start_point, end_point, (255, 0, 0), 2)
+        
+        if headless:
+            return None
         
         # Draw current positions
         cv2.circle(frame, (int(our_position[0]), int(our_position[1])), 
@@ -136,24 +134,20 @@ def main():
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
         cv2.putText(frame, f"Enemy Alt: {enemy_pos[2]:.1f}m", (10, 120),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-        cv2.putText(frame, f"Distance: {np.linalg.norm(np.array(enemy_pos) - np.array(our_position)):.1f}m",
+        distance = math.dist(enemy_pos, our_position)
+        cv2.putText(frame, f"Distance: {distance:.1f}m",
                    (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
         
-        # Show frame
-        cv2.imshow('Escape Test', frame)
-        
-        # Handle key events
-        key = cv2.waitKey(50) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r'):
+        return frame
+    
+    def on_key(key):
+        nonlocal our_position, our_velocity
+        if key == ord('r'):
             our_position = [400.0, 400.0, 70.0]
             our_velocity = [0.0, 0.0, 0.0]
             controller.reset()
-        
-        t += 0.05  # Time increment
-        
-    cv2.destroyAllWindows()
+    
+    run_demo('Escape Test', step, on_key)
     print("\nTest completed!")
 
 if __name__ == "__main__":
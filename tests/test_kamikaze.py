@@ -1,40 +1,50 @@
 import cv2
 import numpy as np
-import time
 from typing import Tuple
 from vision.mission.kamikaze_controller import KamikazeController
+from _demo import grid_frame, is_headless, run_demo
 
-def create_visualization_frame():
-    # Create a larger frame with white background
-    frame = np.zeros((800, 800, 3), dtype=np.uint8)
-    frame.fill(255)
+def _draw_qr_sprite():
+    """Draw the QR marker once, centered in a small patch with a mask"""
+    # The outline stroke extends one pixel past the 30 px half size
+    half = 32
+    sprite = np.zeros((2 * half, 2 * half, 3), dtype=np.uint8)
+    mask = np.zeros((2 * half, 2 * half), dtype=np.uint8)
     
-    # Draw grid lines
-    for i in range(0, 800, 50):
-        cv2.line(frame, (i, 0), (i, 800), (200, 200, 200), 1)
-        cv2.line(frame, (0, i), (800, i), (200, 200, 200), 1)
+    for img, outline, fill, text in ((sprite, (0, 0, 255), (0, 0, 255), (255, 255, 255)),
+                                     (mask, 255, 255, 255)):
+        # Draw QR code area
+        qr_size = 30
+        cv2.rectangle(img, (half - qr_size, half - qr_size),
+                     (half + qr_size, half + qr_size), outline, 2)
+        
+        # Draw QR code pattern
+        inner_size = 20
+        cv2.rectangle(img, (half - inner_size, half - inner_size),
+                     (half + inner_size, half + inner_size), fill, -1)
+        
+        # Add simulated QR code text
+        cv2.putText(img, "QR", (half - 15, half + 7),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, text, 2)
     
-    return frame
+    return sprite, mask, half
+
+# The marker looks the same every frame, only its position changes
+_QR_SPRITE, _QR_MASK, _QR_HALF = _draw_qr_sprite()
 
 def create_qr_frame(frame, target_pos):
-    # Draw QR code area
-    qr_size = 30
+    # Copy the QR marker onto the frame, clipped at the frame edges
     x, y = int(target_pos[0]), int(target_pos[1])
-    cv2.rectangle(frame, 
-                 (x - qr_size, y - qr_size),
-                 (x + qr_size, y + qr_size),
-                 (0, 0, 255), 2)
-    
-    # Draw QR code pattern
-    inner_size = 20
-    cv2.rectangle(frame,
-                 (x - inner_size, y - inner_size),
-                 (x + inner_size, y + inner_size),
-                 (0, 0, 255), -1)
+    height, width = frame.shape[:2]
+    x1, y1 = max(x - _QR_HALF, 0), max(y - _QR_HALF, 0)
+    x2, y2 = min(x + _QR_HALF, width), min(y + _QR_HALF, height)
+    if x1 >= x2 or y1 >= y2:
+        return frame
     
-    # Add simulated QR code text
-    cv2.putText(frame, "QR", (x - 15, y + 7),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    sx, sy = x1 - (x - _QR_HALF), y1 - (y - _QR_HALF)
+    cv2.copyTo(_QR_SPRITE[sy:sy + y2 - y1, sx:sx + x2 - x1],
+               _QR_MASK[sy:sy + y2 - y1, sx:sx + x2 - x1],
+               frame[y1:y2, x1:x2])
     
     return frame
 
@@ -44,7 +54,8 @@ def main():
         min_altitude=50.0,      # Minimum safe altitude
         dive_angle=30.0,        # Dive angle
         approach_speed=2.0,     # Base approach speed
-        qr_size=2.5
+        qr_size=2.5,
+        debug_mode=not is_headless()  # No per-step prints while timing
     )
     
     # Initial positions
@@ -58,10 +69,12 @@ def main():
     print("Kamikaze Attack Test Starting...")
     print("Press 'q' to quit, 'r' to reset")
     
-    t = 0
-    while True:
-        # Create visualization frame
-        frame = create_visualization_frame()
+    def step(headless):
+        nonlocal our_position, our_velocity
+        
+        # Create visualization frame (also in headless mode, the controller
+        # reads the QR code from it)
+        frame = grid_frame()
         
         # Add QR code to frame
         frame = create_qr_frame(frame, (target_position[0], target_position[1]))
@@ -80,73 +93,74 @@ def main():
         )
         
         # Update our position based on attack vector
-        if commands['attack'] and commands['vector'] is not None:
-            vector = commands['vector']
-            movement_scale = 5.0  # Movement speed
-            
-            # Print debug info
+        if not commands['attack'] or commands['vector'] is None:
+            return None
+        
+        vector = commands['vector']
+        movement_scale = 5.0  # Movement speed
+        
+        # Print debug info and store current position for trajectory
+        if not headless:
             print(f"Vector: {vector}, Position: {our_position}, Status: {commands['message']}")
-            
-            # Store current position for trajectory
             trajectory.append((int(our_position[0]), int(our_position[1])))
-            
-            # Apply movement vector directly
-            new_position = [
-                our_position[0] + vector[0] * movement_scale,
-                our_position[1] + vector[1] * movement_scale,
-                max(0, our_position[2] + vector[2] * movement_scale)  # Prevent negative altitude
-            ]
-            our_position = new_position
-            
-            # Update velocity
-            our_velocity = [
-                vector[0] * movement_scale,
-                vector[1] * movement_scale,
-                vector[2] * movement_scale
-            ]
-            
-            # Draw trajectory
-            if len(trajectory) > 1:
-                for i in range(1, len(trajectory)):
-                    cv2.line(frame, trajectory[i-1], trajectory[i], (255, 0, 0), 2)
-            
-            # Draw current position
-            cv2.circle(frame, (int(our_position[0]), int(our_position[1])), 8, (0, 255, 0), -1)
-            
-            # Draw target
-            cv2.circle(frame, (int(target_position[0]), int(target_position[1])), 8, (0, 0, 255), -1)
-            
-            # Draw movement vector
-            cv2.line(frame, 
-                    (int(our_position[0]), int(our_position[1])),
-                    (int(our_position[0] + vector[0]*50), int(our_position[1] + vector[1]*50)),
-                    (0, 255, 255), 2)
-            
-            # Add text info
-            cv2.putText(frame, f"Alt: {our_position[2]:.1f}m", (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-            cv2.putText(frame, f"Dist: {commands['distance']:.1f}m", (10, 60),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-            cv2.putText(frame, f"Status: {commands['message']}", (10, 90),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-            if commands['qr_data']:
-                cv2.putText(frame, f"QR Read: {commands['qr_data']}", (10, 120),
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            # Show frame
-            cv2.imshow('Kamikaze Test', frame)
-            
-            # Check for quit
-            key = cv2.waitKey(50) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('r'):
-                our_position = [400.0, 500.0, 100.0]
-                our_velocity = [0.0, 0.0, 0.0]
-                trajectory = []
-                controller.reset()
-                
-    cv2.destroyAllWindows()
+        
+        # Apply movement vector directly
+        new_position = [
+            our_position[0] + vector[0] * movement_scale,
+            our_position[1] + vector[1] * movement_scale,
+            max(0, our_position[2] + vector[2] * movement_scale)  # Prevent negative altitude
+        ]
+        our_position = new_position
+        
+        # Update velocity
+        our_velocity = [
+            vector[0] * movement_scale,
+            vector[1] * movement_scale,
+            vector[2] * movement_scale
+        ]
+        
+        if headless:
+            return None
+        
+        # Draw trajectory
+        if len(trajectory) > 1:
+            for i in range(1, len(trajectory)):
+                cv2.line(frame, trajectory[i-1], trajectory[i], (255, 0, 0), 2)
+        
+        # Draw current position
+        cv2.circle(frame, (int(our_position[0]), int(our_position[1])), 8, (0, 255, 0), -1)
+        
+        # Draw target
+        cv2.circle(frame, (int(target_position[0]), int(target_position[1])), 8, (0, 0, 255), -1)
+        
+        # Draw movement vector
+        cv2.line(frame, 
+                (int(our_position[0]), int(our_position[1])),
+                (int(our_position[0] + vector[0]*50), int(our_position[1] + vector[1]*50)),
+                (0, 255, 255), 2)
+        
+        # Add text info
+        cv2.putText(frame, f"Alt: {our_position[2]:.1f}m", (10, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        cv2.putText(frame, f"Dist: {commands['distance']:.1f}m", (10, 60),
+                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        cv2.putText(frame, f"Status: {commands['message']}", (10, 90),
+                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        if commands['qr_data']:
+            cv2.putText(frame, f"QR Read: {commands['qr_data']}", (10, 120),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        
+        return frame
+    
+    def on_key(key):
+        nonlocal our_position, our_velocity
+        if key == ord('r'):
+            our_position = [400.0, 500.0, 100.0]
+            our_velocity = [0.0, 0.0, 0.0]
+            trajectory.clear()
+            controller.reset()
+    
+    run_demo('Kamikaze Test', step, on_key)
     print("\nTest completed!")
 
 if __name__ == "__main__":
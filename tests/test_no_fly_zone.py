@@ -1,47 +1,48 @@
 import cv2
+import math
 import numpy as np
-import time
+import random
 from vision.safety.no_fly_zone_controller import NoFlyZoneController, ZoneType
-
-def create_visualization_frame(width: int = 800, height: int = 800):
-    """Create visualization frame with grid"""
-    frame = np.zeros((height, width, 3), dtype=np.uint8)
-    frame.fill(255)
-    
-    # Draw grid lines
-    for i in range(0, width, 50):
-        cv2.line(frame, (i, 0), (i, height), (200, 200, 200), 1)
-        cv2.line(frame, (0, i), (800, i), (200, 200, 200), 1)
-    
-    return frame
+from _demo import grid_frame, run_demo
+from _overlay import InfoOverlay
 
 def simulate_uav_movement(current_pos: np.ndarray, 
                         target_pos: np.ndarray,
                         avoidance_vector: np.ndarray,
-                        speed: float = 3.0) -> np.ndarray:
-    """Simulate UAV movement with avoidance"""
-    if avoidance_vector is not None and np.any(avoidance_vector):
-        # Blend target direction with avoidance
-        to_target = target_pos - current_pos
-        distance = np.linalg.norm(to_target)
-        
+                        speed: float = 3.0,
+                        out: np.ndarray = None) -> np.ndarray:
+    """Simulate UAV movement with avoidance (written to out if given, may be current_pos)"""
+    # Plain float math, NumPy calls on 3-element vectors cost more than the math
+    x, y, z = current_pos
+    dx = target_pos[0] - x
+    dy = target_pos[1] - y
+    dz = target_pos[2] - z
+    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+    
+    if avoidance_vector is not None and (avoidance_vector[0] or avoidance_vector[1] or avoidance_vector[2]):
+        ax, ay, az = avoidance_vector
         if distance > 0:
-            target_dir = to_target / distance
-            movement = 0.1 * target_dir + 0.9 * avoidance_vector
-            movement = movement / np.linalg.norm(movement)
+            # Blend target direction with avoidance
+            mx = 0.1 * dx / distance + 0.9 * ax
+            my = 0.1 * dy / distance + 0.9 * ay
+            mz = 0.1 * dz / distance + 0.9 * az
+            norm = math.sqrt(mx * mx + my * my + mz * mz)
+            if norm > 0:
+                mx, my, mz = mx / norm, my / norm, mz / norm
         else:
-            movement = avoidance_vector
-    else:
+            mx, my, mz = ax, ay, az
+    elif distance > 0:
         # Move directly to target
-        to_target = target_pos - current_pos
-        distance = np.linalg.norm(to_target)
-        
-        if distance > 0:
-            movement = to_target / distance
-        else:
-            movement = np.zeros(3)
+        mx, my, mz = dx / distance, dy / distance, dz / distance
+    else:
+        mx = my = mz = 0.0
     
-    return current_pos + movement * speed
+    if out is None:
+        out = np.empty(3)
+    out[0] = x + mx * speed
+    out[1] = y + my * speed
+    out[2] = z + mz * speed
+    return out
 
 def main():
     # Initialize no-fly zone controller
@@ -65,6 +66,9 @@ def main():
         controller.add_zone(zone_id, zone_type, center, radius)
         controller.activate_zone(zone_id)
     
+    # Zone IDs for the 'z' key, the set of zones does not change after setup
+    zone_ids = tuple(controller.zones)
+    
     # Initial positions
     uav_pos = np.array([100.0, 100.0, 50.0])  # Starting position
     uav_vel = np.zeros(3)
@@ -77,22 +81,25 @@ def main():
     print("  't' - New random target")
     print("  'z' - Toggle zones")
     
-    while True:
+    # Black status lines in the top-left corner, baselines at y = 30, 60, ...
+    status_overlay = InfoOverlay(4, 30, (0, 0, 0))
+    
+    def step(headless):
         # Create visualization frame
-        frame = create_visualization_frame()
-        
-        # Update zone violations
-        status = controller.update(tuple(uav_pos))
+        frame = None if headless else grid_frame()
         
-        # Calculate avoidance vector
-        avoidance_vector, violated_zones = controller.calculate_avoidance_vector(
+        # Update zone violations and calculate avoidance vector
+        avoidance_vector, violated_zones, status = controller.step(
             tuple(uav_pos),
             tuple(uav_vel),
             tuple(target_pos)
         )
         
         # Update UAV position
-        uav_pos = simulate_uav_movement(uav_pos, target_pos, avoidance_vector)
+        simulate_uav_movement(uav_pos, target_pos, avoidance_vector, out=uav_pos)
+        
+        if headless:
+            return None
         
         # Visualize zones
         frame = controller.visualize(frame)
@@ -119,21 +126,13 @@ def main():
             f"Max Violation Time: {status['max_violation_time']:.1f}s",
             f"Emergency Landing: {'YES' if status['emergency_landing_required'] else 'NO'}"
         ]
+        status_overlay.draw(frame, status_text)
         
-        for i, text in enumerate(status_text):
-            cv2.putText(frame, text,
-                       (10, 30 + (i * 30)),
-                       cv2.FONT_HERSHEY_SIMPLEX,
-                       0.7, (0, 0, 0), 2)
-        
-        # Show frame
-        cv2.imshow('No-Fly Zone Test', frame)
-        
-        # Handle key events
-        key = cv2.waitKey(50) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r'):
+        return frame
+    
+    def on_key(key):
+        nonlocal uav_pos, uav_vel, target_pos
+        if key == ord('r'):
             # Reset UAV position
             uav_pos = np.array([100.0, 100.0, 50.0])
             uav_vel = np.zeros(3)
@@ -146,7 +145,7 @@ def main():
             ])
         elif key == ord('z'):
             # Toggle random zone
-            zone_id = np.random.choice(list(controller.zones.keys()))
+            zone_id = random.choice(zone_ids)
             zone = controller.zones[zone_id]
             if zone.is_active:
                 controller.deactivate_zone(zone_id)
@@ -155,7 +154,7 @@ def main():
                 controller.activate_zone(zone_id)
                 print(f"Activated zone: {zone_id}")
     
-    cv2.destroyAllWindows()
+    run_demo('No-Fly Zone Test', step, on_key)
     print("\nTest completed!")
 
 if __name__ == "__main__":
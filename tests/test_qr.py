@@ -3,7 +3,9 @@ import numpy as np
 import qrcode
 from detection.qr.qr_detector import QRDetector
 from detection.qr.qr_processor import QRProcessor, QRCommand
+import os
 import time
+from _overlay import InfoOverlay
 
 def create_test_qr_image(command_type: QRCommand, parameters: dict = None) -> np.ndarray:
     """Create a test QR code image"""
@@ -11,21 +13,20 @@ def create_test_qr_image(command_type: QRCommand, parameters: dict = None) -> np
     qr_data = QRProcessor.create_qr_command(command_type, parameters)
     
     # Generate QR code
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    box_size = 10
+    qr = qrcode.QRCode(version=1, box_size=box_size, border=5)
     qr.add_data(qr_data)
     qr.make(fit=True)
     
-    # Create image
-    qr_image = qr.make_image(fill_color="black", back_color="white")
-    
-    # Convert to numpy array
-    qr_array = np.array(qr_image.convert('RGB'))
-    return cv2.cvtColor(qr_array, cv2.COLOR_RGB2BGR)
+    # Rasterize the module matrix directly instead of going through a PIL
+    # image, the matrix already includes the border (True = black module)
+    modules = np.asarray(qr.get_matrix(), dtype=bool)
+    qr_gray = np.where(modules, 0, 255).astype(np.uint8)
+    qr_gray = qr_gray.repeat(box_size, axis=0).repeat(box_size, axis=1)
+    return cv2.cvtColor(qr_gray, cv2.COLOR_GRAY2BGR)
 
-def apply_perspective_transform(image: np.ndarray, tilt: float = 0, skew: float = 0) -> np.ndarray:
-    """Apply perspective transform to simulate tilt and skew"""
-    h, w = image.shape[:2]
-    
+def _perspective_matrix(w: int, h: int, tilt: float, skew: float) -> np.ndarray:
+    """Perspective matrix that simulates tilt and skew for a w x h image"""
     # Create source points
     src_points = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
     
@@ -40,27 +41,69 @@ def apply_perspective_transform(image: np.ndarray, tilt: float = 0, skew: float
         [0, h]   # Bottom-left
     ])
     
-    # Get perspective transform matrix and apply it
-    M = cv2.getPerspectiveTransform(src_points, dst_points)
+    return cv2.getPerspectiveTransform(src_points, dst_points)
+
+def apply_perspective_transform(image: np.ndarray, tilt: float = 0, skew: float = 0) -> np.ndarray:
+    """Apply perspective transform to simulate tilt and skew"""
+    h, w = image.shape[:2]
+    M = _perspective_matrix(w, h, tilt, skew)
     transformed = cv2.warpPerspective(image, M, (w, h))
     
     return transformed
 
+# Run the warp through OpenCL (T-API) when OpenCV has a device for it
+USE_UMAT = cv2.ocl.haveOpenCL()
+
+def _build_warp(w: int, h: int, angle: float, tilt: float, skew: float, scale: float) -> tuple:
+    """
+    Build the fused rotation + tilt/skew homography and its coverage image
+    
+    The rotated image used to be cut to w x h before the perspective step,
+    which left black where the step read outside of it. The same warp of a
+    white image gives that coverage per pixel.
+    """
+    M_rot = np.vstack([cv2.getRotationMatrix2D((w/2, h/2), angle, scale), [0, 0, 1]])
+    M_persp = _perspective_matrix(w, h, tilt, skew)
+    
+    white = np.full((h, w, 3), 255, dtype=np.uint8)
+    coverage = cv2.warpPerspective(white, M_persp, (w, h))
+    if USE_UMAT:
+        coverage = cv2.UMat(coverage)
+    return M_persp @ M_rot, coverage
+
+# Homography and coverage per image size and transform, these only change
+# on key presses
+_warp_cache = {}
+
 def create_test_frame(qr_image: np.ndarray, angle: float = 0, tilt: float = 0, 
-                     skew: float = 0, scale: float = 1.0) -> np.ndarray:
-    """Create a test frame with rotated, tilted and skewed QR code"""
-    # Create blank frame
-    frame = np.ones((720, 1280, 3), dtype=np.uint8) * 255
+                     skew: float = 0, scale: float = 1.0,
+                     out: np.ndarray = None) -> np.ndarray:
+    """Create a test frame with rotated, tilted and skewed QR code (drawn into out if given)"""
+    # Create blank frame, a reused one is cleared completely since the
+    # detections and info text of the last frame can be anywhere on it
+    if out is None:
+        frame = np.full((720, 1280, 3), 255, dtype=np.uint8)
+    else:
+        frame = out
+        frame.fill(255)
     
     # Get QR code dimensions
     h, w = qr_image.shape[:2]
     
-    # Apply rotation
-    M_rot = cv2.getRotationMatrix2D((w/2, h/2), angle, scale)
-    rotated_qr = cv2.warpAffine(qr_image, M_rot, (w, h))
+    # Apply rotation and the perspective transform for tilt and skew as a
+    # single warp, then black out what the old two-step warp cut off
+    key = (w, h, angle, tilt, skew, scale)
+    warp = _warp_cache.get(key)
+    if warp is None:
+        warp = _warp_cache[key] = _build_warp(w, h, angle, tilt, skew, scale)
+    H, coverage = warp
     
-    # Apply perspective transform for tilt and skew
-    transformed_qr = apply_perspective_transform(rotated_qr, tilt, skew)
+    src = cv2.UMat(qr_image) if USE_UMAT else qr_image
+    transformed_qr = cv2.warpPerspective(src, H, (w, h))
+    transformed_qr = cv2.multiply(transformed_qr, coverage, scale=1/255)
+    if USE_UMAT:
+        # Download once, before the paste into the frame
+        transformed_qr = transformed_qr.get()
     
     # Calculate center for placement
     center_x = frame.shape[1] // 2
@@ -86,6 +129,30 @@ def create_test_frame(qr_image: np.ndarray, angle: float = 0, tilt: float = 0,
     
     return frame
 
+def run_sweep(detector: QRDetector, test_commands: list, qr_images: list,
+              angles: list, tilts: list, skews: list):
+    """Detect every test QR code at every rotation/tilt/skew and print the results"""
+    combos = [(angle, tilt, skew) for angle in angles for tilt in tilts for skew in skews]
+    frame = np.empty((720, 1280, 3), dtype=np.uint8)
+    
+    start = time.perf_counter()
+    for (command_type, _), qr_image in zip(test_commands, qr_images):
+        # Same QR image for the whole sweep, only the warp changes
+        misses = []
+        for angle, tilt, skew in combos:
+            create_test_frame(qr_image, angle=angle, tilt=tilt, skew=skew, out=frame)
+            _, detections = detector.detect(frame)
+            if not detections:
+                misses.append((angle, tilt, skew))
+        
+        print(f"{command_type.value}: {len(combos) - len(misses)}/{len(combos)} detected")
+        for angle, tilt, skew in misses:
+            print(f"  missed: rotation {angle}, tilt {tilt}, skew {skew}")
+    
+    elapsed = time.perf_counter() - start
+    frames = len(combos) * len(qr_images)
+    print(f"{frames} frames in {elapsed:.2f}s ({elapsed / frames * 1e3:.1f} ms/frame)")
+
 def main():
     # Initialize QR detector
     detector = QRDetector(debug_mode=True)
@@ -97,11 +164,21 @@ def main():
         (QRCommand.ESCAPE, {'direction': 'NORTH'})
     ]
     
+    # The QR images only depend on the command, they are generated once
+    # instead of on every frame
+    qr_images = [create_test_qr_image(command_type, parameters)
+                 for command_type, parameters in test_commands]
+    
     # Test parameters
     angles = [0, 30, 45, 60, 90]  # Rotation angles
     tilts = [0, 15, 30, 45]      # Tilt angles
     skews = [0, 15, 30, 45]      # Skew angles
     
+    # HEADLESS=1 runs every combination once without a window
+    if os.environ.get("HEADLESS"):
+        run_sweep(detector, test_commands, qr_images, angles, tilts, skews)
+        return
+    
     print("QR Code Detection Test Starting...")
     print("Controls:")
     print("  'q' - Quit")
@@ -115,39 +192,51 @@ def main():
     current_tilt = 0
     current_skew = 0
     
+    # Frame buffer reused for every test frame
+    frame_buffer = np.empty((720, 1280, 3), dtype=np.uint8)
+    
+    # The info text only changes on key presses and when the detection
+    # count changes
+    info_overlay = InfoOverlay(5, frame_buffer.shape[0] - 150, (0, 0, 255))
+    
+    # The frame only depends on these indices, it is rendered and detected
+    # again only after a key press changed one of them
+    last_state = None
+    
     while True:
-        # Get current test parameters
-        command_type, parameters = test_commands[current_command]
-        angle = angles[current_angle]
-        tilt = tilts[current_tilt]
-        skew = skews[current_skew]
-        
-        # Create test frame
-        qr_image = create_test_qr_image(command_type, parameters)
-        frame = create_test_frame(qr_image, angle=angle, tilt=tilt, skew=skew)
-        
-        # Detect QR codes
-        processed_frame, detections = detector.detect(frame)
-        
-        # Add test information
-        info_text = [
-            f"Command: {command_type.value}",
-            f"Rotation: {angle}°",
-            f"Tilt: {tilt}°",
-            f"Skew: {skew}°",
-            f"Detections: {len(detections)}"
-        ]
-        
-        for i, text in enumerate(info_text):
-            cv2.putText(processed_frame, text,
-                       (10, processed_frame.shape[0] - 150 + (i * 30)),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        
-        # Show frame
-        cv2.imshow('QR Code Test', processed_frame)
+        state = (current_command, current_angle, current_tilt, current_skew)
+        if state != last_state:
+            # Get current test parameters
+            command_type, _ = test_commands[current_command]
+            angle = angles[current_angle]
+            tilt = tilts[current_tilt]
+            skew = skews[current_skew]
+            
+            # Create test frame
+            qr_image = qr_images[current_command]
+            frame = create_test_frame(qr_image, angle=angle, tilt=tilt, skew=skew, out=frame_buffer)
+            
+            # Detect QR codes
+            processed_frame, detections = detector.detect(frame, draw=True)
+            
+            # Add test information
+            info_text = [
+                f"Command: {command_type.value}",
+                f"Rotation: {angle}°",
+                f"Tilt: {tilt}°",
+                f"Skew: {skew}°",
+                f"Detections: {len(detections)}"
+            ]
+            info_overlay.draw(processed_frame, info_text)
+            
+            # Show frame, the window keeps it until the next change
+            cv2.imshow('QR Code Test', processed_frame)
+            last_state = state
         
         # Handle key events
-        key = cv2.waitKey(1) & 0xFF
+        # The wait also paces the loop to about 10 ticks per second, while
+        # still returning as soon as a key is pressed
+        key = cv2.waitKey(100) & 0xFF
         if key == ord('q'):
             break
         elif key == ord('n'):
@@ -166,8 +255,6 @@ def main():
             # Change skew
             current_skew = (current_skew + 1) % len(skews)
             print(f"Skew: {skews[current_skew]}°")
-        
-        time.sleep(0.1)  # Slow down the loop
     
     cv2.destroyAllWindows()
     print("\nTest completed!")
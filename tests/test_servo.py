@@ -11,6 +11,28 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from hardware.servo_controller import ServoController
 
+def _draw_static_background(width, height):
+    """Açıdan bağımsız kısımları çiz: beyaz zemin, kamera gövdesi ve kontrol bilgileri"""
+    # Boş bir görüntü oluştur
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+    
+    # Merkez nokta
+    center_x, center_y = width // 2, height // 2
+    
+    # Kamera gövdesi (pan ekseni bunun üzerine çizilir)
+    cv2.rectangle(img, (center_x-30, center_y-20), (center_x+30, center_y+20), (100, 100, 100), -1)
+    
+    # Kontrol bilgilerini ekle
+    cv2.putText(img, "Kontroller:", (50, height-120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+    cv2.putText(img, "A/D: Pan Sol/Sağ", (50, height-90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+    cv2.putText(img, "W/S: Tilt Yukarı/Aşağı", (50, height-60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+    cv2.putText(img, "R: Sıfırla, Q: Çıkış", (50, height-30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+    
+    return img
+
+# Sabit arka plan her boyut için bir kez çizilir, her güncellemede kopyalanır
+_static_backgrounds = {}
+
 def draw_servo_visualization(width=800, height=600, pan=0, tilt=0):
     """
     Servo pozisyonlarını görselleştir
@@ -24,8 +46,11 @@ def draw_servo_visualization(width=800, height=600, pan=0, tilt=0):
     Returns:
         Görselleştirilmiş görüntü
     """
-    # Boş bir görüntü oluştur
-    img = np.ones((height, width, 3), dtype=np.uint8) * 255
+    # Sabit arka planın kopyası üzerine yalnızca açıya bağlı kısımlar çizilir
+    background = _static_backgrounds.get((width, height))
+    if background is None:
+        background = _static_backgrounds[(width, height)] = _draw_static_background(width, height)
+    img = background.copy()
     
     # Merkez nokta
     center_x, center_y = width // 2, height // 2
@@ -44,9 +69,6 @@ def draw_servo_visualization(width=800, height=600, pan=0, tilt=0):
     tilt_end_x = pan_end_x
     tilt_end_y = int(pan_end_y - tilt_length * np.sin(tilt_rad))
     
-    # Kamera gövdesi
-    cv2.rectangle(img, (center_x-30, center_y-20), (center_x+30, center_y+20), (100, 100, 100), -1)
-    
     # Pan ekseni
     cv2.line(img, (center_x, center_y), (pan_end_x, pan_end_y), (0, 0, 255), 3)
     
@@ -62,12 +84,6 @@ def draw_servo_visualization(width=800, height=600, pan=0, tilt=0):
     cv2.putText(img, f"Pan: {pan:.1f} derece", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
     cv2.putText(img, f"Tilt: {tilt:.1f} derece", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
     
-    # Kontrol bilgilerini ekle
-    cv2.putText(img, "Kontroller:", (50, height-120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-    cv2.putText(img, "A/D: Pan Sol/Sağ", (50, height-90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-    cv2.putText(img, "W/S: Tilt Yukarı/Aşağı", (50, height-60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-    cv2.putText(img, "R: Sıfırla, Q: Çıkış", (50, height-30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-    
     return img
 
 def main():
@@ -107,11 +123,17 @@ def main():
     # Görselleştirme penceresini oluştur
     cv2.namedWindow('Servo Kontrolörü Testi', cv2.WINDOW_NORMAL)
     
+    # Görüntü yalnızca açılar değiştiğinde yeniden çizilir, pencere son
+    # görüntüyü göstermeye devam eder
+    shown_angles = None
+    
     try:
         while True:
             # Servo pozisyonlarını görselleştir
-            img = draw_servo_visualization(pan=pan, tilt=tilt)
-            cv2.imshow('Servo Kontrolörü Testi', img)
+            if (pan, tilt) != shown_angles:
+                img = draw_servo_visualization(pan=pan, tilt=tilt)
+                cv2.imshow('Servo Kontrolörü Testi', img)
+                shown_angles = (pan, tilt)
             
             # Klavye girişini bekle
             key = cv2.waitKey(100) & 0xFF
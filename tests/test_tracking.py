@@ -1,29 +1,44 @@
 import cv2
+import math
 import numpy as np
 import time
 import argparse
 import os
+import queue
 import sys
+import threading
 
 # Proje kök dizinini Python yoluna ekle
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from detection.tracking.kalman_tracker import KalmanTracker
+from vision.targeting.camera_controller import CameraController
 from vision.targeting.tracking_manager import TrackingManager
+from _overlay import InfoOverlay
 
-def load_yolo_model(model_path):
+def load_yolo_model(model_path, use_fp16=True):
     """YOLO modelini yükle"""
-    try:
-        # OpenCV DNN ile YOLO modelini yükle
-        net = cv2.dnn.readNet(model_path)
-        
-        # CUDA kullanılabilirse GPU'yu kullan
+    # OpenCV DNN ile YOLO modelini yükle, model tek kez okunur; yükleme
+    # hatası çağırana iletilir
+    net = cv2.dnn.readNet(model_path)
+    
+    # CUDA kullanılabilirse GPU'yu kullan, cihaz sayısı backend seçilmeden
+    # önce sorgulanır (backend ayarı CUDA yokken hata vermez, CPU'ya ancak
+    # ilk forward çağrısında uyarıyla düşülür)
+    if cv2.cuda.getCudaEnabledDeviceCount() > 0:
         net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-        print("CUDA backend kullanılıyor")
-    except:
+        if use_fp16:
+            # FP16 hedefi Tensor Core'ları kullanır, konvolüsyon süresini
+            # yaklaşık yarıya indirir
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+            print("CUDA backend kullanılıyor (FP16)")
+        else:
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+            print("CUDA backend kullanılıyor")
+    else:
         # CUDA kullanılamıyorsa CPU kullan
-        net = cv2.dnn.readNet(model_path)
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
         print("CPU backend kullanılıyor")
     
     # Sınıf isimlerini yükle (İHA tespiti için)
@@ -35,73 +50,134 @@ def load_yolo_model(model_path):
     
     return net, classes, output_layers
 
+# YOLO giriş boyutu ve her karede yeniden kullanılan giriş tamponları
+_YOLO_INPUT_SIZE = 416
+_yolo_resized = np.empty((_YOLO_INPUT_SIZE, _YOLO_INPUT_SIZE, 3), dtype=np.uint8)
+_yolo_blob = np.empty((1, 3, _YOLO_INPUT_SIZE, _YOLO_INPUT_SIZE), dtype=np.float32)
+
 def detect_uavs(frame, net, output_layers, classes, conf_threshold=0.5):
     """YOLO ile İHA'ları tespit et"""
     height, width, _ = frame.shape
     
-    # Görüntüyü YOLO için hazırla
-    blob = cv2.dnn.blobFromImage(frame, 0.00392, (416, 416), (0, 0, 0), True, crop=False)
-    net.setInput(blob)
+    # Görüntüyü YOLO için hazırla, blobFromImage(frame, 0.00392, (416, 416),
+    # swapRB=True) ile aynı sonuç ama her karede yeni tensör ayrılmaz:
+    # BGR kanallar ters sırayla NCHW tampona ölçeklenerek yazılır
+    cv2.resize(frame, (_YOLO_INPUT_SIZE, _YOLO_INPUT_SIZE), dst=_yolo_resized)
+    for c in range(3):
+        np.multiply(_yolo_resized[:, :, 2 - c], np.float32(0.00392), out=_yolo_blob[0, c])
+    net.setInput(_yolo_blob)
     
     # Çıktıları al
     outs = net.forward(output_layers)
     
-    # Tespit edilen nesneleri işle
-    class_ids = []
-    confidences = []
-    boxes = []
-    
-    for out in outs:
-        for detection in out:
-            scores = detection[5:]
-            class_id = np.argmax(scores)
-            confidence = scores[class_id]
-            
-            if confidence > conf_threshold:
-                # Nesne koordinatlarını hesapla
-                center_x = int(detection[0] * width)
-                center_y = int(detection[1] * height)
-                w = int(detection[2] * width)
-                h = int(detection[3] * height)
-                
-                # Dikdörtgen koordinatları
-                x = int(center_x - w / 2)
-                y = int(center_y - h / 2)
-                
-                boxes.append([x, y, w, h])
-                confidences.append(float(confidence))
-                class_ids.append(class_id)
+    # Tespit edilen nesneleri işle, tüm katmanların satırları tek dizide
+    # vektörel olarak süzülür
+    out = np.concatenate(outs, axis=0)
+    scores = out[:, 5:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    
+    keep = confidences > conf_threshold
+    det = out[keep]
+    class_ids = class_ids[keep]
+    confidences = confidences[keep]
+    
+    # Nesne koordinatlarını hesapla (int() gibi sıfıra doğru kesilir)
+    center_x = (det[:, 0] * width).astype(np.int32)
+    center_y = (det[:, 1] * height).astype(np.int32)
+    w = (det[:, 2] * width).astype(np.int32)
+    h = (det[:, 3] * height).astype(np.int32)
+    
+    # Dikdörtgen koordinatları
+    x = (center_x - w / 2).astype(np.int32)
+    y = (center_y - h / 2).astype(np.int32)
+    boxes = np.stack([x, y, w, h], axis=1).tolist()
+    confidences = confidences.tolist()
     
-    # Non-maximum suppression uygula
-    indexes = cv2.dnn.NMSBoxes(boxes, confidences, conf_threshold, 0.4)
+    # Non-maximum suppression uygula, kalan tespitler kutu sırasıyla alınır
+    indexes = np.sort(np.asarray(cv2.dnn.NMSBoxes(boxes, confidences, conf_threshold, 0.4)).flatten())
     
     detections = []
-    for i in range(len(boxes)):
-        if i in indexes:
-            x, y, w, h = boxes[i]
-            label = classes[class_ids[i]]
-            confidence = confidences[i]
-            
-            # Tespit bilgilerini ekle
-            detections.append({
-                'bbox': [x, y, x+w, y+h],
-                'confidence': confidence,
-                'class': label
-            })
+    for i in indexes:
+        x, y, w, h = boxes[i]
+        
+        # Tespit bilgilerini ekle
+        detections.append({
+            'bbox': [x, y, x+w, y+h],
+            'confidence': confidences[i],
+            'class': classes[class_ids[i]]
+        })
     
     return detections
 
+def open_video_writer(output_path, fps, frame_size):
+    """
+    Çıktı video yazıcısını aç
+    
+    .mp4 çıktıda önce FFmpeg üzerinden donanım H.264 kodlayıcısı (NVENC,
+    QSV, VA-API, ...) denenir, açılamazsa yazılımsal kodlayıcı kullanılır.
+    """
+    is_mp4 = output_path.lower().endswith('.mp4')
+    if is_mp4 and hasattr(cv2, 'VIDEOWRITER_PROP_HW_ACCELERATION'):
+        out = cv2.VideoWriter(output_path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'avc1'),
+                              fps, frame_size,
+                              [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if out.isOpened():
+            if out.get(cv2.VIDEOWRITER_PROP_HW_ACCELERATION) != cv2.VIDEO_ACCELERATION_NONE:
+                print("Donanım H.264 kodlayıcı kullanılıyor")
+                return out
+            out.release()
+        print("Uyarı: Donanım kodlayıcı bulunamadı, yazılımsal kodlama kullanılıyor")
+    
+    # MP4 kabı XVID etiketini kabul etmez, aynı MPEG-4 kodlayıcısı mp4v ile yazılır
+    fourcc = cv2.VideoWriter_fourcc(*('mp4v' if is_mp4 else 'XVID'))
+    return cv2.VideoWriter(output_path, fourcc, fps, frame_size)
+
+def check_centered_hold():
+    """
+    Merkezde max_update_gap'ten uzun (2 s) tutulan hedefin in_zone True
+    kalmasını ve PID'lerin sıfırlanmamasını denetle (sabit 30 fps saat)
+    """
+    controller = CameraController(debug_mode=False)
+    period = 1 / 30
+    center = (controller.center_x, controller.center_y)
+    
+    # İlk güncelleme ve hedefi merkeze getiren ilk takip adımı
+    controller.calculate_camera_movement((controller.center_x + 200, controller.center_y), 0.0)
+    controller.calculate_camera_movement(center, period)
+    
+    for i in range(2, 62):
+        commands = controller.calculate_camera_movement(center, i * period)
+        if not commands['in_zone']:
+            print(f"Hata: merkezdeki hedef {i * period:.2f} s'de bölge dışı sayıldı")
+            return False
+    print("Merkezde tutulan hedef denetimi başarılı")
+    return True
+
 def main():
     # Komut satırı argümanlarını ayarla
     parser = argparse.ArgumentParser(description='İHA Takip Testi')
     parser.add_argument('--video', type=str, default='data/test_video.mp4', help='Test video dosyası')
     parser.add_argument('--model', type=str, default='models/yolov5s.pt', help='YOLO model dosyası')
     parser.add_argument('--conf', type=float, default=0.5, help='Tespit güven eşiği')
-    parser.add_argument('--output', type=str, default='output/tracking_test.avi', help='Çıktı video dosyası')
+    parser.add_argument('--output', type=str, default='output/tracking_test.mp4', help='Çıktı video dosyası')
+    parser.add_argument('--no_fp16', action='store_true', help='CUDA üzerinde FP16 yerine FP32 çıkarım kullan')
+    parser.add_argument('--hw_decode', action='store_true', help='Video dosyasını donanım kod çözücüyle oku (NVDEC/VA-API)')
+    parser.add_argument('--check', action='store_true', help='Video açmadan kamera kontrolörü denetimini çalıştır')
     args = parser.parse_args()
     
+    if args.check:
+        sys.exit(0 if check_centered_hold() else 1)
+    
     # Video dosyasını aç
-    cap = cv2.VideoCapture(args.video)
+    if args.hw_decode and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        # Donanım kod çözücü (NVDEC, VA-API, ...), yoksa FFmpeg yazılımla çözer
+        cap = cv2.VideoCapture(args.video, cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.get(cv2.CAP_PROP_HW_ACCELERATION) == cv2.VIDEO_ACCELERATION_NONE:
+            print("Uyarı: Donanım kod çözücü bulunamadı, yazılımsal çözme kullanılıyor")
+    else:
+        cap = cv2.VideoCapture(args.video)
     if not cap.isOpened():
         print(f"Hata: {args.video} açılamadı")
         return
@@ -113,11 +189,37 @@ def main():
     
     # Çıktı video yazıcısını ayarla
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    out = cv2.VideoWriter(args.output, cv2.VideoWriter_fourcc(*'XVID'), fps, (frame_width, frame_height))
+    out = open_video_writer(args.output, fps, (frame_width, frame_height))
+    
+    # Kodlama ayrı thread'de yapılır (VideoWriter.write kodlarken GIL'i
+    # bırakır), kayıt eksiksiz olmalı, bu yüzden kuyruk doluysa beklenir
+    write_q = queue.Queue(maxsize=8)
+    
+    # Yazıcı hatası ana thread'e bildirilir; kuyruk sona kadar boşaltılmaya
+    # devam eder, yoksa dolan kuyruk ana döngüyü ve kapanışı bekletir
+    write_error = None
+    
+    def write_loop():
+        """İşlenmiş kareleri videoya yaz, None akış sonunu bildirir"""
+        nonlocal write_error
+        while True:
+            frame = write_q.get()
+            if frame is None:
+                break
+            if write_error is not None:
+                continue
+            try:
+                out.write(frame)
+            except Exception as e:
+                write_error = e
+                print(f"Video yazma hatası, kayıt durduruldu: {e}")
+    
+    write_thread = threading.Thread(target=write_loop, daemon=True)
+    write_thread.start()
     
     # YOLO modelini yükle
     try:
-        net, classes, output_layers = load_yolo_model(args.model)
+        net, classes, output_layers = load_yolo_model(args.model, use_fp16=not args.no_fp16)
     except Exception as e:
         print(f"Model yüklenirken hata oluştu: {e}")
         print("Varsayılan tespit kullanılacak")
@@ -136,6 +238,85 @@ def main():
         debug_mode=True
     )
     
+    # Boru hattı kuyrukları: yakalama -> tespit/takip -> çizim/gösterim
+    # (ana thread, HighGUI ana thread'de kalmalı) -> yazma
+    frame_q = queue.Queue(maxsize=2)
+    tracked_q = queue.Queue(maxsize=2)
+    stop = threading.Event()
+    
+    # Kareler her seferinde yeni dizi ayırmak yerine sabit tamponlara okunur.
+    # Kare yerinde çizilip kuyruklarla aşamalar arasında taşındığı için tek
+    # tampon yetmez: kuyruklardaki kareler ve her aşamanın (yakalama, tespit,
+    # çizim, yazma) üzerinde çalıştığı kare kadar tampon sırayla kullanılır
+    frame_buffers = [np.empty((frame_height, frame_width, 3), dtype=np.uint8)
+                     for _ in range(frame_q.maxsize + tracked_q.maxsize + write_q.maxsize + 4)]
+    
+    def put(q, item):
+        """Kuyrukta yer açılana kadar bekle, durdurulduysa bırak"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+    
+    def get(q):
+        """Kuyruktan al, durdurulduysa None döndür"""
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+    
+    def capture_loop():
+        """Kareleri oku (1. aşama), None akış sonunu bildirir"""
+        frame_id = 0
+        try:
+            while not stop.is_set():
+                ret, frame = cap.read(frame_buffers[frame_id % len(frame_buffers)])
+                if not ret:
+                    break
+                frame_id += 1
+                put(frame_q, (frame_id, frame))
+        finally:
+            put(frame_q, None)
+    
+    def tracking_loop():
+        """İHA'ları tespit et ve takipçiyi güncelle (2. aşama)"""
+        # Takipçi yalnızca bu thread'den kullanılır, kilit gerekmez
+        try:
+            while True:
+                item = get(frame_q)
+                if item is None:
+                    break
+                frame_id, frame = item
+                
+                # YOLO ile İHA'ları tespit et
+                if net is not None:
+                    detections = detect_uavs(frame, net, output_layers, classes, args.conf)
+                else:
+                    # Test için simüle edilmiş tespit
+                    # Ekranın ortasında hareket eden bir İHA simüle et
+                    center_x = int(frame_width/2 + 100 * math.sin(frame_id / 50.0))
+                    center_y = int(frame_height/2 + 80 * math.cos(frame_id / 30.0))
+                    w, h = 100, 60
+                    
+                    detections = [{
+                        'bbox': [center_x - w//2, center_y - h//2, center_x + w//2, center_y + h//2],
+                        'confidence': 0.9,
+                        'class': 'IHA'
+                    }]
+                
+                # Kalman takipçisini güncelle
+                tracked_objects = tracker.update(detections)
+                put(tracked_q, (frame_id, frame, tracked_objects))
+        finally:
+            put(tracked_q, None)
+    
+    capture_thread = threading.Thread(target=capture_loop, daemon=True)
+    tracking_thread = threading.Thread(target=tracking_loop, daemon=True)
+    
     # Simülasyon değişkenleri
     frame_count = 0
     start_time = time.time()
@@ -144,14 +325,23 @@ def main():
     pan_angle = 0.0
     tilt_angle = 0.0
     
+    # Kareler videonun kendi hızında gösterilir; işleme süresi kare
+    # süresinden düşülür (FPS bilgisi yoksa beklenmez)
+    frame_period = 1.0 / fps if fps > 0 else 0.0
+    
+    # Durum satırları (10, 300) noktasından başlayarak 30 piksel arayla
+    info_overlay = InfoOverlay(3, 300, (255, 255, 255))
+    
     print("Test başlatılıyor...")
+    capture_thread.start()
+    tracking_thread.start()
     
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        item = tracked_q.get()
+        if item is None:
             break
-        
-        frame_count += 1
+        frame_start = time.perf_counter()
+        frame_count, frame, tracked_objects = item
         
         # Her 5 karede bir FPS hesapla
         if frame_count % 5 == 0:
@@ -159,25 +349,6 @@ def main():
             fps_current = frame_count / elapsed_time
             print(f"İşlenen kare: {frame_count}, FPS: {fps_current:.2f}")
         
-        # YOLO ile İHA'ları tespit et
-        if net is not None:
-            detections = detect_uavs(frame, net, output_layers, classes, args.conf)
-        else:
-            # Test için simüle edilmiş tespit
-            # Ekranın ortasında hareket eden bir İHA simüle et
-            center_x = int(frame_width/2 + 100 * np.sin(frame_count / 50.0))
-            center_y = int(frame_height/2 + 80 * np.cos(frame_count / 30.0))
-            w, h = 100, 60
-            
-            detections = [{
-                'bbox': [center_x - w//2, center_y - h//2, center_x + w//2, center_y + h//2],
-                'confidence': 0.9,
-                'class': 'IHA'
-            }]
-        
-        # Kalman takipçisini güncelle
-        tracked_objects = tracker.update(detections)
-        
         # Takip yöneticisini güncelle
         commands, processed_frame = tracking_manager.update(tracked_objects, frame)
         
@@ -186,31 +357,39 @@ def main():
         tilt_angle = commands['tilt']
         
         # Durum bilgilerini ekle
-        cv2.putText(processed_frame, f"Frame: {frame_count}", (10, 300),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        
-        cv2.putText(processed_frame, f"Tracking: {commands['is_tracking']}", (10, 330),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        
-        cv2.putText(processed_frame, f"Locked: {commands['is_locked']}", (10, 360),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        info_overlay.draw(processed_frame, (
+            f"Frame: {frame_count}",
+            f"Tracking: {commands['is_tracking']}",
+            f"Locked: {commands['is_locked']}"
+        ))
         
         # Görüntüyü göster
         cv2.imshow('İHA Takip Testi', processed_frame)
         
         # Çıktı videosuna yaz
-        out.write(processed_frame)
+        write_q.put(processed_frame)
         
         # 'q' tuşuna basılırsa çık
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        delay = frame_start + frame_period - time.perf_counter()
+        if cv2.waitKey(max(1, int(delay * 1000))) & 0xFF == ord('q'):
             break
     
-    # Kaynakları serbest bırak
+    # Thread'leri durdur, yakalama bitmeden video kapatılmamalı
+    stop.set()
+    capture_thread.join()
+    tracking_thread.join()
+    
+    # Kuyruktaki kareler yazıldıktan sonra kaynakları serbest bırak
+    write_q.put(None)
+    write_thread.join()
     cap.release()
     out.release()
     cv2.destroyAllWindows()
     
-    print(f"Test tamamlandı. Çıktı: {args.output}")
+    if write_error is not None:
+        print(f"Test tamamlandı, çıktı video eksik: {args.output} ({write_error})")
+    else:
+        print(f"Test tamamlandı. Çıktı: {args.output}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file